@@ -2,14 +2,57 @@
 # -*- coding: utf-8 -*-
 
 
+import argparse
+import asyncio
+import atexit
+import bisect
+import collections
+import concurrent.futures
+import contextlib
+import csv
+import functools
+import gc
+import hashlib
+import heapq
+import itertools
 import json
 import glob
+import marshal
+import mmap
 import os
+import queue
 import random
+import struct
+import sys
+import textwrap
+import threading
 import time
+import urllib.parse
+import weakref
+from array import array
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Callable, Iterable, Iterator
 from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import sqlite3
+except ImportError:  # Python compilé sans sqlite
+    sqlite3 = None  # type: ignore
+
+try:
+    import numpy
+except ImportError:  # analyses en Python pur (array)
+    numpy = None  # type: ignore
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None  # type: ignore
 
 
 # ============================================================================
@@ -18,42 +61,84 @@ from datetime import datetime, timezone
 
 @dataclass
 class Question:
+    __slots__ = ("id", "theme", "niveau", "texte", "options", "bonne_option", "_corps")
+
     id: int
     theme: str
     niveau: str
     texte: str
-    options: List[str]
+    options: Tuple[str, ...]
     bonne_option: int
 
+    def __post_init__(self) -> None:
+        # Thème et niveau internés : une seule chaîne partagée par toute la banque
+        self.theme = sys.intern(self.theme)
+        self.niveau = sys.intern(self.niveau)
+        self.options = tuple(self.options)
+        self._corps: Optional[str] = None
+
     def formater_pour_affichage(self, index: int, total: int) -> str:
-        s = f"\nQuestion {index}/{total} [{self.theme} - {self.niveau}]\n"
-        s += "─" * 60 + "\n"
-        s += f"{self.texte}\n\n"
-        for i, opt in enumerate(self.options, start=1):
-            s += f"  {i}) {opt}\n"
-        return s
+        """Écran de la question : seul l'en-tête (index/total) est recalculé à chaque appel"""
+        if self._corps is None:
+            options = "".join(f"  {i}) {opt}\n" for i, opt in enumerate(self.options, start=1))
+            self._corps = f"{'─' * 60}\n{self.texte}\n\n{options}"
+        return f"\nQuestion {index}/{total} [{self.theme} - {self.niveau}]\n{self._corps}"
 
 
 # ============================================================================
 # UTILITAIRES
 # ============================================================================
 
+class TamponEcran:
+    """Accumule les lignes d'un écran et les écrit en un seul appel, juste avant une saisie
+
+    Le tampon n'est actif que dans l'application interactive : ailleurs (commandes
+    d'administration, serveur), chaque ligne est écrite aussitôt.
+    """
+
+    def __init__(self) -> None:
+        self._lignes: List[str] = []
+        self.actif = False
+
+    def ligne(self, texte: str = "") -> None:
+        if self.actif:
+            self._lignes.append(texte)
+        else:
+            sys.stdout.write(texte + "\n")
+
+    def afficher(self) -> None:
+        # Échange de liste : une ligne ajoutée par un autre thread n'est jamais perdue
+        lignes, self._lignes = self._lignes, []
+        if lignes:
+            sys.stdout.write("\n".join(lignes) + "\n")
+        sys.stdout.flush()
+
+    def saisir(self, invite: str = "") -> str:
+        self.afficher()
+        return input(invite)
+
+
+ECRAN = TamponEcran()
+
+
 def saisie_securisee(invite: str = "") -> str:
     """Saisie sécurisée qui gère les interruptions"""
     try:
-        return input(invite)
+        return ECRAN.saisir(invite)
     except (KeyboardInterrupt, EOFError):
-        print("")
+        ECRAN.ligne("")
         return ""
 
 
 def entier_securise(invite: str, val_min: Optional[int] = None, val_max: Optional[int] = None,
-                    par_defaut: Optional[int] = None) -> int:
-    """Demande un entier avec validation"""
+                    par_defaut: Optional[int] = None, raccourcis: Optional[Dict[str, int]] = None) -> int:
+    """Demande un entier avec validation (raccourcis : mots cachés acceptés tels quels)"""
     while True:
         s = saisie_securisee(invite).strip()
         if s == "" and par_defaut is not None:
             return par_defaut
+        if raccourcis and s.lower() in raccourcis:
+            return raccourcis[s.lower()]
         try:
             v = int(s)
             if (val_min is not None and v < val_min) or (val_max is not None and v > val_max):
@@ -62,23 +147,23 @@ def entier_securise(invite: str, val_min: Optional[int] = None, val_max: Optiona
                     plage.append(f">= {val_min}")
                 if val_max is not None:
                     plage.append(f"<= {val_max}")
-                print(f"Valeur invalide – entrez un entier {' et '.join(plage)}.")
+                ECRAN.ligne(f"Valeur invalide – entrez un entier {' et '.join(plage)}.")
                 continue
             return v
         except ValueError:
-            print("Entrée invalide – merci d'entrer un nombre entier.")
+            ECRAN.ligne("Entrée invalide – merci d'entrer un nombre entier.")
 
 
 def choisir_dans_liste(elements: List[str], invite: str = "Choix (numéro) : ",
                        autoriser_zero_retour: bool = False) -> Optional[int]:
     """Affiche une liste et retourne l'index choisi"""
     if not elements:
-        print("[Aucun élément disponible]")
+        ECRAN.ligne("[Aucun élément disponible]")
         return None
     for idx, elem in enumerate(elements, start=1):
-        print(f"{idx}) {elem}")
+        ECRAN.ligne(f"{idx}) {elem}")
     if autoriser_zero_retour:
-        print("0) Retour")
+        ECRAN.ligne("0) Retour")
     while True:
         choix = saisie_securisee(invite).strip()
         if choix == "" and autoriser_zero_retour:
@@ -89,9 +174,560 @@ def choisir_dans_liste(elements: List[str], invite: str = "Choix (numéro) : ",
                 return None
             if 1 <= n <= len(elements):
                 return n - 1
-            print("Choix hors limites. Réessaie.")
+            ECRAN.ligne("Choix hors limites. Réessaie.")
         except ValueError:
-            print("Choix invalide – entrez le numéro correspondant.")
+            ECRAN.ligne("Choix invalide – entrez le numéro correspondant.")
+
+
+def iterer_par_lots(elements: Iterable[Any], taille_lot: int) -> Iterator[List[Any]]:
+    """Découpe un itérable en listes d'au plus taille_lot éléments"""
+    iterateur = iter(elements)
+    while True:
+        lot = list(itertools.islice(iterateur, max(taille_lot, 1)))
+        if not lot:
+            return
+        yield lot
+
+
+@contextlib.contextmanager
+def sans_ramasse_miettes():
+    """Suspend le ramasse-miettes pendant la création massive d'objets"""
+    actif = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if actif:
+            gc.enable()
+
+
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+
+INSTRUMENTATION_ACTIVE = os.environ.get("QUISQUEYA_INSTRUMENTATION", "0").lower() not in ("", "0", "non", "false")
+FICHIER_INSTRUMENTATION = os.environ.get("QUISQUEYA_INSTRUMENTATION_FICHIER", "instrumentation.json")
+BORNES_LATENCE_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class Mesure:
+    """Compteur d'appels, histogramme de latence et octets d'un point instrumenté"""
+
+    __slots__ = ("appels", "total_ms", "max_ms", "histogramme", "octets_lus", "octets_ecrits")
+
+    def __init__(self) -> None:
+        self.appels = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogramme = [0] * (len(BORNES_LATENCE_MS) + 1)
+        self.octets_lus = 0
+        self.octets_ecrits = 0
+
+    def ajouter(self, ms: float) -> None:
+        self.appels += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.histogramme[bisect.bisect_left(BORNES_LATENCE_MS, ms)] += 1
+
+    def rapport(self) -> Dict[str, Any]:
+        etiquettes = [f"<={b}ms" for b in BORNES_LATENCE_MS] + [f">{BORNES_LATENCE_MS[-1]}ms"]
+        return {
+            "appels": self.appels,
+            "moyenne_ms": round(self.total_ms / self.appels, 4) if self.appels else 0.0,
+            "max_ms": round(self.max_ms, 4),
+            "histogramme": {e: n for e, n in zip(etiquettes, self.histogramme) if n},
+            "octets_lus": self.octets_lus,
+            "octets_ecrits": self.octets_ecrits
+        }
+
+
+class Instrumentation:
+    """Mesures optionnelles des chemins critiques (désactivées par défaut)"""
+
+    def __init__(self, active: bool = False) -> None:
+        self.active = active
+        self.mesures: Dict[str, Mesure] = {}
+        self._verrou = threading.Lock()
+
+    def _mesure(self, nom: str) -> Mesure:
+        mesure = self.mesures.get(nom)
+        if mesure is None:
+            mesure = self.mesures.setdefault(nom, Mesure())
+        return mesure
+
+    def enregistrer(self, nom: str, secondes: float) -> None:
+        with self._verrou:
+            self._mesure(nom).ajouter(secondes * 1000)
+
+    def octets(self, nom: str, lus: int = 0, ecrits: int = 0) -> None:
+        """Ajoute des octets lus/écrits au point nom (sans effet si désactivée)"""
+        if not self.active:
+            return
+        with self._verrou:
+            mesure = self._mesure(nom)
+            mesure.octets_lus += lus
+            mesure.octets_ecrits += ecrits
+
+    def phase(self, nom: str):
+        """Contexte chronométrant une phase ; contexte vide si désactivée"""
+        return self._chronometre(nom) if self.active else _CONTEXTE_VIDE
+
+    @contextlib.contextmanager
+    def _chronometre(self, nom: str):
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.enregistrer(nom, time.perf_counter() - debut)
+
+    def reinitialiser(self) -> None:
+        with self._verrou:
+            self.mesures.clear()
+
+    def rapport(self) -> Dict[str, Any]:
+        with self._verrou:
+            return {
+                "active": self.active,
+                "date": datetime.now(timezone.utc).isoformat(),
+                "mesures": {nom: m.rapport() for nom, m in sorted(self.mesures.items())}
+            }
+
+    def exporter(self, chemin: str = FICHIER_INSTRUMENTATION) -> bool:
+        """Écrit le rapport JSON dans chemin"""
+        try:
+            with open(chemin, "w", encoding="utf-8") as f:
+                json.dump(self.rapport(), f, ensure_ascii=False, indent=2)
+            return True
+        except IOError as e:
+            print(f"[Erreur] impossible d'écrire {chemin}: {e}")
+            return False
+
+
+_CONTEXTE_VIDE = contextlib.nullcontext()
+INSTRUMENTATION = Instrumentation(INSTRUMENTATION_ACTIVE)
+
+
+def instrumenter(nom: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Décorateur : compte et chronomètre les appels quand l'instrumentation est active"""
+    def decorer(fonction: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fonction)
+        def enveloppe(*args: Any, **kwargs: Any) -> Any:
+            if not INSTRUMENTATION.active:
+                return fonction(*args, **kwargs)
+            debut = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                INSTRUMENTATION.enregistrer(nom, time.perf_counter() - debut)
+        return enveloppe
+    return decorer
+
+
+def _exporter_instrumentation_a_la_sortie() -> None:
+    if INSTRUMENTATION.active and INSTRUMENTATION.mesures:
+        INSTRUMENTATION.exporter()
+
+
+atexit.register(_exporter_instrumentation_a_la_sortie)
+
+
+# ============================================================================
+# INDEX DES SCORES
+# ============================================================================
+
+class ListeTriee:
+    """Liste triée découpée en blocs : insertion et rang sans tout décaler"""
+
+    TAILLE_BLOC = 512
+
+    def __init__(self) -> None:
+        self._blocs: List[list] = []
+        self._maximums: list = []
+        self._cumuls: Optional[List[int]] = None
+        self._taille = 0
+
+    def __len__(self) -> int:
+        return self._taille
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._blocs)
+
+    def ajouter(self, valeur: Any) -> None:
+        """Insère une valeur en conservant l'ordre"""
+        self._taille += 1
+        self._cumuls = None
+        if not self._blocs:
+            self._blocs.append([valeur])
+            self._maximums.append(valeur)
+            return
+        i = bisect.bisect_left(self._maximums, valeur)
+        if i == len(self._blocs):
+            i -= 1
+            self._blocs[i].append(valeur)
+            self._maximums[i] = valeur
+        else:
+            bisect.insort(self._blocs[i], valeur)
+        bloc = self._blocs[i]
+        if len(bloc) > 2 * self.TAILLE_BLOC:
+            moitie = len(bloc) // 2
+            self._blocs[i:i + 1] = [bloc[:moitie], bloc[moitie:]]
+            self._maximums[i:i + 1] = [bloc[moitie - 1], bloc[-1]]
+
+    def premiers(self, n: int) -> list:
+        """Retourne les n plus petites valeurs"""
+        return list(itertools.islice(iter(self), max(n, 0)))
+
+    def iterer_depuis(self, valeur: Any):
+        """Itère dans l'ordre sur les valeurs >= valeur"""
+        i = bisect.bisect_left(self._maximums, valeur)
+        if i == len(self._blocs):
+            return iter(())
+        debut = bisect.bisect_left(self._blocs[i], valeur)
+        return itertools.chain(itertools.islice(self._blocs[i], debut, None),
+                               itertools.chain.from_iterable(self._blocs[i + 1:]))
+
+    def rang(self, valeur: Any) -> int:
+        """Nombre de valeurs strictement inférieures à valeur"""
+        i = bisect.bisect_left(self._maximums, valeur)
+        if i == len(self._blocs):
+            return self._taille
+        if self._cumuls is None:
+            self._cumuls = list(itertools.accumulate(len(b) for b in self._blocs))
+        avant = self._cumuls[i - 1] if i > 0 else 0
+        return avant + bisect.bisect_left(self._blocs[i], valeur)
+
+
+class CompteurRangs:
+    """Arbre de Fenwick des effectifs par (score, pourcentage au dixième)
+
+    Rang et percentile d'un résultat en O(log n), sans parcourir l'historique.
+    La case d'un résultat est score * 1001 + dixièmes de pourcentage ; le tableau
+    double de taille quand un score plus élevé apparaît.
+    """
+
+    DIXIEMES = 1001  # pourcentages de 0.0 à 100.0
+
+    def __init__(self) -> None:
+        self._arbre = array("i", [0])
+        self.total = 0
+
+    @classmethod
+    def case(cls, score: Any, pourcentage: Any) -> int:
+        dixiemes = min(max(int(round(float(pourcentage or 0) * 10)), 0), cls.DIXIEMES - 1)
+        return max(int(score or 0), 0) * cls.DIXIEMES + dixiemes + 1
+
+    def _agrandir(self, case: int) -> None:
+        """Reconstruit l'arbre (en O(taille)) avec une capacité d'au moins case"""
+        arbre, taille = self._arbre, len(self._arbre) - 1
+        for i in range(taille, 0, -1):  # arbre -> effectifs par case
+            j = i + (i & -i)
+            if j <= taille:
+                arbre[j] -= arbre[i]
+        nouvelle_taille = max(case, 2 * taille)
+        arbre.extend(itertools.repeat(0, nouvelle_taille - taille))
+        for i in range(1, nouvelle_taille + 1):  # effectifs -> arbre
+            j = i + (i & -i)
+            if j <= nouvelle_taille:
+                arbre[j] += arbre[i]
+
+    def ajouter(self, score: Any, pourcentage: Any, effectif: int = 1) -> None:
+        i = self.case(score, pourcentage)
+        if i >= len(self._arbre):
+            self._agrandir(i)
+        self.total += effectif
+        arbre, taille = self._arbre, len(self._arbre) - 1
+        while i <= taille:
+            arbre[i] += effectif
+            i += i & -i
+
+    def _cumul(self, i: int) -> int:
+        """Effectif des cases 1..i"""
+        i = min(i, len(self._arbre) - 1)
+        somme = 0
+        while i > 0:
+            somme += self._arbre[i]
+            i -= i & -i
+        return somme
+
+    def position(self, score: Any, pourcentage: Any) -> Tuple[int, int]:
+        """(mieux classés, moins bien classés) qu'un résultat ; les ex aequo ne comptent dans aucun des deux"""
+        i = self.case(score, pourcentage)
+        return self.total - self._cumul(i), self._cumul(i - 1)
+
+
+def decrire_position(globale: Tuple[int, int, int], du_theme: Optional[Tuple[int, int, int]]) -> Dict[str, Any]:
+    """Rang ex aequo et percentile à partir de (mieux classés, moins bien classés, total)
+
+    Le percentile est la part des parties précédentes moins bien classées.
+    """
+    position: Dict[str, Any] = {}
+    for suffixe, compte in (("global", globale), ("theme", du_theme)):
+        if compte is not None:
+            mieux, moins_bien, total = compte
+            position[f"rang_{suffixe}"] = mieux + 1
+            position[f"percentile_{suffixe}"] = round(100 * moins_bien / total, 1) if total else 100.0
+            position[f"parties_{suffixe}"] = total
+    return position
+
+
+def ajouter_aux_comptes(globale: Tuple[int, int, int], du_theme: Optional[Tuple[int, int, int]],
+                        entree: Dict[str, Any], autres: Iterable[Dict[str, Any]]
+                        ) -> Tuple[Tuple[int, int, int], Optional[Tuple[int, int, int]]]:
+    """Ajoute les parties autres aux comptes (mieux classés, moins bien classés, total) d'entree"""
+    theme = entree.get("theme")
+    case = CompteurRangs.case(entree.get("score_total", 0), entree.get("pourcentage", 0))
+    comptes = [list(globale), list(du_theme) if du_theme is not None else None]
+    for autre in autres:
+        case_autre = CompteurRangs.case(autre.get("score_total", 0), autre.get("pourcentage", 0))
+        for compte in (comptes if theme and autre.get("theme") == theme else comptes[:1]):
+            if compte is not None:
+                compte[0] += case_autre > case
+                compte[1] += case_autre < case
+                compte[2] += 1
+    return tuple(comptes[0]), tuple(comptes[1]) if comptes[1] is not None else None
+
+
+@dataclass
+class AgregatJoueur:
+    nom: str
+    parties: int = 0
+    meilleur_score: int = 0
+    meilleur_pourcentage: float = 0
+    somme_pourcentage: float = 0.0
+
+    def ajouter(self, entree: Dict[str, Any]) -> None:
+        """Met à jour les cumuls avec une nouvelle partie"""
+        score = entree.get("score_total", 0)
+        if self.parties == 0 or score > self.meilleur_score:
+            self.meilleur_score = score
+            self.meilleur_pourcentage = entree.get("pourcentage", 0)
+        self.parties += 1
+        self.somme_pourcentage += entree.get("pourcentage", 0)
+        self.nom = entree.get("joueur_nom", self.nom)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "joueur": self.nom,
+            "parties": self.parties,
+            "meilleur_score": self.meilleur_score,
+            "meilleur_pourcentage": self.meilleur_pourcentage,
+            "moyenne_pourcentage": round(self.somme_pourcentage / self.parties, 1)
+        }
+
+
+class IndexScores:
+    """Classements global et par thème, et cumuls par joueur, maintenus à chaque sauvegarde
+
+    Un index restauré depuis un instantané ne garde que la tête de chaque classement ;
+    les autres parties archivées ne sont plus que des effectifs par (score, pourcentage),
+    dans _archives, qui servent à calculer le rang des nouvelles parties. _frontieres
+    retient, par classement, la clé (sans séquence) de la meilleure partie archivée :
+    tout ce qui la précède est classé exactement. Au-delà, les requêtes qui ne
+    peuvent pas être tranchées avec les effectifs (tete_exacte, rang à None) doivent
+    relire les archives.
+    """
+
+    def __init__(self) -> None:
+        self.entrees: List[Dict[str, Any]] = []
+        self._global = ListeTriee()
+        self._par_theme: Dict[str, ListeTriee] = {}
+        self._cle_par_id: Dict[str, tuple] = {}
+        self._joueurs: Dict[str, AgregatJoueur] = {}
+        self._noms_tries = ListeTriee()
+        self._archives: Dict[str, Tuple[List[tuple], List[int]]] = {}
+        self._frontieres: Dict[str, tuple] = {}
+        self._date_archives = ""
+        self._restaurees = 0
+        self._rangs: Dict[str, CompteurRangs] = {"": CompteurRangs()}
+
+    @staticmethod
+    def cle(entree: Dict[str, Any], sequence: int) -> tuple:
+        """Clé de tri du classement (la séquence garde l'ordre d'arrivée)"""
+        return (-entree.get("score_total", 0), -entree.get("pourcentage", 0),
+                entree.get("date_heure", ""), sequence)
+
+    def ajouter(self, entree: Dict[str, Any], compter_joueur: bool = True) -> None:
+        """Indexe une nouvelle partie"""
+        cle = self.cle(entree, len(self.entrees))
+        self.entrees.append(entree)
+        self._global.ajouter(cle)
+        score, pourcentage = entree.get("score_total", 0), entree.get("pourcentage", 0)
+        self._rangs[""].ajouter(score, pourcentage)
+        theme = entree.get("theme")
+        if theme:
+            self._par_theme.setdefault(theme, ListeTriee()).ajouter(cle)
+            self._compteur(theme).ajouter(score, pourcentage)
+        if entree.get("id_partie"):
+            self._cle_par_id[entree["id_partie"]] = cle
+        if compter_joueur:
+            nom = entree.get("joueur_nom", "")
+            cle_joueur = nom.casefold()
+            agregat = self._joueurs.get(cle_joueur)
+            if agregat is None:
+                agregat = self._joueurs[cle_joueur] = AgregatJoueur(nom)
+                self._noms_tries.ajouter(cle_joueur)
+            agregat.ajouter(entree)
+
+    def _compteur(self, classement: str) -> CompteurRangs:
+        compteur = self._rangs.get(classement)
+        if compteur is None:
+            compteur = self._rangs[classement] = CompteurRangs()
+        return compteur
+
+    def comptes_position(self, entree: Dict[str, Any]) -> Tuple[Tuple[int, int, int], Optional[Tuple[int, int, int]]]:
+        """(mieux classés, moins bien classés, total), globalement puis dans le thème de la partie"""
+        score, pourcentage = entree.get("score_total", 0), entree.get("pourcentage", 0)
+        theme = entree.get("theme")
+
+        def compter(classement: str) -> Tuple[int, int, int]:
+            compteur = self._rangs.get(classement) or CompteurRangs()
+            return compteur.position(score, pourcentage) + (compteur.total,)
+
+        return compter(""), compter(theme) if theme else None
+
+    def positionner(self, entree: Dict[str, Any]) -> Dict[str, Any]:
+        """Rang et percentile d'une partie parmi toutes les parties indexées, globalement et dans son thème"""
+        return decrire_position(*self.comptes_position(entree))
+
+    def _classement(self, theme: Optional[str]) -> Optional[ListeTriee]:
+        return self._par_theme.get(theme) if theme else self._global
+
+    def top(self, n: int, theme: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retourne les n meilleures parties"""
+        classement = self._classement(theme)
+        if classement is None:
+            return []
+        return [self.entrees[cle[-1]] for cle in classement.premiers(n)]
+
+    def cle_partie(self, id_partie: str, theme: Optional[str] = None) -> Optional[tuple]:
+        """Clé de classement d'une partie indexée (None si absente ou d'un autre thème)"""
+        cle = self._cle_par_id.get(id_partie)
+        if cle is None or (theme and self.entrees[cle[-1]].get("theme") != theme):
+            return None
+        return cle
+
+    def compter_devant(self, cle: tuple, theme: Optional[str] = None,
+                       recente: Optional[bool] = None) -> Optional[int]:
+        """Nombre de parties classées avant cle (parties archivées comprises)
+
+        Les parties archivées de même (score, pourcentage) que cle ne la précèdent
+        que si cle est plus récente qu'elles : recente=True l'affirme (partie du
+        journal courant). Sans cette certitude ni date postérieure aux archives,
+        retourne None : seule une relecture des archives peut trancher.
+        """
+        classement = self._classement(theme)
+        devant = classement.rang(cle) if classement is not None else 0
+        archives = self._archives.get(theme or "")
+        if not archives:
+            return devant
+        valeurs, cumuls = archives
+        i = bisect.bisect_left(valeurs, cle[:2])
+        j = bisect.bisect_right(valeurs, cle[:2], i)
+        devant += cumuls[i - 1] if i else 0
+        frontiere = self._frontieres.get(theme or "")
+        if j > i and (frontiere is None or cle[:3] >= frontiere):
+            if not (recente or cle[2] > self._date_archives):
+                return None
+            devant += cumuls[j - 1] - (cumuls[i - 1] if i else 0)
+        return devant
+
+    def rang(self, id_partie: str, theme: Optional[str] = None) -> Optional[int]:
+        """Rang (1 = premier) d'une partie dans le classement
+
+        None si la partie est absente de l'index ou si son rang dépend de parties
+        archivées (voir tronque) : il faut alors relire les archives.
+        """
+        cle = self.cle_partie(id_partie, theme)
+        if cle is None or self._classement(theme) is None:
+            return None
+        devant = self.compter_devant(cle, theme, recente=cle[-1] >= self._restaurees)
+        return None if devant is None else devant + 1
+
+    def tronque(self, theme: Optional[str] = None) -> bool:
+        """Vrai si des parties du classement ne sont plus que des effectifs archivés"""
+        return bool(self._archives.get(theme or ""))
+
+    def tete_exacte(self, theme: Optional[str] = None) -> Optional[int]:
+        """Nombre de premières places que top() donne exactement (None : tout le classement)"""
+        if not self.tronque(theme):
+            return None
+        classement = self._classement(theme)
+        frontiere = self._frontieres.get(theme or "")
+        if classement is None or frontiere is None:
+            return 0
+        return classement.rang(frontiere)
+
+    def themes(self) -> List[str]:
+        return sorted(set(self._par_theme) | {t for t in self._archives if t})
+
+    def instantane(self, taille_classement: int) -> Dict[str, Any]:
+        """Agrégats compacts de l'index : tête de chaque classement, effectifs du reste, joueurs"""
+        classements = {"": self._global}
+        classements.update(self._par_theme)
+        gardees = set()
+        for classement in classements.values():
+            gardees.update(cle[-1] for cle in classement.premiers(taille_classement))
+
+        archives: Dict[str, Dict[tuple, int]] = {}
+        for nom, (valeurs, cumuls) in self._archives.items():
+            effectifs = archives.setdefault(nom, {})
+            precedent = 0
+            for valeur, cumul in zip(valeurs, cumuls):
+                effectifs[valeur] = cumul - precedent
+                precedent = cumul
+        frontieres = dict(self._frontieres)
+        date_archives = self._date_archives
+        for nom, classement in classements.items():
+            effectifs = archives.setdefault(nom, {})
+            for cle in itertools.islice(iter(classement), taille_classement, None):
+                if cle[-1] not in gardees:
+                    effectifs[cle[:2]] = effectifs.get(cle[:2], 0) + 1
+                    if nom not in frontieres or cle[:3] < frontieres[nom]:
+                        frontieres[nom] = cle[:3]
+                    date_archives = max(date_archives, cle[2])
+
+        return {
+            "entrees": [self.entrees[i] for i in sorted(gardees)],
+            "archives": {nom: sorted(effectifs.items()) for nom, effectifs in archives.items() if effectifs},
+            "frontieres": frontieres,
+            "date_archives": date_archives,
+            "joueurs": {cle_joueur: (a.nom, a.parties, a.meilleur_score, a.meilleur_pourcentage,
+                                     a.somme_pourcentage)
+                        for cle_joueur, a in self._joueurs.items()}
+        }
+
+    @classmethod
+    def depuis_instantane(cls, donnees: Dict[str, Any]) -> "IndexScores":
+        """Reconstruit un index à partir du résultat de instantane()"""
+        index = cls()
+        for entree in donnees["entrees"]:
+            index.ajouter(entree, compter_joueur=False)
+        index._restaurees = len(index.entrees)
+        index._frontieres = dict(donnees.get("frontieres", {}))
+        index._date_archives = donnees.get("date_archives", "")
+        for nom, effectifs in donnees["archives"].items():
+            index._archives[nom] = ([tuple(v) for v, _ in effectifs],
+                                    list(itertools.accumulate(n for _, n in effectifs)))
+            compteur = index._compteur(nom)
+            for (score, pourcentage), n in effectifs:
+                compteur.ajouter(-score, -pourcentage, n)
+        for cle_joueur in sorted(donnees["joueurs"]):
+            index._joueurs[cle_joueur] = AgregatJoueur(*donnees["joueurs"][cle_joueur])
+            index._noms_tries.ajouter(cle_joueur)
+        return index
+
+    def joueur(self, nom: str) -> Optional[AgregatJoueur]:
+        return self._joueurs.get(nom.casefold())
+
+    def noms_commencant_par(self, prefixe: str, limite: int = 5) -> List[str]:
+        """Noms de joueurs connus commençant par prefixe (insensible à la casse)"""
+        prefixe = prefixe.casefold()
+        resultat: List[str] = []
+        for cle_joueur in self._noms_tries.iterer_depuis(prefixe):
+            if not cle_joueur.startswith(prefixe) or len(resultat) >= limite:
+                break
+            resultat.append(self._joueurs[cle_joueur].nom)
+        return resultat
 
 
 # ============================================================================
@@ -99,247 +735,2849 @@ def choisir_dans_liste(elements: List[str], invite: str = "Choix (numéro) : ",
 # ============================================================================
 
 FICHIER_SCORES = "scores.json"
+FICHIER_VALIDATION = "validation.en_cours"
+CHAMPS_SCORE = ("id_partie", "joueur_nom", "date_heure", "theme", "niveau", "nombre_questions", "bonnes",
+                "mauvaises", "score_total", "pourcentage", "duree_seconds", "rang_global", "percentile_global",
+                "rang_theme", "percentile_theme")
+ECRITURE_DIFFEREE = os.environ.get("QUISQUEYA_ECRITURE_DIFFEREE", "1").lower() not in ("0", "non", "false")
+
+
+class VerrouFichier:
+    """Verrou consultatif exclusif entre processus (flock sous POSIX, msvcrt sous Windows)"""
+
+    def __init__(self, chemin: str) -> None:
+        self.chemin = chemin
+        self._fichier = None
+
+    def __enter__(self) -> "VerrouFichier":
+        self._fichier = open(self.chemin, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._fichier.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            self._fichier.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._fichier.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        return self
+
+    def __exit__(self, *exc) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fichier.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                self._fichier.seek(0)
+                msvcrt.locking(self._fichier.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._fichier.close()
+            self._fichier = None
 
 
 class Stockage:
     """Gère la sauvegarde et le chargement des scores"""
 
+    _index: Optional[IndexScores] = None
+    _sig_index: Optional[Tuple[int, int]] = None
+    _compteur_attente = itertools.count()
+    _file_ecriture: Optional["queue.Queue"] = None
+    _ecrivain: Optional[threading.Thread] = None
+    _abonnes: Tuple[Callable[[], None], ...] = ()
+    _lecture_sans_attente = threading.local()
+    _echecs_ecriture = 0
+    _verrou_echecs = threading.Lock()
+    _vues: Optional["MemoireVues"] = None
+
     def __init__(self, chemin: str = FICHIER_SCORES) -> None:
         self.chemin = chemin
-        if not os.path.isfile(self.chemin):
-            try:
-                with open(self.chemin, "w", encoding="utf-8") as f:
-                    json.dump([], f, ensure_ascii=False, indent=2)
-            except IOError as e:
-                print(f"[Erreur] impossible de créer {self.chemin}: {e}")
+        self._memoire = threading.RLock()
+        with self._verrou():
+            if not os.path.isfile(self.chemin):
+                try:
+                    with open(self.chemin, "w", encoding="utf-8") as f:
+                        json.dump([], f, ensure_ascii=False, indent=2)
+                except IOError as e:
+                    print(f"[Erreur] impossible de créer {self.chemin}: {e}")
 
+    def _verrou(self) -> VerrouFichier:
+        """Verrou partagé par tous les processus qui écrivent dans ce fichier"""
+        return VerrouFichier(f"{self.chemin}.verrou")
+
+    @property
+    def dossier_attente(self) -> str:
+        """Dossier où chaque sauvegarde dépose son entrée avant la validation groupée"""
+        return f"{self.chemin}.attente"
+
+    def memoire_vues(self) -> "MemoireVues":
+        """Questions déjà posées à chaque joueur, rangées à côté des scores"""
+        if self._vues is None:
+            self._vues = MemoireVues(f"{self.chemin}.vues")
+        return self._vues
+
+    @instrumenter("charger_tous")
     def charger_tous(self) -> List[Dict[str, Any]]:
         """Charge tous les scores"""
         try:
             with open(self.chemin, "r", encoding="utf-8") as f:
+                INSTRUMENTATION.octets("charger_tous", lus=os.fstat(f.fileno()).st_size)
                 return json.load(f)
         except (IOError, json.JSONDecodeError):
             return []
 
-    def sauvegarder_score(self, entree: Dict[str, Any]) -> None:
-        """Sauvegarde un nouveau score"""
-        tous_scores = self.charger_tous()
-        tous_scores.append(entree)
-        temp = f"{self.chemin}.tmp"
-        try:
-            with open(temp, "w", encoding="utf-8") as f:
-                json.dump(tous_scores, f, ensure_ascii=False, indent=2)
-            os.replace(temp, self.chemin)
-        except IOError as e:
-            print(f"[Erreur] impossible de sauvegarder le score: {e}")
+    def iterer(self):
+        """Itère sur toutes les parties enregistrées, une à la fois (mémoire bornée)"""
+        self.vider()
+        return iterer_scores(self.chemin)
 
-    def top_n(self, n: int = 10, theme: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Retourne les n meilleurs scores"""
-        tous_scores = self.charger_tous()
-        if theme:
-            tous_scores = [s for s in tous_scores if s.get("theme") == theme]
+    def importer(self, entrees: Iterable[Dict[str, Any]], taille_lot: int = 10000) -> int:
+        """Sauvegarde un flux de parties par lots de taille_lot ; retourne le nombre de parties"""
+        # En mode json, chaque lot réécrirait tout le fichier : on ajoute en place
+        # à la fin du tableau, comme le mode flux
+        ecrivain = StockageFlux(self.chemin) if type(self) is Stockage else self
+        nombre = 0
+        for lot in iterer_par_lots(entrees, taille_lot):
+            ecrivain.sauvegarder_scores(lot)
+            nombre += len(lot)
+        if ecrivain is not self:
+            self._notifier()
+        return nombre
 
-        def cle_tri(s: Dict[str, Any]) -> tuple:
-            return (-s.get("score_total", 0), -s.get("pourcentage", 0), s.get("date_heure", ""))
+    def exporter(self, sortie, format: str = "jsonl", taille_lot: int = 10000) -> int:
+        """Écrit toutes les parties dans le fichier texte sortie (jsonl ou csv), un lot par écriture"""
+        redacteur = None
+        if format == "csv":
+            redacteur = csv.DictWriter(sortie, CHAMPS_SCORE, extrasaction="ignore")
+            redacteur.writeheader()
+        nombre = 0
+        for lot in iterer_par_lots(self.iterer(), taille_lot):
+            if redacteur is not None:
+                redacteur.writerows(lot)
+            else:
+                sortie.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in lot))
+            nombre += len(lot)
+        return nombre
 
-        tous_scores.sort(key=cle_tri)
-        return tous_scores[:n]
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        """(mtime, taille) du fichier, pour détecter une écriture externe"""
+        try:
+            st = os.stat(self.chemin)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
 
-    def obtenir_themes_depuis_scores(self) -> List[str]:
-        """Retourne tous les thèmes uniques des scores enregistrés"""
-        tous_scores = self.charger_tous()
-        themes = {s.get("theme") for s in tous_scores if s.get("theme")}
-        return sorted(themes)
+    def version(self) -> Any:
+        """Jeton qui change quand les scores changent, y compris dans un autre processus
+        (métadonnées seulement : aucune donnée n'est lue)"""
+        return self._signature()
 
-    def compter_occurrences_joueur(self, nom_joueur: str) -> int:
-        """Compte combien de fois un nom de joueur apparaît dans les scores"""
-        tous_scores = self.charger_tous()
-        compteur = sum(1 for s in tous_scores if s.get("joueur_nom", "").lower() == nom_joueur.lower())
-        return compteur
+    def abonner(self, rappel: Callable[[], None]) -> None:
+        """Appelle rappel() après chaque sauvegarde faite par ce processus (invalidation de caches)"""
+        self._abonnes = self._abonnes + (rappel,)
 
-    def obtenir_stats_joueur(self, nom_joueur: str) -> Dict[str, Any]:
-        """Retourne les statistiques d'un joueur"""
-        tous_scores = self.charger_tous()
-        scores_joueur = [s for s in tous_scores if s.get("joueur_nom", "").lower() == nom_joueur.lower()]
+    def _notifier(self) -> None:
+        for rappel in self._abonnes:
+            rappel()
 
-        if not scores_joueur:
-            return {"parties": 0}
+    def _index_a_jour(self) -> IndexScores:
+        """Retourne l'index, reconstruit si le fichier a changé hors de ce processus
 
-        total_parties = len(scores_joueur)
-        meilleur_score = max(scores_joueur, key=lambda x: x.get("score_total", 0))
-        moyenne_pourcentage = sum(s.get("pourcentage", 0) for s in scores_joueur) / total_parties
+        À appeler sous self._memoire, qui protège l'index des écritures d'autres threads.
+        """
+        signature = self._signature()
+        if self._index is None or signature != self._sig_index:
+            index = IndexScores()
+            for entree in self.charger_tous():
+                index.ajouter(entree)
+            self._index = index
+            self._sig_index = signature
+        return self._index
 
-        return {
-            "parties": total_parties,
-            "meilleur_score": meilleur_score.get("score_total", 0),
-            "meilleur_pourcentage": meilleur_score.get("pourcentage", 0),
-            "moyenne_pourcentage": round(moyenne_pourcentage, 1)
-        }
+    def _indexer_apres_ecriture(self, avant: Optional[Tuple[int, int]],
+                                entrees: List[Dict[str, Any]]) -> None:
+        """Ajoute les entrées écrites à l'index s'il était à jour avant l'écriture"""
+        with self._memoire:
+            if self._index is not None and self._sig_index == avant:
+                for entree in entrees:
+                    self._index.ajouter(entree)
+                self._sig_index = self._signature()
+            else:
+                self._index = None
 
+    @instrumenter("sauvegarder_score")
+    def sauvegarder_score(self, entree: Dict[str, Any]) -> bool:
+        """Sauvegarde un nouveau score (mis en file si l'écriture différée est active)
 
-# ============================================================================
-# BANQUE DE QUESTIONS
-# ============================================================================
+        Retourne False si l'écriture immédiate a échoué ; une entrée mise en file
+        compte comme acceptée, ses échecs éventuels sont donnés par echecs_ecriture().
+        """
+        if self._file_ecriture is not None:
+            with self._verrou_file:
+                if self._file_ecriture is not None:
+                    self._file_ecriture.put(entree)
+                    self._en_attente.append(entree)
+                    return True
+        return self.sauvegarder_scores([entree])
 
-class BanqueQuestions:
-    """Gère le chargement et la sélection des questions"""
+    @property
+    def ecriture_differee(self) -> bool:
+        return self._file_ecriture is not None
 
-    def __init__(self, dossier: str = "questions") -> None:
-        self.questions: List[Question] = []
-        self.dossier = dossier
-        self._charger_questions()
+    def echecs_ecriture(self) -> int:
+        """Nombre de parties que le thread écrivain n'a pas pu écrire depuis le dernier appel"""
+        with self._verrou_echecs:
+            echecs, self._echecs_ecriture = self._echecs_ecriture, 0
+        return echecs
 
-    def _charger_questions(self) -> None:
-        """Charge les questions depuis les fichiers JSON"""
-        if os.path.isdir(self.dossier):
-            motif = os.path.join(self.dossier, "*.json")
-            fichiers = sorted(glob.glob(motif))
-            for f in fichiers:
-                self._charger_fichier(f)
-        elif os.path.isfile("questions.json"):
-            self._charger_fichier("questions.json")
+    def demarrer_ecriture_differee(self, taille_lot: int = 100) -> None:
+        """Confie les sauvegardes à un thread écrivain : sauvegarder_score ne touche plus au disque"""
+        if self._ecrivain is not None:
+            return
+        self._verrou_file = threading.Lock()
+        self._verrou_lot = threading.Lock()  # un lot s'écrit, ou une lecture compte la file, pas les deux
+        self._en_attente: List[Dict[str, Any]] = []  # en file ou en cours d'écriture, dans l'ordre de la file
+        self._file_ecriture = queue.Queue()
+        self._ecrivain = threading.Thread(target=self._ecrire_en_arriere_plan,
+                                          args=(self._file_ecriture, taille_lot),
+                                          name="quisqueya-ecrivain", daemon=True)
+        self._ecrivain.start()
+        atexit.register(self.arreter_ecriture_differee)
 
-    def _charger_fichier(self, chemin: str) -> None:
-        """Charge un fichier JSON de questions"""
-        try:
-            with open(chemin, "r", encoding="utf-8") as f:
-                donnees = json.load(f)
-            if not isinstance(donnees, list):
-                print(f"[Avertissement] {chemin} ne contient pas une liste de questions – ignoré.")
-                return
-            for element in donnees:
-                if not all(k in element for k in ("id", "theme", "niveau", "texte", "options", "bonne_option")):
-                    print(f"[Avertissement] entrée mal formée dans {chemin}, id approximatif: {element.get('id')}")
-                    continue
+    def _ecrire_en_arriere_plan(self, file: "queue.Queue", taille_lot: int) -> None:
+        """Boucle du thread écrivain : regroupe les entrées en attente et les écrit par lots"""
+        while True:
+            lot = [file.get()]
+            while len(lot) < taille_lot:
                 try:
-                    q = Question(
-                        id=int(element["id"]),
-                        theme=str(element["theme"]),
-                        niveau=str(element["niveau"]),
-                        texte=str(element["texte"]),
-                        options=list(element["options"]),
-                        bonne_option=int(element["bonne_option"])
-                    )
-                    if not (0 <= q.bonne_option < len(q.options)):
-                        print(f"[Avertissement] mauvaise bonne_option pour id {q.id} dans {chemin} – ignorée.")
-                        continue
-                    self.questions.append(q)
-                except (ValueError, TypeError, KeyError) as e:
-                    print(f"[Avertissement] impossible de créer Question depuis entrée {element.get('id')}: {e}")
-        except (IOError, json.JSONDecodeError) as e:
-            print(f"[Avertissement] impossible de lire {chemin}: {e}")
+                    lot.append(file.get_nowait())
+                except queue.Empty:
+                    break
+            entrees = [e for e in lot if e is not None]
+            with self._verrou_lot:
+                try:
+                    ecrit = self.sauvegarder_scores(entrees)
+                except Exception as e:  # le thread doit survivre pour vider la file
+                    print(f"[Erreur] impossible de sauvegarder le score: {e}")
+                    ecrit = False
+                with self._verrou_file:
+                    del self._en_attente[:len(entrees)]
+            if not ecrit:
+                with self._verrou_echecs:
+                    self._echecs_ecriture += len(entrees)
+            for _ in lot:
+                file.task_done()
+            if None in lot:
+                return
 
-    def lister_themes(self) -> List[str]:
-        """Retourne la liste des thèmes disponibles"""
-        return sorted({q.theme for q in self.questions})
+    def vider(self) -> None:
+        """Attend que les sauvegardes en file soient écrites (lecture de ses propres écritures)"""
+        file = self._file_ecriture
+        if (file is not None and threading.current_thread() is not self._ecrivain
+                and not getattr(self._lecture_sans_attente, "active", False)):
+            file.join()
 
-    def filtrer(self, themes: Optional[List[str]] = None,
-                niveaux: Optional[List[str]] = None) -> List[Question]:
-        """Filtre les questions par thème et/ou niveau"""
-        resultat = self.questions
-        if themes:
-            resultat = [q for q in resultat if q.theme in themes]
-        if niveaux:
-            resultat = [q for q in resultat if q.niveau in niveaux]
-        return resultat
+    def _lire_sans_attendre(self, lire: Callable[[], Any]) -> Tuple[Any, List[Dict[str, Any]]]:
+        """Exécute lire() sans vider la file d'écriture ; retourne aussi les parties encore en file
 
-    def echantillonner_questions(self, nombre: int = 10, themes: Optional[List[str]] = None) -> List[Question]:
-        """Retourne jusqu'à nombre questions (max 10)"""
-        nombre = min(int(nombre), 10)
-        reserve = self.filtrer(themes, niveaux=None)
-        if not reserve:
-            return []
+        L'appelant ajoute lui-même ces parties au résultat. Seul un lot en cours
+        d'écriture est attendu (pas toute la file) : ses parties pourraient sinon
+        être comptées sur le disque et dans la file à la fois.
+        """
+        if self._file_ecriture is None or threading.current_thread() is self._ecrivain:
+            return lire(), []
+        with self._verrou_lot:
+            with self._verrou_file:
+                en_attente = list(self._en_attente)
+            self._lecture_sans_attente.active = True
+            try:
+                return lire(), en_attente
+            finally:
+                self._lecture_sans_attente.active = False
 
-        if len(reserve) <= nombre:
-            random.shuffle(reserve)
-            return reserve[:nombre]
-        return random.sample(reserve, nombre)
+    def arreter_ecriture_differee(self) -> None:
+        """Écrit tout ce qui reste en file puis arrête le thread écrivain"""
+        if self._ecrivain is None:
+            return
+        with self._verrou_file:
+            file, self._file_ecriture = self._file_ecriture, None
+        file.put(None)
+        self._ecrivain.join()
+        self._ecrivain = None
 
+    @instrumenter("sauvegarder_scores")
+    def sauvegarder_scores(self, entrees: List[Dict[str, Any]]) -> bool:
+        """Sauvegarde un lot de scores (validation groupée entre processus) ; retourne False en cas d'échec
 
+        Le lot est d'abord déposé dans le dossier d'attente, puis le processus
+        prend le verrou : si un autre processus l'a déjà écrit entre-temps, il n'y a
+        plus rien à faire ; sinon tous les lots en attente, y compris ceux
+        des autres processus, sont écrits en une seule fois.
 
-# ============================================================================
-# VALIDATION NOM DU JOUEUR
-# ============================================================================
+        Avant l'écriture, une note de validation retient les lots concernés et la
+        signature du fichier : après un crash entre l'écriture et la suppression
+        des lots, le prochain écrivain voit que le fichier a changé et supprime
+        ces lots au lieu de les écrire une seconde fois.
+        """
+        if not entrees:
+            return True
+        try:
+            os.makedirs(self.dossier_attente, exist_ok=True)
+            nom = (f"{time.time_ns():020d}-{os.getpid()}-{threading.get_ident()}"
+                   f"-{next(self._compteur_attente)}.json")
+            mon_fichier = os.path.join(self.dossier_attente, nom)
+            with open(mon_fichier + ".tmp", "w", encoding="utf-8") as f:
+                f.write(json.dumps(entrees, ensure_ascii=False))
+            os.replace(mon_fichier + ".tmp", mon_fichier)
+        except IOError as e:
+            print(f"[Erreur] impossible de sauvegarder le score: {e}")
+            return False
 
-def obtenir_nom_joueur(stockage: Stockage) -> Optional[str]:
-    """Demande et valide le nom du joueur avec gestion des doublons"""
-    while True:
-        joueur = saisie_securisee("👤 Entrez votre nom ou pseudo : ").strip()
+        with self._verrou():
+            self._reprendre_validation()
+            if not os.path.exists(mon_fichier):
+                return True
+            fichiers: List[str] = []
+            lot: List[Dict[str, Any]] = []
+            for nom in sorted(f for f in os.listdir(self.dossier_attente) if f.endswith(".json")):
+                chemin_lot = os.path.join(self.dossier_attente, nom)
+                try:
+                    with open(chemin_lot, "r", encoding="utf-8") as f:
+                        contenu = json.load(f)
+                except IOError:
+                    # Illisible pour l'instant : le lot reste en attente pour le prochain écrivain
+                    continue
+                except json.JSONDecodeError as e:
+                    # Lot corrompu : mis de côté pour examen, jamais supprimé sans avoir été écrit
+                    print(f"[Avertissement] lot en attente illisible {nom}: {e} – déplacé vers {nom}.rejet")
+                    try:
+                        os.replace(chemin_lot, chemin_lot + ".rejet")
+                    except OSError:
+                        pass
+                    continue
+                fichiers.append(nom)
+                lot.extend(contenu if isinstance(contenu, list) else [contenu])
+            validation = os.path.join(self.dossier_attente, FICHIER_VALIDATION)
+            try:
+                with open(validation + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump({"signature": self._signature(), "fichiers": fichiers}, f)
+                os.replace(validation + ".tmp", validation)
+                self._ecrire_lot(lot)
+            except IOError as e:
+                print(f"[Erreur] impossible de sauvegarder le score: {e}")
+                return False
+            self._terminer_validation(fichiers)
+        self._notifier()
+        return True
 
-        if not joueur:
-            joueur = "Joueur"
+    def _reprendre_validation(self) -> None:
+        """Termine une validation interrompue par un crash (appelé sous verrou)
 
-        occurrences = stockage.compter_occurrences_joueur(joueur)
+        Si le fichier a changé depuis la note, les lots qu'elle cite sont déjà
+        écrits : on les supprime. Sinon l'écriture n'a pas eu lieu et ils restent en attente.
+        """
+        validation = os.path.join(self.dossier_attente, FICHIER_VALIDATION)
+        try:
+            with open(validation, "r", encoding="utf-8") as f:
+                note = json.load(f)
+        except (IOError, ValueError):
+            return
+        signature = self._signature()
+        if note.get("signature") != (list(signature) if signature is not None else None):
+            self._terminer_validation(note.get("fichiers", []))
+        else:
+            self._terminer_validation([])
 
-        if occurrences == 0:
-            print(f"\n Bienvenue {joueur} ! C'est votre première partie.\n")
-            time.sleep(1)
-            return joueur
+    def _terminer_validation(self, fichiers: List[str]) -> None:
+        """Supprime les lots écrits puis la note de validation (appelé sous verrou)"""
+        for nom in fichiers:
+            try:
+                os.remove(os.path.join(self.dossier_attente, nom))
+            except OSError:
+                pass
+        try:
+            os.remove(os.path.join(self.dossier_attente, FICHIER_VALIDATION))
+        except OSError:
+            pass
 
-        elif occurrences == 1:
-            stats = stockage.obtenir_stats_joueur(joueur)
-            print(f"\n️  Le nom '{joueur}' est déjà enregistré avec 1 partie.")
-            print(f"   Meilleur score : {stats['meilleur_score']} points ({stats['meilleur_pourcentage']}%)")
-            print("\n Êtes-vous cette même personne ?")
-            print("   1) Oui, c'est moi - continuer avec ce nom")
-            print("   2) Non, choisir un autre nom")
-            print("   0) Annuler et retourner au menu\n")
+    def _ecrire_lot(self, entrees: List[Dict[str, Any]]) -> None:
+        """Ajoute durablement des entrées au fichier (appelé sous verrou)"""
+        avant = self._signature()
+        tous_scores = self.charger_tous()
+        tous_scores.extend(entrees)
+        temp = f"{self.chemin}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(tous_scores, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+            INSTRUMENTATION.octets("sauvegarder_score", ecrits=f.tell())
+        os.replace(temp, self.chemin)
+        self._indexer_apres_ecriture(avant, entrees)
 
-            choix = entier_securise("➤ Votre choix : ", val_min=0, val_max=2)
+    @instrumenter("top_n")
+    def top_n(self, n: int = 10, theme: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retourne les n meilleurs scores"""
+        self.vider()
+        with self._memoire:
+            return [dict(s) for s in self._index_a_jour().top(n, theme)]
 
-            if choix == 1:
-                print(f"\n Bon retour {joueur} !\n")
-                time.sleep(1)
-                return joueur
-            elif choix == 2:
-                print("\n Veuillez choisir un autre nom.\n")
-                continue
-            else:
+    def rang_partie(self, id_partie: str, theme: Optional[str] = None) -> Optional[int]:
+        """Retourne le rang d'une partie dans le classement (global ou du thème)"""
+        self.vider()
+        with self._memoire:
+            return self._index_a_jour().rang(id_partie, theme)
+
+    def positionner(self, entree: Dict[str, Any]) -> Dict[str, Any]:
+        """Situe une partie terminée parmi les parties enregistrées (rang ex aequo et percentile,
+        global et dans son thème) ; les parties encore en file d'écriture comptent sans être attendues"""
+        (globale, du_theme), en_attente = self._lire_sans_attendre(lambda: self._comptes_position(entree))
+        return decrire_position(*ajouter_aux_comptes(globale, du_theme, entree, en_attente))
+
+    def _comptes_position(self, entree: Dict[str, Any]
+                          ) -> Tuple[Tuple[int, int, int], Optional[Tuple[int, int, int]]]:
+        """(mieux classés, moins bien classés, total) parmi les parties écrites, global et du thème"""
+        self.vider()
+        with self._memoire:
+            return self._index_a_jour().comptes_position(entree)
+
+    def obtenir_themes_depuis_scores(self) -> List[str]:
+        """Retourne tous les thèmes uniques des scores enregistrés"""
+        self.vider()
+        with self._memoire:
+            return self._index_a_jour().themes()
+
+    def compter_occurrences_joueur(self, nom_joueur: str) -> int:
+        """Compte combien de fois un nom de joueur apparaît dans les scores (file d'écriture comprise)"""
+        parties, en_attente = self._lire_sans_attendre(lambda: self._parties_joueur(nom_joueur))
+        cle_joueur = nom_joueur.casefold()
+        return parties + sum(1 for e in en_attente if e.get("joueur_nom", "").casefold() == cle_joueur)
+
+    def _parties_joueur(self, nom_joueur: str) -> int:
+        """Nombre de parties écrites du joueur"""
+        self.vider()
+        with self._memoire:
+            agregat = self._index_a_jour().joueur(nom_joueur)
+            return agregat.parties if agregat else 0
+
+    def obtenir_stats_joueur(self, nom_joueur: str) -> Dict[str, Any]:
+        """Retourne les statistiques d'un joueur"""
+        self.vider()
+        with self._memoire:
+            agregat = self._index_a_jour().joueur(nom_joueur)
+            if agregat is None:
+                return {"parties": 0}
+            return agregat.stats()
+
+    def suggerer_noms(self, prefixe: str, limite: int = 5) -> List[str]:
+        """Suggère des noms de joueurs déjà enregistrés (file d'écriture comprise)"""
+        if not prefixe:
+            return []
+        noms, en_attente = self._lire_sans_attendre(lambda: self._noms_commencant_par(prefixe, limite))
+        debut = prefixe.casefold()
+        nouveaux = sorted({e.get("joueur_nom", "") for e in en_attente
+                           if e.get("joueur_nom", "").casefold().startswith(debut)}, key=str.casefold)
+        fusion = heapq.merge(noms, nouveaux, key=str.casefold)
+        uniques = (next(groupe) for _, groupe in itertools.groupby(fusion, key=str.casefold))
+        return list(itertools.islice(uniques, limite))
+
+    def _noms_commencant_par(self, prefixe: str, limite: int) -> List[str]:
+        """Au plus limite noms écrits commençant par prefixe, triés sans casse"""
+        self.vider()
+        with self._memoire:
+            return self._index_a_jour().noms_commencant_par(prefixe, limite)
+
+
+FICHIER_JOURNAL = "scores.jsonl"
+SIGNATURE_INSTANTANE = b"QQSNAP01"
+SEUIL_ROTATION = int(os.environ.get("QUISQUEYA_ROTATION", "50000"))
+TAILLE_CLASSEMENT_INSTANTANE = int(os.environ.get("QUISQUEYA_CLASSEMENT_INSTANTANE", "1000"))
+
+
+class StockageJournal(Stockage):
+    """Stockage en journal append-only : une ligne JSON par partie
+
+    Quand le journal dépasse seuil_rotation parties, il est déplacé dans le dossier
+    d'archives et remplacé par un instantané compact (tête des classements, effectifs,
+    cumuls par joueur). Au démarrage, on charge l'instantané puis on ne rejoue que
+    le journal courant.
+    """
+
+    _offset_index = 0
+    _lignes_journal = 0
+
+    def __init__(self, chemin: str = FICHIER_JOURNAL,
+                 ancien_chemin: Optional[str] = FICHIER_SCORES,
+                 seuil_rotation: int = SEUIL_ROTATION,
+                 taille_classement: int = TAILLE_CLASSEMENT_INSTANTANE) -> None:
+        self.chemin = chemin
+        self.seuil_rotation = seuil_rotation
+        self.taille_classement = taille_classement
+        self._memoire = threading.RLock()
+        with self._verrou():
+            self._terminer_rotation()
+            if not os.path.isfile(self.chemin):
+                if ancien_chemin and os.path.isfile(ancien_chemin):
+                    self.migrer_depuis(ancien_chemin)
+                else:
+                    try:
+                        open(self.chemin, "ab").close()
+                    except IOError as e:
+                        print(f"[Erreur] impossible de créer {self.chemin}: {e}")
+            else:
+                try:
+                    with open(self.chemin, "a+b") as f:
+                        self._tronquer_ligne_partielle(f)
+                except IOError as e:
+                    print(f"[Erreur] impossible d'ouvrir {self.chemin}: {e}")
+
+    @staticmethod
+    def _tronquer_ligne_partielle(f) -> None:
+        """Supprime une dernière ligne incomplète (écriture interrompue par un crash)"""
+        f.seek(0, os.SEEK_END)
+        taille = f.tell()
+        if taille == 0:
+            return
+        f.seek(taille - 1)
+        if f.read(1) == b"\n":
+            return
+        position = taille
+        while position > 0:
+            debut = max(0, position - 4096)
+            f.seek(debut)
+            bloc = f.read(position - debut)
+            fin_ligne = bloc.rfind(b"\n")
+            if fin_ligne != -1:
+                f.truncate(debut + fin_ligne + 1)
+                return
+            position = debut
+        f.truncate(0)
+
+    @property
+    def chemin_instantane(self) -> str:
+        return f"{self.chemin}.instantane"
+
+    @property
+    def dossier_archives(self) -> str:
+        return f"{self.chemin}.archives"
+
+    def _chemin_archive(self, generation: int) -> str:
+        return os.path.join(self.dossier_archives, f"{generation:06d}.jsonl")
+
+    def archives(self) -> List[str]:
+        """Fichiers d'archive, du plus ancien au plus récent"""
+        try:
+            noms = sorted(n for n in os.listdir(self.dossier_archives) if n.endswith(".jsonl"))
+        except OSError:
+            return []
+        return [os.path.join(self.dossier_archives, n) for n in noms]
+
+    def _lire_instantane(self) -> Optional[Dict[str, Any]]:
+        """Lit l'instantané ; None s'il est absent, corrompu ou d'une autre version de Python"""
+        try:
+            with open(self.chemin_instantane, "rb") as f:
+                contenu = f.read()
+        except IOError:
+            return None
+        entete = len(SIGNATURE_INSTANTANE)
+        if contenu[:entete] != SIGNATURE_INSTANTANE:
+            return None
+        empreinte, charge = contenu[entete:entete + 32], contenu[entete + 32:]
+        if hashlib.sha256(charge).digest() != empreinte:
+            return None
+        try:
+            with sans_ramasse_miettes():
+                donnees = marshal.loads(charge)
+        except (ValueError, EOFError, TypeError):
+            return None
+        if not isinstance(donnees, dict) or donnees.get("version") != tuple(sys.version_info[:2]):
+            return None
+        return donnees
+
+    def _ecrire_instantane(self, generation: int, index: IndexScores) -> Dict[str, Any]:
+        """Écrit durablement l'instantané de l'index (appelé sous verrou)"""
+        donnees = {"version": tuple(sys.version_info[:2]), "generation": generation,
+                   "index": index.instantane(self.taille_classement)}
+        charge = marshal.dumps(donnees)
+        temp = f"{self.chemin_instantane}.tmp"
+        with open(temp, "wb") as f:
+            f.write(SIGNATURE_INSTANTANE + hashlib.sha256(charge).digest() + charge)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.chemin_instantane)
+        return donnees
+
+    def _terminer_rotation(self) -> None:
+        """Archive le journal si un crash a eu lieu entre l'instantané et le déplacement"""
+        donnees = self._lire_instantane()
+        generation = len(self.archives())
+        if donnees and donnees["generation"] == generation + 1 and os.path.isfile(self.chemin):
+            try:
+                os.replace(self.chemin, self._chemin_archive(generation))
+                open(self.chemin, "ab").close()
+            except OSError as e:
+                print(f"[Erreur] impossible d'archiver {self.chemin}: {e}")
+
+    def _index_de_base(self) -> IndexScores:
+        """Index des parties archivées : l'instantané s'il est valide, sinon relecture des archives"""
+        archives = self.archives()
+        donnees = self._lire_instantane()
+        if donnees is not None and donnees["generation"] == len(archives):
+            return IndexScores.depuis_instantane(donnees["index"])
+        index = IndexScores()
+        for chemin in archives:
+            for entree in self._lire_depuis(0, chemin)[0]:
+                index.ajouter(entree)
+        return index
+
+    def compacter(self) -> int:
+        """Archive le journal courant derrière un nouvel instantané ; retourne le nombre de parties archivées"""
+        with self._verrou(), self._memoire:
+            return self._compacter()
+
+    def _compacter(self) -> int:
+        """Rotation du journal (appelé sous verrou et sous self._memoire)"""
+        index = self._index_a_jour()
+        archivees = self._lignes_journal
+        if archivees == 0:
+            return 0
+        generation = len(self.archives())
+        try:
+            os.makedirs(self.dossier_archives, exist_ok=True)
+            donnees = self._ecrire_instantane(generation + 1, index)
+            os.replace(self.chemin, self._chemin_archive(generation))
+            open(self.chemin, "ab").close()
+        except OSError as e:
+            print(f"[Erreur] impossible de compacter {self.chemin}: {e}")
+            return 0
+        self._index = IndexScores.depuis_instantane(donnees["index"])
+        self._offset_index = 0
+        self._lignes_journal = 0
+        self._sig_index = self._signature()
+        return archivees
+
+    def migrer_depuis(self, ancien_chemin: str) -> None:
+        """Convertit un fichier scores.json (tableau) en journal"""
+        try:
+            with open(ancien_chemin, "r", encoding="utf-8") as f:
+                anciens = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"[Avertissement] migration impossible depuis {ancien_chemin}: {e}")
+            anciens = []
+        if not isinstance(anciens, list):
+            anciens = []
+        temp = f"{self.chemin}.tmp"
+        try:
+            with open(temp, "w", encoding="utf-8") as f:
+                for entree in anciens:
+                    f.write(json.dumps(entree, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp, self.chemin)
+        except IOError as e:
+            print(f"[Erreur] impossible de migrer les scores: {e}")
+
+    def _lire_depuis(self, offset: int, chemin: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Lit les lignes complètes à partir d'un offset ; retourne (entrées, offset de fin)"""
+        scores: List[Dict[str, Any]] = []
+        debut = offset
+        try:
+            with open(chemin or self.chemin, "rb") as f:
+                f.seek(offset)
+                for ligne in f:
+                    if not ligne.endswith(b"\n"):
+                        break
+                    offset += len(ligne)
+                    try:
+                        scores.append(json.loads(ligne))
+                    except ValueError:
+                        continue
+        except IOError:
+            pass
+        INSTRUMENTATION.octets("charger_tous", lus=offset - debut)
+        return scores, offset
+
+    @instrumenter("charger_tous")
+    def charger_tous(self) -> List[Dict[str, Any]]:
+        """Charge tous les scores, archives comprises (lignes illisibles ignorées)"""
+        scores: List[Dict[str, Any]] = []
+        for chemin in self.archives():
+            scores.extend(self._lire_depuis(0, chemin)[0])
+        scores.extend(self._lire_depuis(0)[0])
+        return scores
+
+    def iterer(self):
+        """Itère sur les parties des archives puis du journal courant"""
+        self.vider()
+        return itertools.chain.from_iterable(iterer_scores(c) for c in self.archives() + [self.chemin])
+
+    def _signature(self) -> Optional[Tuple[int, ...]]:
+        """(mtime, taille, inode) : l'inode change quand le journal est archivé"""
+        try:
+            st = os.stat(self.chemin)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _index_a_jour(self) -> IndexScores:
+        """Rejoue seulement les lignes ajoutées depuis la dernière lecture"""
+        signature = self._signature()
+        if self._index is not None and signature == self._sig_index:
+            return self._index
+        if (self._index is None or signature is None or self._sig_index is None
+                or signature[2] != self._sig_index[2] or signature[1] < self._offset_index):
+            self._index = self._index_de_base()
+            self._offset_index = 0
+            self._lignes_journal = 0
+        nouvelles, self._offset_index = self._lire_depuis(self._offset_index)
+        for entree in nouvelles:
+            self._index.ajouter(entree)
+        self._lignes_journal += len(nouvelles)
+        self._sig_index = signature
+        return self._index
+
+    def _parcourir(self, theme: Optional[str] = None):
+        """(ordre d'arrivée, partie) de toutes les parties, archives comprises, du thème s'il est donné"""
+        chemins = self.archives() + [self.chemin]
+        parties = enumerate(itertools.chain.from_iterable(iterer_scores(c) for c in chemins))
+        return ((i, e) for i, e in parties if not theme or e.get("theme") == theme)
+
+    def _meilleures(self, n: int, theme: Optional[str] = None) -> List[Dict[str, Any]]:
+        """n meilleures parties : depuis l'index dans sa tête exacte, sinon en relisant les archives"""
+        with self._memoire:
+            index = self._index_a_jour()
+            tete = index.tete_exacte(theme)
+            if tete is None or n <= tete:
+                return index.top(n, theme)
+            meilleures = heapq.nsmallest(max(n, 0), self._parcourir(theme),
+                                         key=lambda p: IndexScores.cle(p[1], p[0]))
+            return [e for _, e in meilleures]
+
+    def _rang_flux(self, id_partie: str, theme: Optional[str] = None) -> Optional[int]:
+        """Rang relu dans les archives et le journal (deux passes, mémoire bornée)"""
+        cible = None
+        for i, entree in self._parcourir(theme):
+            if entree.get("id_partie") == id_partie:
+                cible = IndexScores.cle(entree, i)
+        if cible is None:
+            return None
+        return 1 + sum(1 for i, entree in self._parcourir(theme) if IndexScores.cle(entree, i) < cible)
+
+    @instrumenter("top_n")
+    def top_n(self, n: int = 10, theme: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retourne les n meilleurs scores ; au-delà de la tête gardée par l'instantané, relit les archives"""
+        self.vider()
+        return [dict(s) for s in self._meilleures(n, theme)]
+
+    def rang_partie(self, id_partie: str, theme: Optional[str] = None) -> Optional[int]:
+        """Rang d'une partie ; relit les archives quand l'index ne suffit pas à la situer"""
+        self.vider()
+        with self._memoire:
+            index = self._index_a_jour()
+            rang = index.rang(id_partie, theme)
+            if rang is not None or not index.tronque(theme):
+                return rang
+            return self._rang_flux(id_partie, theme)
+
+    def _ecrire_lot(self, entrees: List[Dict[str, Any]]) -> None:
+        """Ajoute les entrées en fin de journal avec un seul fsync (appelé sous verrou)"""
+        lignes = b"".join((json.dumps(e, ensure_ascii=False) + "\n").encode("utf-8") for e in entrees)
+        with open(self.chemin, "a+b") as f:
+            self._tronquer_ligne_partielle(f)
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            f.write(lignes)
+            f.flush()
+            os.fsync(f.fileno())
+            inode = os.fstat(f.fileno()).st_ino
+        INSTRUMENTATION.octets("sauvegarder_score", ecrits=len(lignes))
+        with self._memoire:
+            if (self._index is not None and self._offset_index == position
+                    and self._sig_index is not None and self._sig_index[2] == inode):
+                for entree in entrees:
+                    self._index.ajouter(entree)
+                self._offset_index = position + len(lignes)
+                self._lignes_journal += len(entrees)
+                self._sig_index = self._signature()
+            if self.seuil_rotation > 0:
+                self._index_a_jour()
+                if self._lignes_journal >= self.seuil_rotation:
+                    self._compacter()
+
+
+TAILLE_BLOC_LECTURE = 1 << 16
+TAILLE_MAX_ENREGISTREMENT = 1 << 20
+
+
+def iterer_scores(chemin: str, taille_bloc: int = TAILLE_BLOC_LECTURE,
+                  signaler: Optional[Callable[[str], None]] = None):
+    """Itère sur les parties d'un fichier de scores sans le charger en entier
+
+    Accepte le format tableau (scores.json) et le format une ligne par partie
+    (scores.jsonl) ; le format est reconnu au premier caractère. Les éléments qui
+    ne sont pas des objets sont ignorés, et une fin de fichier tronquée arrête la lecture
+    (le message est passé à signaler s'il est fourni, affiché sinon).
+    """
+    decodeur = json.JSONDecoder()
+    try:
+        f = open(chemin, "r", encoding="utf-8")
+    except IOError:
+        return
+    with f:
+        tampon = f.read(taille_bloc)
+        position = len(tampon) - len(tampon.lstrip())
+        tableau = tampon[position:position + 1] == "["
+        if tableau:
+            position += 1
+        fin_fichier = not tampon
+        while True:
+            # Saute les blancs et les virgules entre deux éléments
+            while True:
+                while position < len(tampon) and tampon[position] in " \t\r\n,":
+                    position += 1
+                if position < len(tampon) or fin_fichier:
+                    break
+                tampon, position = f.read(taille_bloc), 0
+                fin_fichier = not tampon
+            if position >= len(tampon) or (tableau and tampon[position] == "]"):
+                return
+            try:
+                element, fin = decodeur.raw_decode(tampon, position)
+            except ValueError:
+                if not tableau:
+                    # Format ligne : une ligne complète mais illisible est sautée tout de suite
+                    saut = tampon.find("\n", position)
+                    if saut != -1:
+                        position = saut + 1
+                        continue
+                    if fin_fichier:
+                        return
+                    if len(tampon) - position > TAILLE_MAX_ENREGISTREMENT:
+                        # Ligne démesurée : on la saute jusqu'à sa fin sans la garder en mémoire
+                        while True:
+                            tampon = f.read(taille_bloc)
+                            if not tampon:
+                                return
+                            saut = tampon.find("\n")
+                            if saut != -1:
+                                position = saut + 1
+                                break
+                        continue
+                elif fin_fichier or len(tampon) - position > TAILLE_MAX_ENREGISTREMENT:
+                    message = f"{chemin} : enregistrement illisible, lecture arrêtée"
+                    if signaler is not None:
+                        signaler(message)
+                    else:
+                        print(f"[Avertissement] {message}")
+                    return
+                bloc = f.read(taille_bloc)
+                fin_fichier = not bloc
+                tampon = tampon[position:] + bloc
+                position = 0
+                continue
+            position = fin
+            if isinstance(element, dict):
+                yield element
+
+
+class StockageFlux(Stockage):
+    """Stockage sur fichier JSON lu en flux : aucune requête ne charge tout l'historique
+
+    Chaque requête relit le fichier en une passe avec une mémoire bornée (tas de
+    taille n pour le classement, cumuls d'un seul joueur pour les statistiques).
+    Les sauvegardes sont ajoutées en place à la fin du tableau ou du journal.
+    """
+
+    @instrumenter("charger_tous")
+    def charger_tous(self) -> List[Dict[str, Any]]:
+        return list(self.iterer())
+
+    def _ecrire_lot(self, entrees: List[Dict[str, Any]]) -> None:
+        """Ajoute les entrées en fin de fichier sans le réécrire (appelé sous verrou)"""
+        with open(self.chemin, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            taille = f.tell()
+            f.seek(0)
+            debut = f.read(64).lstrip()
+            if debut[:1] != b"[":
+                self._ajouter_lignes(f, entrees)
+                return
+            # Dernier caractère utile : le ']' de fin de tableau
+            position = taille
+            while position > 0:
+                f.seek(position - 1)
+                caractere = f.read(1)
+                if caractere not in b" \t\r\n":
+                    break
+                position -= 1
+            if caractere != b"]":
+                # Tableau tronqué par un crash : réécriture complète à partir de ce qui est lisible
+                super()._ecrire_lot(entrees)
+                return
+            # Tableau vide si le caractère utile qui précède le ']' est le '[' d'ouverture
+            avant = position - 1
+            while avant > 0:
+                f.seek(avant - 1)
+                precedent = f.read(1)
+                if precedent not in b" \t\r\n":
+                    break
+                avant -= 1
+            vide = avant > 0 and precedent == b"["
+            blocs = [textwrap.indent(json.dumps(e, ensure_ascii=False, indent=2), "  ") for e in entrees]
+            ajout = ("\n" if vide else ",\n") + ",\n".join(blocs) + "\n]"
+            donnees = ajout.encode("utf-8")
+            f.seek(position - 1)
+            f.truncate()
+            f.write(donnees)
+            f.flush()
+            os.fsync(f.fileno())
+        INSTRUMENTATION.octets("sauvegarder_score", ecrits=len(donnees))
+
+    @staticmethod
+    def _ajouter_lignes(f, entrees: List[Dict[str, Any]]) -> None:
+        StockageJournal._tronquer_ligne_partielle(f)
+        f.seek(0, os.SEEK_END)
+        lignes = b"".join((json.dumps(e, ensure_ascii=False) + "\n").encode("utf-8") for e in entrees)
+        f.write(lignes)
+        f.flush()
+        os.fsync(f.fileno())
+        INSTRUMENTATION.octets("sauvegarder_score", ecrits=len(lignes))
+
+    @instrumenter("top_n")
+    def top_n(self, n: int = 10, theme: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retourne les n meilleurs scores (tas de taille n)"""
+        parties = ((IndexScores.cle(e, i), e) for i, e in enumerate(self.iterer())
+                   if not theme or e.get("theme") == theme)
+        return [e for _, e in heapq.nsmallest(max(n, 0), parties, key=lambda p: p[0])]
+
+    def rang_partie(self, id_partie: str, theme: Optional[str] = None) -> Optional[int]:
+        """Retourne le rang d'une partie (deux passes : la partie, puis celles qui la précèdent)"""
+        cible = None
+        for i, e in enumerate(self.iterer()):
+            if e.get("id_partie") == id_partie:
+                cible = IndexScores.cle(e, i)
+                if theme and e.get("theme") != theme:
+                    return None
+        if cible is None:
+            return None
+        return 1 + sum(1 for i, e in enumerate(self.iterer())
+                       if (not theme or e.get("theme") == theme) and IndexScores.cle(e, i) < cible)
+
+    def _comptes_position(self, entree: Dict[str, Any]
+                          ) -> Tuple[Tuple[int, int, int], Optional[Tuple[int, int, int]]]:
+        """Comptes en une passe (ce mode n'a pas d'index)"""
+        return ajouter_aux_comptes((0, 0, 0), (0, 0, 0) if entree.get("theme") else None, entree, self.iterer())
+
+    def obtenir_themes_depuis_scores(self) -> List[str]:
+        """Retourne tous les thèmes uniques des scores enregistrés"""
+        return sorted({e["theme"] for e in self.iterer() if e.get("theme")})
+
+    def _agregat(self, nom_joueur: str) -> AgregatJoueur:
+        agregat = AgregatJoueur(nom_joueur)
+        cle_joueur = nom_joueur.casefold()
+        for e in self.iterer():
+            if e.get("joueur_nom", "").casefold() == cle_joueur:
+                agregat.ajouter(e)
+        return agregat
+
+    def _parties_joueur(self, nom_joueur: str) -> int:
+        return self._agregat(nom_joueur).parties
+
+    def obtenir_stats_joueur(self, nom_joueur: str) -> Dict[str, Any]:
+        """Retourne les statistiques d'un joueur"""
+        agregat = self._agregat(nom_joueur)
+        return agregat.stats() if agregat.parties else {"parties": 0}
+
+    def _noms_commencant_par(self, prefixe: str, limite: int) -> List[str]:
+        """Les limite premiers noms dans l'ordre alphabétique, en une passe"""
+        prefixe = prefixe.casefold()
+        noms: Dict[str, str] = {}
+        for e in self.iterer():
+            nom = e.get("joueur_nom", "")
+            cle_joueur = nom.casefold()
+            if cle_joueur.startswith(prefixe):
+                noms[cle_joueur] = nom
+                if len(noms) > limite:
+                    del noms[max(noms)]
+        return [noms[c] for c in sorted(noms)]
+
+
+FICHIER_SQLITE = "scores.db"
+
+
+class StockageSQLite(Stockage):
+    """Stockage SQLite (mode WAL, colonnes indexées, requêtes préparées)"""
+
+    COLONNES = ("id_partie", "joueur_nom", "joueur_cle", "date_heure", "theme", "niveau",
+                "nombre_questions", "bonnes", "mauvaises", "score_total", "pourcentage",
+                "duree_seconds", "donnees")
+
+    SQL_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS scores (
+            id INTEGER PRIMARY KEY,
+            id_partie TEXT,
+            joueur_nom TEXT NOT NULL DEFAULT '',
+            joueur_cle TEXT NOT NULL DEFAULT '',
+            date_heure TEXT NOT NULL DEFAULT '',
+            theme TEXT,
+            niveau TEXT,
+            nombre_questions INTEGER,
+            bonnes INTEGER,
+            mauvaises INTEGER,
+            score_total INTEGER NOT NULL DEFAULT 0,
+            pourcentage REAL NOT NULL DEFAULT 0,
+            duree_seconds INTEGER,
+            donnees TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_scores_joueur ON scores (joueur_cle);
+        CREATE INDEX IF NOT EXISTS idx_scores_partie ON scores (id_partie);
+        CREATE INDEX IF NOT EXISTS idx_scores_date ON scores (date_heure);
+        CREATE INDEX IF NOT EXISTS idx_scores_classement
+            ON scores (score_total DESC, pourcentage DESC, date_heure, id);
+        CREATE INDEX IF NOT EXISTS idx_scores_theme_classement
+            ON scores (theme, score_total DESC, pourcentage DESC, date_heure, id);
+    """
+    SQL_INSERER = (f"INSERT INTO scores ({', '.join(COLONNES)}) "
+                   f"VALUES ({', '.join('?' for _ in COLONNES)})")
+    SQL_TOUS = "SELECT donnees FROM scores ORDER BY id"
+    SQL_TOUS_DEPUIS = "SELECT id, donnees FROM scores WHERE id > ? ORDER BY id LIMIT ?"
+    SQL_TOP = ("SELECT donnees FROM scores "
+               "ORDER BY score_total DESC, pourcentage DESC, date_heure, id LIMIT ?")
+    SQL_TOP_THEME = ("SELECT donnees FROM scores WHERE theme = ? "
+                     "ORDER BY score_total DESC, pourcentage DESC, date_heure, id LIMIT ?")
+    SQL_THEMES = "SELECT DISTINCT theme FROM scores WHERE theme IS NOT NULL AND theme != '' ORDER BY theme"
+    SQL_COMPTER_JOUEUR = "SELECT COUNT(*) FROM scores WHERE joueur_cle = ?"
+    SQL_STATS_JOUEUR = "SELECT COUNT(*), SUM(pourcentage) FROM scores WHERE joueur_cle = ?"
+    SQL_MEILLEUR_JOUEUR = ("SELECT donnees FROM scores WHERE joueur_cle = ? "
+                           "ORDER BY score_total DESC, id LIMIT 1")
+    SQL_NOM_JOUEUR = "SELECT joueur_nom FROM scores WHERE joueur_cle = ? ORDER BY id DESC LIMIT 1"
+    SQL_NOMS = ("SELECT joueur_nom, MAX(id) FROM scores WHERE joueur_cle >= ? AND joueur_cle < ? "
+                "GROUP BY joueur_cle ORDER BY joueur_cle LIMIT ?")
+    SQL_PARTIE = ("SELECT score_total, pourcentage, date_heure, id, theme FROM scores "
+                  "WHERE id_partie = ? ORDER BY id DESC LIMIT 1")
+    SQL_MIEUX_CLASSES = ("SELECT COUNT(*) FROM scores WHERE (? IS NULL OR theme = ?) AND ("
+                         "score_total > ? OR (score_total = ? AND (pourcentage > ? OR "
+                         "(pourcentage = ? AND (date_heure < ? OR (date_heure = ? AND id < ?))))))")
+    # Cinq comptages sur des plages des index de classement (pourcentages comparés au dixième)
+    SQL_POSITION = ("SELECT (SELECT COUNT(*) FROM scores WHERE {theme} score_total > ?)"
+                    " + (SELECT COUNT(*) FROM scores WHERE {theme} score_total = ? AND pourcentage >= ?),"
+                    " (SELECT COUNT(*) FROM scores WHERE {theme} score_total < ?)"
+                    " + (SELECT COUNT(*) FROM scores WHERE {theme} score_total = ? AND pourcentage < ?),"
+                    " (SELECT COUNT(*) FROM scores WHERE {theme} score_total = ?"
+                    " AND pourcentage >= ? AND pourcentage < ?)")
+    SQL_POSITION_GLOBALE = SQL_POSITION.format(theme="")
+    SQL_POSITION_THEME = SQL_POSITION.format(theme="theme = ? AND")
+
+    def __init__(self, chemin: str = FICHIER_SQLITE,
+                 ancien_chemin: Optional[str] = FICHIER_SCORES) -> None:
+        self.chemin = chemin
+        nouvelle_base = not os.path.isfile(chemin)
+        self._verrou_connexion = threading.Lock()
+        self._connexion = sqlite3.connect(chemin, timeout=30, check_same_thread=False)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("PRAGMA synchronous=NORMAL")
+        self._connexion.executescript(self.SQL_SCHEMA)
+        if nouvelle_base and ancien_chemin and os.path.isfile(ancien_chemin):
+            self._migrer_si_vide(ancien_chemin)
+
+    @classmethod
+    def _ligne(cls, entree: Dict[str, Any]) -> tuple:
+        nom = entree.get("joueur_nom", "")
+        return (entree.get("id_partie"), nom, nom.casefold(), entree.get("date_heure", ""),
+                entree.get("theme"), entree.get("niveau"), entree.get("nombre_questions"),
+                entree.get("bonnes"), entree.get("mauvaises"), entree.get("score_total", 0),
+                entree.get("pourcentage", 0), entree.get("duree_seconds"),
+                json.dumps(entree, ensure_ascii=False))
+
+    def _requete(self, sql: str, parametres: tuple = ()) -> list:
+        self.vider()
+        with self._verrou_connexion:
+            return self._connexion.execute(sql, parametres).fetchall()
+
+    def _lignes_json(self, chemin: str) -> List[tuple]:
+        """Lignes à insérer depuis un fichier scores.json existant"""
+        try:
+            with open(chemin, "r", encoding="utf-8") as f:
+                anciens = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"[Avertissement] import impossible depuis {chemin}: {e}")
+            return []
+        if not isinstance(anciens, list):
+            return []
+        return [self._ligne(e) for e in anciens if isinstance(e, dict)]
+
+    def importer_json(self, chemin: str) -> int:
+        """Importe en une transaction un fichier scores.json existant"""
+        lignes = self._lignes_json(chemin)
+        with self._verrou_connexion, self._connexion:
+            self._connexion.executemany(self.SQL_INSERER, lignes)
+        return len(lignes)
+
+    def _migrer_si_vide(self, chemin: str) -> int:
+        """Migration unique de scores.json : BEGIN IMMEDIATE sérialise les processus
+        qui démarrent ensemble, et seul celui qui trouve la table vide importe."""
+        with self._verrou_connexion:
+            self._connexion.execute("BEGIN IMMEDIATE")
+            try:
+                lignes: List[tuple] = []
+                if self._connexion.execute("SELECT 1 FROM scores LIMIT 1").fetchone() is None:
+                    lignes = self._lignes_json(chemin)
+                    self._connexion.executemany(self.SQL_INSERER, lignes)
+                self._connexion.commit()
+            except BaseException:
+                self._connexion.rollback()
+                raise
+        return len(lignes)
+
+    @instrumenter("charger_tous")
+    def charger_tous(self) -> List[Dict[str, Any]]:
+        """Charge tous les scores"""
+        return [json.loads(d) for (d,) in self._requete(self.SQL_TOUS)]
+
+    def iterer(self, taille_lot: int = 10000):
+        """Itère sur les parties par lots de taille_lot lignes (pagination par id)"""
+        dernier = 0
+        while True:
+            lignes = self._requete(self.SQL_TOUS_DEPUIS, (dernier, taille_lot))
+            for _, d in lignes:
+                yield json.loads(d)
+            if len(lignes) < taille_lot:
+                return
+            dernier = lignes[-1][0]
+
+    @instrumenter("sauvegarder_scores")
+    def sauvegarder_scores(self, entrees: List[Dict[str, Any]]) -> bool:
+        """Sauvegarde un lot de scores en une transaction"""
+        try:
+            with self._verrou_connexion, self._connexion:
+                self._connexion.executemany(self.SQL_INSERER, [self._ligne(e) for e in entrees])
+        except sqlite3.Error as e:
+            print(f"[Erreur] impossible de sauvegarder le score: {e}")
+            return False
+        self._notifier()
+        return True
+
+    def version(self) -> Any:
+        """data_version change à chaque transaction validée par une autre connexion"""
+        with self._verrou_connexion:
+            return self._connexion.execute("PRAGMA data_version").fetchone()[0]
+
+    @instrumenter("top_n")
+    def top_n(self, n: int = 10, theme: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retourne les n meilleurs scores"""
+        if theme:
+            lignes = self._requete(self.SQL_TOP_THEME, (theme, n))
+        else:
+            lignes = self._requete(self.SQL_TOP, (n,))
+        return [json.loads(d) for (d,) in lignes]
+
+    def rang_partie(self, id_partie: str, theme: Optional[str] = None) -> Optional[int]:
+        """Retourne le rang d'une partie dans le classement (global ou du thème)"""
+        lignes = self._requete(self.SQL_PARTIE, (id_partie,))
+        if not lignes:
+            return None
+        score, pourcentage, date_heure, rowid, theme_partie = lignes[0]
+        if theme and theme_partie != theme:
+            return None
+        ((mieux,),) = self._requete(self.SQL_MIEUX_CLASSES, (
+            theme or None, theme, score, score, pourcentage, pourcentage, date_heure, date_heure, rowid))
+        return mieux + 1
+
+    def _comptes_position(self, entree: Dict[str, Any]
+                          ) -> Tuple[Tuple[int, int, int], Optional[Tuple[int, int, int]]]:
+        """Comptages indexés (pas de parcours de la table)"""
+        score = entree.get("score_total", 0)
+        dixieme = round(float(entree.get("pourcentage", 0) or 0), 1)
+        haut, bas = dixieme + 0.05, dixieme - 0.05
+        parametres = (score, score, haut, score, score, bas, score, bas, haut)
+        ((mieux, moins_bien, egaux),) = self._requete(self.SQL_POSITION_GLOBALE, parametres)
+        globale = (mieux, moins_bien, mieux + moins_bien + egaux)
+        theme = entree.get("theme")
+        du_theme = None
+        if theme:
+            avec_theme = (theme, score, theme, score, haut, theme, score, theme, score, bas, theme, score, bas, haut)
+            ((mieux, moins_bien, egaux),) = self._requete(self.SQL_POSITION_THEME, avec_theme)
+            du_theme = (mieux, moins_bien, mieux + moins_bien + egaux)
+        return globale, du_theme
+
+    def obtenir_themes_depuis_scores(self) -> List[str]:
+        """Retourne tous les thèmes uniques des scores enregistrés"""
+        return [t for (t,) in self._requete(self.SQL_THEMES)]
+
+    def _parties_joueur(self, nom_joueur: str) -> int:
+        return self._requete(self.SQL_COMPTER_JOUEUR, (nom_joueur.casefold(),))[0][0]
+
+    def obtenir_stats_joueur(self, nom_joueur: str) -> Dict[str, Any]:
+        """Retourne les statistiques d'un joueur"""
+        cle_joueur = nom_joueur.casefold()
+        ((parties, somme),) = self._requete(self.SQL_STATS_JOUEUR, (cle_joueur,))
+        if not parties:
+            return {"parties": 0}
+        ((donnees,),) = self._requete(self.SQL_MEILLEUR_JOUEUR, (cle_joueur,))
+        ((nom,),) = self._requete(self.SQL_NOM_JOUEUR, (cle_joueur,))
+        meilleur = json.loads(donnees)
+        return {
+            "joueur": nom,
+            "parties": parties,
+            "meilleur_score": meilleur.get("score_total", 0),
+            "meilleur_pourcentage": meilleur.get("pourcentage", 0),
+            "moyenne_pourcentage": round(somme / parties, 1)
+        }
+
+    def _noms_commencant_par(self, prefixe: str, limite: int) -> List[str]:
+        prefixe = prefixe.casefold()
+        return [nom for nom, _ in self._requete(self.SQL_NOMS, (prefixe, prefixe + "\U0010ffff", limite))]
+
+
+DOSSIERS_SHARDS = [d.strip() for d in os.environ.get("QUISQUEYA_SHARDS", "").split(",") if d.strip()] or \
+    [os.path.join("shards", str(i)) for i in range(4)]
+# "joueur" (hachage du nom) ou "site" (un shard par site ; les écritures vont au site local)
+PARTITION_SHARDS = os.environ.get("QUISQUEYA_PARTITION", "joueur")
+SITE_LOCAL = os.environ.get("QUISQUEYA_SITE", "")
+
+
+class StockageShards(Stockage):
+    """Scores répartis sur plusieurs shards : un dossier par shard, chacun avec son journal et son index
+
+    Avec la partition "joueur", un hachage stable du nom désigne le shard qui
+    détient toutes les parties du joueur : ses statistiques ne lisent que ce shard.
+    Avec la partition "site", chaque dossier est un site (nommé par son dossier) et
+    les parties vont au shard de leur champ "site" ou, à défaut, au site local ;
+    un joueur pouvant jouer partout, ses statistiques cumulent tous les shards.
+
+    Classements, thèmes et suggestions de noms fusionnent en flux (k voies)
+    les séquences déjà triées de chaque shard.
+    """
+
+    def __init__(self, dossiers: List[str] = DOSSIERS_SHARDS, partition: str = PARTITION_SHARDS,
+                 site: str = SITE_LOCAL) -> None:
+        if partition not in ("joueur", "site"):
+            print(f"[Avertissement] partition inconnue '{partition}' – partition par joueur.")
+            partition = "joueur"
+        self.dossiers = [os.path.normpath(d) for d in dossiers]
+        self.partition = partition
+        self.chemin = self.dossiers[0]
+        # Pas de fichier propre à créer : seul l'état de base de Stockage est initialisé
+        self._memoire = threading.RLock()
+        self.shards: List[StockageJournal] = []
+        for dossier in self.dossiers:
+            os.makedirs(dossier, exist_ok=True)
+            self.shards.append(StockageJournal(os.path.join(dossier, FICHIER_JOURNAL), ancien_chemin=None))
+        self._sites = {os.path.basename(d): i for i, d in enumerate(self.dossiers)}
+        if partition == "site" and site not in self._sites:
+            site = os.path.basename(self.dossiers[0])
+        self.site = site
+
+    def numero_shard(self, entree: Dict[str, Any]) -> int:
+        """Shard auquel appartient une partie"""
+        if self.partition == "site":
+            return self._sites.get(entree.get("site") or self.site, self._sites[self.site])
+        return self._shard_joueur(entree.get("joueur_nom", ""))
+
+    def _shard_joueur(self, nom: str) -> int:
+        """Hachage stable (indépendant de PYTHONHASHSEED) du nom sans casse"""
+        empreinte = hashlib.sha256(nom.casefold().encode("utf-8")).digest()
+        return int.from_bytes(empreinte[:8], "big") % len(self.shards)
+
+    def _shards_joueur(self, nom: str) -> List[StockageJournal]:
+        if self.partition == "joueur":
+            return [self.shards[self._shard_joueur(nom)]]
+        return self.shards
+
+    @contextlib.contextmanager
+    def _index_shard(self, shard: StockageJournal):
+        """Index à jour d'un shard, sous son verrou mémoire"""
+        with shard._memoire:
+            yield shard._index_a_jour()
+
+    def iterer(self):
+        self.vider()
+        return itertools.chain.from_iterable(shard.iterer() for shard in self.shards)
+
+    @instrumenter("charger_tous")
+    def charger_tous(self) -> List[Dict[str, Any]]:
+        """Charge tous les scores, shard après shard"""
+        return list(self.iterer())
+
+    @instrumenter("sauvegarder_scores")
+    def sauvegarder_scores(self, entrees: List[Dict[str, Any]]) -> bool:
+        """Répartit le lot entre les shards ; chacun valide sa part sous son propre verrou
+
+        Les abonnés ne sont prévenus que si toutes les parts ont été écrites. La
+        mesure couvre tout le lot : chaque part est écrite sans être mesurée à nouveau.
+        """
+        par_shard: Dict[int, List[Dict[str, Any]]] = {}
+        for entree in entrees:
+            par_shard.setdefault(self.numero_shard(entree), []).append(entree)
+        ecrit = True
+        for numero, lot in sorted(par_shard.items()):
+            ecrit = Stockage.sauvegarder_scores.__wrapped__(self.shards[numero], lot) and ecrit
+        if ecrit:
+            self._notifier()
+        return ecrit
+
+    def version(self) -> Any:
+        return tuple(shard.version() for shard in self.shards)
+
+    @instrumenter("top_n")
+    def top_n(self, n: int = 10, theme: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Fusion en k voies des têtes de classement de chaque shard
+
+        À score, pourcentage et date égaux, les parties sont départagées par
+        numéro de shard puis par ordre d'arrivée dans le shard.
+        """
+        self.vider()
+        sequences = []
+        for numero, shard in enumerate(self.shards):
+            tete = shard._meilleures(n, theme)
+            sequences.append([(IndexScores.cle(e, 0)[:3], numero, i, e) for i, e in enumerate(tete)])
+        fusion = heapq.merge(*sequences, key=lambda p: p[:3])
+        return [dict(p[3]) for p in itertools.islice(fusion, max(n, 0))]
+
+    def rang_partie(self, id_partie: str, theme: Optional[str] = None) -> Optional[int]:
+        """Rang dans le classement fusionné : parties devant la partie, shard par shard
+
+        Si la partie ou une égalité avec des parties archivées échappe aux index,
+        le rang est relu dans les archives de tous les shards.
+        """
+        self.vider()
+        for proprietaire, shard in enumerate(self.shards):
+            with self._index_shard(shard) as index:
+                cle = index.cle_partie(id_partie, theme)
+                recente = cle is not None and cle[-1] >= index._restaurees
+            if cle is not None:
+                break
+        else:
+            for shard in self.shards:
+                with self._index_shard(shard) as index:
+                    if index.tronque(theme):
+                        return self._rang_flux(id_partie, theme)
+            return None
+        devant = 0
+        for numero, shard in enumerate(self.shards):
+            if numero == proprietaire:
+                borne, certaine = cle, recente
+            else:
+                # ex aequo (score, pourcentage, date) : les shards de numéro inférieur passent devant
+                borne, certaine = cle[:3] + ((float("inf"),) if numero < proprietaire else ()), None
+            with self._index_shard(shard) as index:
+                compte = index.compter_devant(borne, theme, certaine)
+            if compte is None:
+                return self._rang_flux(id_partie, theme)
+            devant += compte
+        return devant + 1
+
+    def _rang_flux(self, id_partie: str, theme: Optional[str] = None) -> Optional[int]:
+        """Rang relu dans tous les shards, dans l'ordre de top_n (clé, numéro de shard, arrivée)"""
+        def cles():
+            for numero, shard in enumerate(self.shards):
+                for i, entree in shard._parcourir(theme):
+                    yield IndexScores.cle(entree, 0)[:3] + (numero, i), entree
+
+        cible = None
+        for cle, entree in cles():
+            if entree.get("id_partie") == id_partie:
+                cible = cle
+        if cible is None:
+            return None
+        return 1 + sum(1 for cle, _ in cles() if cle < cible)
+
+    def _comptes_position(self, entree: Dict[str, Any]
+                          ) -> Tuple[Tuple[int, int, int], Optional[Tuple[int, int, int]]]:
+        """Somme des effectifs (mieux, moins bien, total) de chaque shard"""
+        self.vider()
+        globale, du_theme = [0, 0, 0], [0, 0, 0]
+        for shard in self.shards:
+            with self._index_shard(shard) as index:
+                comptes_globaux, comptes_theme = index.comptes_position(entree)
+            for i in range(3):
+                globale[i] += comptes_globaux[i]
+                if comptes_theme is not None:
+                    du_theme[i] += comptes_theme[i]
+        return tuple(globale), tuple(du_theme) if entree.get("theme") else None
+
+    def obtenir_themes_depuis_scores(self) -> List[str]:
+        """Fusion des listes de thèmes (déjà triées) de chaque shard, sans doublon"""
+        self.vider()
+        listes = []
+        for shard in self.shards:
+            with self._index_shard(shard) as index:
+                listes.append(index.themes())
+        return [theme for theme, _ in itertools.groupby(heapq.merge(*listes))]
+
+    def _agregat(self, nom_joueur: str) -> Optional[AgregatJoueur]:
+        """Cumuls du joueur, lus dans son shard (partition par joueur) ou cumulés sur tous les shards"""
+        self.vider()
+        total: Optional[AgregatJoueur] = None
+        for shard in self._shards_joueur(nom_joueur):
+            with self._index_shard(shard) as index:
+                agregat = index.joueur(nom_joueur)
+                if agregat is None:
+                    continue
+                if total is None:
+                    total = AgregatJoueur(agregat.nom)
+                if total.parties == 0 or agregat.meilleur_score > total.meilleur_score:
+                    total.meilleur_score = agregat.meilleur_score
+                    total.meilleur_pourcentage = agregat.meilleur_pourcentage
+                total.parties += agregat.parties
+                total.somme_pourcentage += agregat.somme_pourcentage
+        return total
+
+    def _parties_joueur(self, nom_joueur: str) -> int:
+        agregat = self._agregat(nom_joueur)
+        return agregat.parties if agregat else 0
+
+    def obtenir_stats_joueur(self, nom_joueur: str) -> Dict[str, Any]:
+        """Retourne les statistiques d'un joueur"""
+        agregat = self._agregat(nom_joueur)
+        return agregat.stats() if agregat else {"parties": 0}
+
+    def _noms_commencant_par(self, prefixe: str, limite: int) -> List[str]:
+        """Fusion des suggestions (triées sans casse) de chaque shard"""
+        self.vider()
+        listes = []
+        for shard in self.shards:
+            with self._index_shard(shard) as index:
+                listes.append(index.noms_commencant_par(prefixe, limite))
+        noms = (next(groupe) for _, groupe in itertools.groupby(heapq.merge(*listes, key=str.casefold),
+                                                                key=str.casefold))
+        return list(itertools.islice(noms, limite))
+
+
+# "json" (tableau réécrit à chaque partie), "jsonl" (journal append-only), "flux", "sqlite"
+# ou "shards" (journaux répartis sur plusieurs dossiers)
+MODE_STOCKAGE = os.environ.get("QUISQUEYA_STOCKAGE", "json")
+
+
+def creer_stockage(mode: str = MODE_STOCKAGE) -> Stockage:
+    """Instancie le stockage correspondant au mode configuré"""
+    if mode == "jsonl":
+        return StockageJournal()
+    if mode == "flux":
+        return StockageFlux()
+    if mode == "shards":
+        return StockageShards()
+    if mode == "sqlite":
+        if sqlite3 is not None:
+            return StockageSQLite()
+        print("[Avertissement] module sqlite3 indisponible – utilisation de json.")
+        return Stockage()
+    if mode != "json":
+        print(f"[Avertissement] mode de stockage inconnu '{mode}' – utilisation de json.")
+    return Stockage()
+
+
+# ============================================================================
+# ANALYSE DES SCORES
+# ============================================================================
+
+FICHIER_STATISTIQUES = "statistiques.json"
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+
+class HistoriqueColonnes:
+    """Historique des scores rangé en colonnes compactes (array), une ligne par partie
+
+    Thème, niveau, joueur et jour sont codés par des entiers ; les libellés
+    correspondants sont dans self.libelles. Les joueurs sont regroupés sans
+    tenir compte de la casse, sous le dernier nom affiché.
+    """
+
+    COLONNES_CODEES = ("theme", "niveau", "joueur", "jour")
+
+    def __init__(self) -> None:
+        self.scores = array("i")
+        self.pourcentages = array("d")
+        self.durees = array("i")
+        self.codes: Dict[str, array] = {c: array("i") for c in self.COLONNES_CODEES}
+        self.libelles: Dict[str, List[str]] = {c: [] for c in self.COLONNES_CODEES}
+        self._dictionnaires: Dict[str, Dict[str, int]] = {c: {} for c in self.COLONNES_CODEES}
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def _coder(self, colonne: str, cle: str, libelle: str) -> int:
+        dictionnaire = self._dictionnaires[colonne]
+        code = dictionnaire.get(cle)
+        if code is None:
+            code = dictionnaire[cle] = len(dictionnaire)
+            self.libelles[colonne].append(libelle)
+        elif colonne == "joueur":
+            self.libelles[colonne][code] = libelle
+        return code
+
+    def ajouter(self, entree: Dict[str, Any]) -> None:
+        """Ajoute une partie en fin de colonnes"""
+        self.scores.append(int(entree.get("score_total", 0) or 0))
+        self.pourcentages.append(float(entree.get("pourcentage", 0) or 0))
+        self.durees.append(int(entree.get("duree_seconds", 0) or 0))
+        theme = entree.get("theme") or ""
+        niveau = entree.get("niveau") or ""
+        nom = entree.get("joueur_nom", "")
+        jour = str(entree.get("date_heure", ""))[:10]
+        self.codes["theme"].append(self._coder("theme", theme, theme))
+        self.codes["niveau"].append(self._coder("niveau", niveau, niveau))
+        self.codes["joueur"].append(self._coder("joueur", nom.casefold(), nom))
+        self.codes["jour"].append(self._coder("jour", jour, jour))
+
+    @classmethod
+    def depuis_scores(cls, entrees) -> "HistoriqueColonnes":
+        """Construit les colonnes en une passe sur un itérable de parties"""
+        historique = cls()
+        with sans_ramasse_miettes():
+            for entree in entrees:
+                historique.ajouter(entree)
+        return historique
+
+
+def _effectifs_et_sommes(codes: array, k: int, *colonnes: array) -> Tuple[List[int], List[List[float]]]:
+    """Effectif de chacun des k codes et, pour chaque colonne, la somme de ses valeurs par code"""
+    if numpy is not None:
+        c = numpy.frombuffer(codes, dtype=codes.typecode)
+        return (numpy.bincount(c, minlength=k).tolist(),
+                [numpy.bincount(c, weights=numpy.frombuffer(v, dtype=v.typecode), minlength=k).tolist()
+                 for v in colonnes])
+    comptes = collections.Counter(codes)
+    effectifs = [comptes[code] for code in range(k)]
+    toutes_sommes = []
+    for colonne in colonnes:
+        sommes = [0.0] * k
+        for code, valeur in zip(codes, colonne):
+            sommes[code] += valeur
+        toutes_sommes.append(sommes)
+    return effectifs, toutes_sommes
+
+
+def _percentiles(valeurs: array) -> Dict[str, float]:
+    """Percentiles au rang le plus proche, par comptage des valeurs distinctes"""
+    n = len(valeurs)
+    if n == 0:
+        return {}
+    if numpy is not None:
+        distinctes, effectifs = numpy.unique(numpy.frombuffer(valeurs, dtype=valeurs.typecode), return_counts=True)
+        distinctes, effectifs = distinctes.tolist(), effectifs.tolist()
+    else:
+        comptes = collections.Counter(valeurs)
+        distinctes = sorted(comptes)
+        effectifs = [comptes[v] for v in distinctes]
+    cumuls = list(itertools.accumulate(effectifs))
+    return {f"p{p}": distinctes[bisect.bisect_left(cumuls, max(1, -(-p * n // 100)))] for p in PERCENTILES}
+
+
+def _tendances_joueurs(historique: HistoriqueColonnes) -> Dict[str, Dict[str, Any]]:
+    """Par joueur : parties, moyenne et pente (points de pourcentage gagnés par partie)
+
+    La pente est celle de la droite des moindres carrés du pourcentage en
+    fonction du numéro de la partie du joueur (0, 1, 2…) ; seuls l'effectif,
+    la somme des pourcentages et la somme des produits sont cumulés.
+    """
+    joueurs = historique.codes["joueur"]
+    k = len(historique.libelles["joueur"])
+    if numpy is not None:
+        c = numpy.frombuffer(joueurs, dtype=joueurs.typecode)
+        y = numpy.frombuffer(historique.pourcentages, dtype=historique.pourcentages.typecode)
+        effectifs = numpy.bincount(c, minlength=k)
+        ordre = numpy.argsort(c, kind="stable")
+        debuts = numpy.cumsum(effectifs) - effectifs
+        rangs = numpy.empty(len(c), dtype=numpy.float64)
+        rangs[ordre] = numpy.arange(len(c)) - debuts[c[ordre]]
+        effectifs = effectifs.tolist()
+        sommes = numpy.bincount(c, weights=y, minlength=k).tolist()
+        produits = numpy.bincount(c, weights=rangs * y, minlength=k).tolist()
+    else:
+        effectifs = [0] * k
+        sommes = [0.0] * k
+        produits = [0.0] * k
+        for code, valeur in zip(joueurs, historique.pourcentages):
+            rang = effectifs[code]
+            effectifs[code] = rang + 1
+            sommes[code] += valeur
+            produits[code] += rang * valeur
+
+    tendances = {}
+    for code, nom in enumerate(historique.libelles["joueur"]):
+        n, sy, sxy = effectifs[code], sommes[code], produits[code]
+        sx, sxx = n * (n - 1) / 2, (n - 1) * n * (2 * n - 1) / 6
+        denominateur = n * sxx - sx * sx
+        tendances[nom] = {
+            "parties": n,
+            "moyenne_pourcentage": round(sy / n, 1),
+            "pente": round((n * sxy - sx * sy) / denominateur, 3) if denominateur else 0.0
+        }
+    return tendances
+
+
+def analyser_historique(historique: HistoriqueColonnes) -> Dict[str, Any]:
+    """Rapport complet : moyennes par thème et par niveau, distribution, percentiles,
+    activité quotidienne et tendances par joueur (NumPy si disponible)"""
+    debut = time.perf_counter()
+    n = len(historique)
+
+    def moyennes(colonne: str) -> Dict[str, Dict[str, Any]]:
+        libelles = historique.libelles[colonne]
+        effectifs, (pourcentages, scores) = _effectifs_et_sommes(historique.codes[colonne], len(libelles),
+                                                                 historique.pourcentages, historique.scores)
+        return {libelle or "?": {"parties": effectifs[i],
+                                 "moyenne_pourcentage": round(pourcentages[i] / effectifs[i], 1),
+                                 "moyenne_score": round(scores[i] / effectifs[i], 2)}
+                for i, libelle in sorted(enumerate(libelles), key=lambda p: p[1]) if effectifs[i]}
+
+    # Les scores négatifs sont comptés avec 0, quel que soit le moteur
+    if numpy is not None:
+        distribution = numpy.bincount(numpy.frombuffer(historique.scores, dtype=historique.scores.typecode)
+                                      .clip(0)).tolist() if n else []
+        distribution = {str(s): e for s, e in enumerate(distribution) if e}
+    else:
+        comptes = collections.Counter(max(score, 0) for score in historique.scores)
+        distribution = {str(s): comptes[s] for s in sorted(comptes)}
+    jours = historique.libelles["jour"]
+    activite, _ = _effectifs_et_sommes(historique.codes["jour"], len(jours))
+
+    return {
+        "parties": n,
+        "moyenne_pourcentage": round(sum(historique.pourcentages) / n, 1) if n else 0.0,
+        "moyenne_score": round(sum(historique.scores) / n, 2) if n else 0.0,
+        "par_theme": moyennes("theme"),
+        "par_niveau": moyennes("niveau"),
+        "distribution_scores": distribution,
+        "percentiles_pourcentage": _percentiles(historique.pourcentages),
+        "activite_quotidienne": {jours[i]: activite[i] for i in sorted(range(len(jours)), key=jours.__getitem__)
+                                 if jours[i]},
+        "joueurs": _tendances_joueurs(historique),
+        "moteur": "numpy" if numpy is not None else "array",
+        "duree_ms": round((time.perf_counter() - debut) * 1000, 2)
+    }
+
+
+def rapport_statistiques(stockage: Stockage) -> Dict[str, Any]:
+    """Charge l'historique du stockage en colonnes puis l'analyse"""
+    with INSTRUMENTATION.phase("statistiques.chargement"):
+        historique = HistoriqueColonnes.depuis_scores(stockage.iterer())
+    with INSTRUMENTATION.phase("statistiques.analyse"):
+        return analyser_historique(historique)
+
+
+def exporter_statistiques(rapport: Dict[str, Any], chemin: str = FICHIER_STATISTIQUES) -> bool:
+    """Écrit le rapport JSON dans chemin"""
+    try:
+        with open(chemin, "w", encoding="utf-8") as f:
+            json.dump(rapport, f, ensure_ascii=False, indent=2)
+        return True
+    except IOError as e:
+        print(f"[Erreur] impossible d'écrire {chemin}: {e}")
+        return False
+
+
+# ============================================================================
+# BANQUE DE QUESTIONS
+# ============================================================================
+
+class IndexQuestions:
+    """Positions des questions par thème, par niveau et par (thème, niveau)"""
+
+    def __init__(self, questions: List[Question]) -> None:
+        self.par_theme: Dict[str, List[int]] = {}
+        self.par_niveau: Dict[str, List[int]] = {}
+        self.par_theme_niveau: Dict[Tuple[str, str], List[int]] = {}
+        for i, q in enumerate(questions):
+            self.par_theme.setdefault(q.theme, []).append(i)
+            self.par_niveau.setdefault(q.niveau, []).append(i)
+            self.par_theme_niveau.setdefault((q.theme, q.niveau), []).append(i)
+
+    def seaux(self, themes: Optional[List[str]] = None,
+              niveaux: Optional[List[str]] = None) -> Optional[List[List[int]]]:
+        """Listes de positions (disjointes) couvrant le filtre ; None si aucun filtre"""
+        if themes and niveaux:
+            return [self.par_theme_niveau[(t, n)] for t in dict.fromkeys(themes)
+                    for n in dict.fromkeys(niveaux) if (t, n) in self.par_theme_niveau]
+        if themes:
+            return [self.par_theme[t] for t in dict.fromkeys(themes) if t in self.par_theme]
+        if niveaux:
+            return [self.par_niveau[n] for n in dict.fromkeys(niveaux) if n in self.par_niveau]
+        return None
+
+
+CHAMPS_QUESTION = ("id", "theme", "niveau", "texte", "options", "bonne_option")
+
+
+def valider_question(element: Any, chemin: str) -> Tuple[Optional[tuple], Optional[str]]:
+    """Valide une entrée de question ; retourne (enregistrement, None) ou (None, avertissement)"""
+    if not isinstance(element, dict):
+        return None, f"[Avertissement] entrée mal formée dans {chemin}, id approximatif: None"
+    if not all(k in element for k in CHAMPS_QUESTION):
+        return None, f"[Avertissement] entrée mal formée dans {chemin}, id approximatif: {element.get('id')}"
+    try:
+        enregistrement = (
+            int(element["id"]),
+            str(element["theme"]),
+            str(element["niveau"]),
+            str(element["texte"]),
+            tuple(element["options"]),
+            int(element["bonne_option"])
+        )
+    except (ValueError, TypeError, KeyError) as e:
+        return None, f"[Avertissement] impossible de créer Question depuis entrée {element.get('id')}: {e}"
+    if not (0 <= enregistrement[5] < len(enregistrement[4])):
+        return None, f"[Avertissement] mauvaise bonne_option pour id {enregistrement[0]} dans {chemin} – ignorée."
+    return enregistrement, None
+
+
+def analyser_fichier_questions(chemin: str) -> Tuple[List[tuple], List[str]]:
+    """Lit et valide un fichier JSON de questions
+
+    Retourne les enregistrements valides (tuples dans l'ordre de CHAMPS_QUESTION)
+    et les avertissements, sans rien afficher.
+    """
+    enregistrements: List[tuple] = []
+    avertissements: List[str] = []
+    try:
+        with open(chemin, "r", encoding="utf-8") as f:
+            donnees = json.load(f)
+        if not isinstance(donnees, list):
+            avertissements.append(f"[Avertissement] {chemin} ne contient pas une liste de questions – ignoré.")
+            return enregistrements, avertissements
+        for element in donnees:
+            enregistrement, avertissement = valider_question(element, chemin)
+            if enregistrement is None:
+                avertissements.append(avertissement)
+            else:
+                enregistrements.append(enregistrement)
+    except (IOError, json.JSONDecodeError) as e:
+        avertissements.append(f"[Avertissement] impossible de lire {chemin}: {e}")
+    return enregistrements, avertissements
+
+
+def indexer_fichier_questions(chemin: str) -> Tuple[List[Tuple[tuple, int, int]], List[str]]:
+    """Comme analyser_fichier_questions, avec la position et la longueur en octets de chaque question"""
+    resultat: List[Tuple[tuple, int, int]] = []
+    avertissements: List[str] = []
+    try:
+        with open(chemin, "rb") as f:
+            contenu = f.read()
+        texte = contenu.decode("utf-8")
+        ascii_seul = len(texte) == len(contenu)
+        decodeur = json.JSONDecoder()
+        espaces = " \t\r\n"
+        i = len(texte) - len(texte.lstrip(espaces))
+        if not texte.startswith("[", i):
+            json.loads(texte)  # lève JSONDecodeError si le fichier est invalide
+            avertissements.append(f"[Avertissement] {chemin} ne contient pas une liste de questions – ignoré.")
+            return resultat, avertissements
+        i += 1
+        octets, dernier = i, i
+        premier = True
+        while True:
+            while i < len(texte) and texte[i] in espaces:
+                i += 1
+            if premier and texte.startswith("]", i):
+                break
+            premier = False
+            element, fin = decodeur.raw_decode(texte, i)
+            if ascii_seul:
+                debut_octets, longueur = i, fin - i
+            else:
+                octets += len(texte[dernier:i].encode("utf-8"))
+                debut_octets, longueur = octets, len(texte[i:fin].encode("utf-8"))
+                octets, dernier = octets + longueur, fin
+            enregistrement, avertissement = valider_question(element, chemin)
+            if enregistrement is None:
+                avertissements.append(avertissement)
+            else:
+                resultat.append((enregistrement, debut_octets, longueur))
+            i = fin
+            while i < len(texte) and texte[i] in espaces:
+                i += 1
+            if texte.startswith(",", i):
+                i += 1
+            elif texte.startswith("]", i):
+                break
+            else:
+                raise json.JSONDecodeError("',' ou ']' attendu", texte, i)
+        if texte[i + 1:].strip(espaces):
+            raise json.JSONDecodeError("données après la fin de la liste", texte, i + 1)
+    except (IOError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        return [], [f"[Avertissement] impossible de lire {chemin}: {e}"]
+    return resultat, avertissements
+
+
+def analyser_fichier_chronometre(chemin: str) -> Tuple[List[tuple], List[str], float]:
+    """analyser_fichier_questions avec sa durée (exécutable dans un processus fils)"""
+    debut = time.perf_counter()
+    enregistrements, avertissements = analyser_fichier_questions(chemin)
+    return enregistrements, avertissements, time.perf_counter() - debut
+
+
+# 0 ou 1 : chargement séquentiel ; N > 1 : analyse des fichiers sur N processus
+PROCESSUS_CHARGEMENT = int(os.environ.get("QUISQUEYA_PROCESSUS", "0") or 0)
+
+FICHIER_CACHE_BANQUE = ".banque.cache"
+SIGNATURE_CACHE = b"QQCACHE2"
+
+
+def cle_fichier(chemin: str) -> Optional[Tuple[int, int]]:
+    """(mtime, taille) d'un fichier, ou None s'il est inaccessible"""
+    try:
+        st = os.stat(chemin)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class CacheBanque:
+    """Instantané compilé et validé de la banque, indexé par fichier, mtime et taille
+
+    Chaque entrée associe le nom d'un fichier source à
+    (mtime_ns, taille, enregistrements, avertissements).
+    """
+
+    def __init__(self, dossier: str, processus: int = PROCESSUS_CHARGEMENT) -> None:
+        self.dossier = dossier
+        self.chemin = os.path.join(dossier, FICHIER_CACHE_BANQUE)
+        self.processus = processus
+        self.durees: List[Tuple[str, float, int]] = []
+
+    def lister_sources(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.dossier, "*.json")))
+
+    def lire(self) -> Dict[str, tuple]:
+        """Lit le cache ; retourne {} s'il est absent, corrompu ou d'une autre version"""
+        try:
+            with open(self.chemin, "rb") as f:
+                contenu = f.read()
+        except IOError:
+            return {}
+        entete = len(SIGNATURE_CACHE)
+        if contenu[:entete] != SIGNATURE_CACHE:
+            return {}
+        empreinte, charge = contenu[entete:entete + 32], contenu[entete + 32:]
+        if hashlib.sha256(charge).digest() != empreinte:
+            return {}
+        try:
+            with sans_ramasse_miettes():
+                donnees = marshal.loads(charge)
+        except (ValueError, EOFError, TypeError):
+            return {}
+        if not isinstance(donnees, dict) or donnees.get("version") != tuple(sys.version_info[:2]):
+            return {}
+        return donnees.get("fichiers", {})
+
+    def ecrire(self, fichiers: Dict[str, tuple]) -> bool:
+        """Écrit le cache de façon atomique ; retourne False si le dossier est en lecture seule"""
+        charge = marshal.dumps({"version": tuple(sys.version_info[:2]), "fichiers": fichiers})
+        temp = f"{self.chemin}.{os.getpid()}.tmp"
+        try:
+            with open(temp, "wb") as f:
+                f.write(SIGNATURE_CACHE + hashlib.sha256(charge).digest() + charge)
+            os.replace(temp, self.chemin)
+            return True
+        except OSError:
+            return False
+
+    def _analyser(self, chemins: List[str]) -> List[Tuple[List[tuple], List[str], float]]:
+        """Analyse les fichiers, sur un pool de processus si configuré (ordre conservé)"""
+        if self.processus > 1 and len(chemins) > 1:
+            try:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=self.processus) as pool:
+                    taille_lot = max(1, len(chemins) // (self.processus * 4))
+                    return list(pool.map(analyser_fichier_chronometre, chemins, chunksize=taille_lot))
+            except (OSError, NotImplementedError, concurrent.futures.process.BrokenProcessPool):
+                pass
+        return [analyser_fichier_chronometre(c) for c in chemins]
+
+    def actualiser(self, cache: Dict[str, tuple]) -> Dict[str, tuple]:
+        """Réutilise les entrées à jour et n'analyse que les fichiers ajoutés ou modifiés
+
+        La durée d'analyse de chaque fichier relu est notée dans self.durees
+        sous la forme (chemin, secondes, taille en octets).
+        """
+        resultat: Dict[str, tuple] = {}
+        a_analyser: List[Tuple[str, str, Tuple[int, int]]] = []
+        for chemin in self.lister_sources():
+            nom = os.path.basename(chemin)
+            cle = cle_fichier(chemin) or (0, 0)
+            entree = cache.get(nom)
+            if entree is None or tuple(entree[:2]) != cle:
+                a_analyser.append((nom, chemin, cle))
+                entree = None
+            resultat[nom] = entree
+
+        analyses = self._analyser([chemin for _, chemin, _ in a_analyser])
+        self.durees = []
+        for (nom, chemin, cle), (enregistrements, avertissements, duree) in zip(a_analyser, analyses):
+            resultat[nom] = cle + (enregistrements, avertissements)
+            self.durees.append((chemin, duree, cle[1]))
+            # Durées mesurées dans le processus qui a analysé le fichier, notées ici
+            if INSTRUMENTATION.active:
+                INSTRUMENTATION.enregistrer("analyser_fichier_questions", duree)
+                INSTRUMENTATION.octets("analyser_fichier_questions", lus=cle[1])
+        return resultat
+
+    def compiler(self) -> int:
+        """Reconstruit entièrement le cache ; retourne le nombre de fichiers"""
+        fichiers = self.actualiser({})
+        if not self.ecrire(fichiers):
+            raise IOError(f"impossible d'écrire {self.chemin}")
+        return len(fichiers)
+
+    def verifier(self) -> List[str]:
+        """Compare le cache aux fichiers sources ; retourne la liste des problèmes"""
+        if not os.path.isfile(self.chemin):
+            return [f"{self.chemin} absent"]
+        problemes: List[str] = []
+        cache = self.lire()
+        if not cache:
+            problemes.append(f"{self.chemin} illisible, corrompu ou d'une autre version de Python")
+        sources = {os.path.basename(c): c for c in self.lister_sources()}
+        for nom in sorted(set(cache) - set(sources)):
+            problemes.append(f"{nom} : présent dans le cache mais supprimé")
+        for nom, chemin in sources.items():
+            entree = cache.get(nom)
+            if entree is None:
+                problemes.append(f"{nom} : absent du cache")
+            elif tuple(entree[:2]) != cle_fichier(chemin):
+                problemes.append(f"{nom} : modifié depuis la compilation")
+            elif (list(entree[2]), list(entree[3])) != analyser_fichier_questions(chemin):
+                problemes.append(f"{nom} : contenu du cache différent du fichier")
+        return problemes
+
+
+BITS_PAGE_VUES = 1024
+PAGE_VUES = struct.Struct(f"<q{BITS_PAGE_VUES // 8}s")
+SIGNATURE_VUES = b"QQVUES01"
+SANS_REPETITION = os.environ.get("QUISQUEYA_SANS_REPETITION", "1").lower() not in ("0", "non", "false")
+ESSAIS_PAR_QUESTION = 8
+
+
+class VuesJoueur:
+    """Questions déjà posées à un joueur : bitset paginé indexé par id de question
+
+    Un bit par id, par pages de BITS_PAGE_VUES bits : seules les pages où le
+    joueur a vu au moins une question existent.
+    """
+
+    def __init__(self, nom: str, pages: Optional[Dict[int, bytearray]] = None) -> None:
+        self.nom = nom
+        self.pages: Dict[int, bytearray] = pages if pages is not None else {}
+        self.modifie = False
+
+    def __contains__(self, identifiant: int) -> bool:
+        page = self.pages.get(identifiant // BITS_PAGE_VUES)
+        bit = identifiant % BITS_PAGE_VUES
+        return page is not None and page[bit >> 3] >> (bit & 7) & 1 == 1
+
+    def ajouter(self, identifiant: int) -> None:
+        page = self.pages.get(identifiant // BITS_PAGE_VUES)
+        if page is None:
+            page = self.pages[identifiant // BITS_PAGE_VUES] = bytearray(BITS_PAGE_VUES // 8)
+        bit = identifiant % BITS_PAGE_VUES
+        page[bit >> 3] |= 1 << (bit & 7)
+        self.modifie = True
+
+    def retirer(self, identifiant: int) -> None:
+        page = self.pages.get(identifiant // BITS_PAGE_VUES)
+        if page is not None:
+            bit = identifiant % BITS_PAGE_VUES
+            page[bit >> 3] &= ~(1 << (bit & 7)) & 0xFF
+            self.modifie = True
+
+    def __len__(self) -> int:
+        return sum(bin(int.from_bytes(page, "little")).count("1") for page in self.pages.values())
+
+
+class MemoireVues:
+    """Questions vues par chaque joueur, un petit fichier binaire par joueur
+
+    Le dossier est placé à côté du stockage des scores. Un fichier ne contient
+    que les pages non vides : quelques centaines d'octets pour un joueur régulier.
+    """
+
+    def __init__(self, dossier: str) -> None:
+        self.dossier = dossier
+        self._verrou = threading.Lock()
+
+    def _chemin(self, nom: str) -> str:
+        empreinte = hashlib.sha256(nom.casefold().encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self.dossier, f"{empreinte}.vues")
+
+    def charger(self, nom: str) -> VuesJoueur:
+        """Vues du joueur (vides si le fichier est absent ou illisible)"""
+        try:
+            with open(self._chemin(nom), "rb") as f:
+                contenu = f.read()
+        except IOError:
+            return VuesJoueur(nom)
+        entete = len(SIGNATURE_VUES)
+        if contenu[:entete] != SIGNATURE_VUES or (len(contenu) - entete) % PAGE_VUES.size:
+            return VuesJoueur(nom)
+        return VuesJoueur(nom, {numero: bytearray(bits) for numero, bits in PAGE_VUES.iter_unpack(contenu[entete:])})
+
+    def enregistrer(self, vues: VuesJoueur) -> None:
+        """Réécrit le fichier du joueur s'il a changé (écriture atomique)"""
+        if not vues.modifie:
+            return
+        chemin = self._chemin(vues.nom)
+        contenu = SIGNATURE_VUES + b"".join(PAGE_VUES.pack(numero, bytes(bits))
+                                            for numero, bits in sorted(vues.pages.items()) if any(bits))
+        try:
+            with self._verrou:
+                os.makedirs(self.dossier, exist_ok=True)
+                temp = f"{chemin}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp, "wb") as f:
+                    f.write(contenu)
+                os.replace(temp, chemin)
+            vues.modifie = False
+        except OSError as e:
+            print(f"[Avertissement] impossible d'enregistrer les questions vues de {vues.nom}: {e}")
+
+
+QUESTIONS_PAR_PARTIE = max(1, int(os.environ.get("QUISQUEYA_QUESTIONS", "10") or 10))
+
+
+def questions_pour_joueur(bq: "BanqueQuestions", stockage: Stockage, joueur: str,
+                          themes: Optional[List[str]] = None,
+                          nombre: int = QUESTIONS_PAR_PARTIE) -> Tuple[List[Question], Optional[VuesJoueur]]:
+    """Tire les questions d'une partie en évitant celles que le joueur a déjà vues
+
+    Retourne aussi les vues du joueur (None sans SANS_REPETITION) : rien n'est
+    écrit au tirage, marquer_questions_vues le fait quand la partie est terminée.
+    """
+    if not SANS_REPETITION:
+        return bq.echantillonner_questions(nombre, themes), None
+    vues = stockage.memoire_vues().charger(joueur)
+    return bq.echantillonner_questions(nombre, themes, vues=vues), vues
+
+
+def marquer_questions_vues(stockage: Stockage, vues: Optional[VuesJoueur], questions: List[Question]) -> None:
+    """Enregistre les questions d'une partie terminée comme vues (une partie abandonnée ne compte pas)"""
+    if vues is None:
+        return
+    for q in questions:
+        vues.ajouter(q.id)
+    stockage.memoire_vues().enregistrer(vues)
+
+
+def tirer_sans_repetition(total: int, nombre: int, identifiant: Callable[[int], int],
+                          vues: Optional[VuesJoueur], generateur: Any) -> List[int]:
+    """Tire min(nombre, total) rangs distincts de range(total), en évitant les questions vues
+
+    Tirage par rejet avec un budget de ESSAIS_PAR_QUESTION essais par question :
+    tant que le joueur n'a pas vu l'essentiel du pool, le coût reste O(nombre).
+    Budget épuisé : le joueur a presque tout vu. Un petit pool (au plus de la
+    taille du budget) est balayé : les dernières questions jamais vues sont
+    prises, puis ses vues sont effacées (nouveau cycle). Un grand pool n'est
+    jamais balayé : la partie est complétée au hasard et les questions vues
+    rencontrées pendant les essais sont effacées, ce qui renouvelle le pool au
+    fil des parties. Le coût reste O(nombre) dans tous les cas.
+    Les vues ne sont modifiées qu'en mémoire, et les rangs retenus ne sont pas
+    marqués : voir marquer_questions_vues.
+    """
+    nombre = min(nombre, total)
+    if vues is None or nombre == total:
+        return generateur.sample(range(total), nombre)
+    retenus: Dict[int, None] = {}
+    essais = ESSAIS_PAR_QUESTION * nombre + 16
+    deja_vus: List[int] = []
+    for _ in range(essais):
+        tirage = generateur.randrange(total)
+        if tirage in retenus:
+            continue
+        if identifiant(tirage) in vues:
+            deja_vus.append(tirage)
+            continue
+        retenus[tirage] = None
+        if len(retenus) == nombre:
+            return list(retenus)
+    if total <= essais:
+        jamais_vus = [t for t in range(total) if t not in retenus and identifiant(t) not in vues]
+        retenus.update(dict.fromkeys(generateur.sample(jamais_vus, min(nombre - len(retenus), len(jamais_vus)))))
+        for tirage in range(total):
+            if tirage not in retenus:
+                vues.retirer(identifiant(tirage))
+        reste = [t for t in range(total) if t not in retenus]
+        retenus.update(dict.fromkeys(generateur.sample(reste, nombre - len(retenus))))
+    else:
+        for tirage in deja_vus:
+            vues.retirer(identifiant(tirage))
+        while len(retenus) < nombre:
+            retenus[generateur.randrange(total)] = None
+    return list(retenus)
+
+
+class BanqueQuestions:
+    """Gère le chargement et la sélection des questions
+
+    Les questions et leurs index forment un instantané (questions, index)
+    remplacé d'un seul coup par recharger() : une lecture en cours voit
+    toujours l'ancienne banque ou la nouvelle, jamais un mélange.
+    """
+
+    _arret_surveillance: Optional[threading.Event] = None
+
+    def __init__(self, dossier: str = "questions", utiliser_cache: bool = True,
+                 processus: int = PROCESSUS_CHARGEMENT) -> None:
+        self.dossier = dossier
+        self.utiliser_cache = utiliser_cache
+        self.cache = CacheBanque(dossier, processus)
+        self._fichiers: Dict[str, tuple] = {}
+        self._par_fichier: Dict[str, List[Question]] = {}
+        self._instantane: Tuple[List[Question], IndexQuestions] = ([], IndexQuestions([]))
+        self._verrou_rechargement = threading.Lock()
+        self._charger_questions()
+
+    @property
+    def questions(self) -> List[Question]:
+        return self._instantane[0]
+
+    @property
+    def index(self) -> IndexQuestions:
+        return self._instantane[1]
+
+    @property
+    def durees_chargement(self) -> List[Tuple[str, float, int]]:
+        """(chemin, secondes, octets) des fichiers analysés au dernier chargement"""
+        return self.cache.durees
+
+    def _publier(self, questions: List[Question]) -> None:
+        """Remplace atomiquement l'instantané de la banque"""
+        self._instantane = (questions, IndexQuestions(questions))
+
+    @instrumenter("_charger_questions")
+    def _charger_questions(self) -> None:
+        """Charge les questions depuis les fichiers JSON (via le cache compilé si possible)"""
+        if os.path.isdir(self.dossier):
+            self._actualiser(self.cache.lire() if self.utiliser_cache else {})
+        elif os.path.isfile("questions.json"):
+            self._charger_fichier("questions.json")
+
+    def _actualiser(self, ancien: Dict[str, tuple]) -> Dict[str, List[str]]:
+        """Relit les fichiers ajoutés ou modifiés depuis ancien et publie la nouvelle banque
+
+        Les questions des fichiers inchangés sont reprises telles quelles ;
+        retourne les noms des fichiers ajoutés, modifiés et supprimés.
+        """
+        fichiers = self.cache.actualiser(ancien)
+        INSTRUMENTATION.octets("_charger_questions", lus=sum(d[2] for d in self.cache.durees))
+        relus = {os.path.basename(chemin) for chemin, _, _ in self.cache.durees}
+        par_fichier: Dict[str, List[Question]] = {}
+        with sans_ramasse_miettes():
+            for nom, entree in fichiers.items():
+                questions = self._par_fichier.get(nom)
+                if questions is None or nom in relus:
+                    questions = self._creer(entree[2], entree[3])
+                par_fichier[nom] = questions
+        self._publier([q for questions in par_fichier.values() for q in questions])
+        if self.utiliser_cache and fichiers != ancien:
+            self.cache.ecrire(fichiers)
+        changements = {
+            "ajoutes": sorted(set(fichiers) - set(self._fichiers)),
+            "modifies": sorted(relus & set(self._fichiers)),
+            "supprimes": sorted(set(self._fichiers) - set(fichiers))
+        }
+        self._fichiers, self._par_fichier = fichiers, par_fichier
+        return changements
+
+    @staticmethod
+    def _creer(enregistrements: List[tuple], avertissements: List[str]) -> List[Question]:
+        for avertissement in avertissements:
+            ECRAN.ligne(avertissement)
+        return [Question(*e) for e in enregistrements]
+
+    @instrumenter("_charger_fichier")
+    def _charger_fichier(self, chemin: str) -> None:
+        """Charge un fichier JSON de questions"""
+        INSTRUMENTATION.octets("_charger_fichier", lus=os.path.getsize(chemin))
+        self._publier(self.questions + self._creer(*analyser_fichier_questions(chemin)))
+
+    @instrumenter("recharger")
+    def recharger(self) -> Dict[str, List[str]]:
+        """Prend en compte les fichiers ajoutés, modifiés ou supprimés sans redémarrer
+
+        Seuls les fichiers dont le mtime ou la taille a changé sont relus. Les
+        parties en cours gardent les questions qu'elles ont déjà tirées.
+        """
+        if not os.path.isdir(self.dossier):
+            return {"ajoutes": [], "modifies": [], "supprimes": []}
+        with self._verrou_rechargement:
+            return self._actualiser(self._fichiers)
+
+    def demarrer_surveillance(self, intervalle: float) -> None:
+        """Recharge la banque toutes les intervalle secondes dans un thread dédié"""
+        if self._arret_surveillance is not None or intervalle <= 0:
+            return
+        arret = self._arret_surveillance = threading.Event()
+
+        def surveiller() -> None:
+            while not arret.wait(intervalle):
+                try:
+                    self.recharger()
+                except Exception as e:  # le thread doit survivre à un fichier illisible
+                    print(f"[Erreur] rechargement des questions impossible: {e}")
+
+        threading.Thread(target=surveiller, name="quisqueya-surveillance", daemon=True).start()
+
+    def arreter_surveillance(self) -> None:
+        if self._arret_surveillance is not None:
+            self._arret_surveillance.set()
+            self._arret_surveillance = None
+
+    def lister_themes(self) -> List[str]:
+        """Retourne la liste des thèmes disponibles"""
+        return sorted(self.index.par_theme)
+
+    def filtrer(self, themes: Optional[List[str]] = None,
+                niveaux: Optional[List[str]] = None) -> List[Question]:
+        """Filtre les questions par thème et/ou niveau"""
+        questions, index = self._instantane
+        seaux = index.seaux(themes, niveaux)
+        if seaux is None:
+            return questions
+        return [questions[i] for i in heapq.merge(*seaux)]
+
+    def echantillonner_questions(self, nombre: int = 10, themes: Optional[List[str]] = None,
+                                 niveaux: Optional[List[str]] = None,
+                                 generateur: Optional[random.Random] = None,
+                                 vues: Optional[VuesJoueur] = None) -> List[Question]:
+        """Retourne jusqu'à nombre questions, tirées directement dans les index
+
+        Avec vues, les questions déjà posées au joueur sont évitées (voir tirer_sans_repetition).
+        """
+        questions, index = self._instantane
+        seaux = index.seaux(themes, niveaux)
+        if seaux is None:
+            seaux = [range(len(questions))]
+        bornes = list(itertools.accumulate(len(s) for s in seaux))
+        total = bornes[-1] if bornes else 0
+        if total == 0:
+            return []
+
+        def question(tirage: int) -> Question:
+            j = bisect.bisect_right(bornes, tirage)
+            debut = bornes[j - 1] if j else 0
+            return questions[seaux[j][tirage - debut]]
+
+        tirages = tirer_sans_repetition(total, int(nombre), lambda t: question(t).id, vues, generateur or random)
+        return [question(t) for t in tirages]
+
+    def nombre_questions(self) -> int:
+        """Nombre total de questions disponibles"""
+        return len(self.questions)
+
+
+FICHIER_MANIFESTE = ".manifeste"
+SIGNATURE_MANIFESTE = b"QQMANIF2"
+POSITION = struct.Struct("<qqq")
+
+
+def liberer_positions(positions: Any, chemin: str) -> None:
+    """Ferme une table de positions devenue inutile et supprime son fichier"""
+    if isinstance(positions, mmap.mmap):
+        positions.close()
+    try:
+        os.remove(chemin)
+    except OSError:
+        pass
+
+
+class ManifesteBanque:
+    """Manifeste de la banque : thèmes, niveaux, effectifs et positions des questions
+
+    Le manifeste (marshal) décrit chaque fichier source :
+    nom -> (mtime_ns, taille, avertissements, {(thème, niveau): (début, nombre)}).
+    Les positions (offset, longueur en octets, id) de chaque question sont rangées,
+    seau par seau, dans un fichier binaire séparé lu par mmap : seuls les
+    effectifs restent en mémoire.
+    """
+
+    def __init__(self, dossier: str) -> None:
+        self.dossier = dossier
+        self.chemin = os.path.join(dossier, FICHIER_MANIFESTE)
+        self.fichiers: Dict[str, tuple] = {}
+        self.chemin_positions: Optional[str] = None
+        self._positions: Any = b""
+        self._seaux: Dict[tuple, List[Tuple[str, int, int]]] = {}
+
+    def lire(self) -> bool:
+        """Charge le manifeste existant ; retourne False s'il est absent ou invalide"""
+        try:
+            with open(self.chemin, "rb") as f:
+                contenu = f.read()
+        except IOError:
+            return False
+        entete = len(SIGNATURE_MANIFESTE)
+        charge = contenu[entete + 32:]
+        if contenu[:entete] != SIGNATURE_MANIFESTE or hashlib.sha256(charge).digest() != contenu[entete:entete + 32]:
+            return False
+        try:
+            donnees = marshal.loads(charge)
+        except (ValueError, EOFError, TypeError):
+            return False
+        if not isinstance(donnees, dict) or donnees.get("version") != tuple(sys.version_info[:2]):
+            return False
+        chemin_positions = os.path.join(self.dossier, donnees["positions"])
+        try:
+            self._ouvrir_positions(chemin_positions)
+        except (IOError, ValueError):
+            return False
+        self.fichiers = donnees["fichiers"]
+        self._seaux = {}
+        return True
+
+    def _ouvrir_positions(self, chemin: str) -> None:
+        with open(chemin, "rb") as f:
+            taille = os.fstat(f.fileno()).st_size
+            self._positions = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if taille else b""
+        self.chemin_positions = chemin
+
+    def est_a_jour(self) -> bool:
+        sources = {os.path.basename(c): c for c in glob.glob(os.path.join(self.dossier, "*.json"))}
+        if set(sources) != set(self.fichiers):
+            return False
+        return all(tuple(self.fichiers[nom][:2]) == cle_fichier(c) for nom, c in sources.items())
+
+    def actualiser(self) -> bool:
+        """Lit le manifeste et le reconstruit si des fichiers ont changé ; retourne True si reconstruit"""
+        if self.lire() and self.est_a_jour():
+            return False
+        self.reconstruire()
+        return True
+
+    def reconstruire(self, fermer_ancien: bool = True) -> None:
+        """Réécrit le manifeste en ne réindexant que les fichiers ajoutés ou modifiés
+
+        Avec fermer_ancien=False, l'ancienne table de positions n'est ni fermée ni
+        supprimée : une copie du manifeste encore utilisée par un autre thread reste
+        lisible, et c'est à l'appelant de la libérer (voir liberer_positions).
+        """
+        anciens, anciennes_positions = self.fichiers, self._positions
+        generation = f"{time.time_ns():x}"
+        nom_positions = f"{FICHIER_MANIFESTE}.{generation}.pos"
+        chemin_positions = os.path.join(self.dossier, nom_positions)
+        fichiers: Dict[str, tuple] = {}
+        nombre_total = 0
+        with open(chemin_positions, "wb") as sortie:
+            for chemin in sorted(glob.glob(os.path.join(self.dossier, "*.json"))):
+                nom = os.path.basename(chemin)
+                cle = cle_fichier(chemin) or (0, 0)
+                seaux: Dict[Tuple[str, str], Tuple[int, int]] = {}
+                ancien = anciens.get(nom)
+                if ancien is not None and tuple(ancien[:2]) == cle:
+                    avertissements = ancien[2]
+                    for cle_seau, (debut, nombre) in ancien[3].items():
+                        sortie.write(anciennes_positions[debut * POSITION.size:(debut + nombre) * POSITION.size])
+                        seaux[cle_seau] = (nombre_total, nombre)
+                        nombre_total += nombre
+                else:
+                    with INSTRUMENTATION.phase("indexer_fichier_questions"):
+                        entrees, avertissements = indexer_fichier_questions(chemin)
+                    INSTRUMENTATION.octets("indexer_fichier_questions", lus=cle[1])
+                    groupes: Dict[Tuple[str, str], array] = {}
+                    for enregistrement, offset, longueur in entrees:
+                        groupes.setdefault((enregistrement[1], enregistrement[2]), array("q")).extend(
+                            (offset, longueur, enregistrement[0]))
+                    for cle_seau, tableau in groupes.items():
+                        if sys.byteorder == "big":
+                            tableau.byteswap()
+                        sortie.write(tableau.tobytes())
+                        seaux[cle_seau] = (nombre_total, len(tableau) // 3)
+                        nombre_total += len(tableau) // 3
+                fichiers[nom] = (cle[0], cle[1], avertissements, seaux)
+
+        charge = marshal.dumps({"version": tuple(sys.version_info[:2]),
+                                "positions": nom_positions, "fichiers": fichiers})
+        temp = f"{self.chemin}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(SIGNATURE_MANIFESTE + hashlib.sha256(charge).digest() + charge)
+        os.replace(temp, self.chemin)
+        ancien_chemin = self.chemin_positions
+        self.fichiers = fichiers
+        self._seaux = {}
+        self._ouvrir_positions(chemin_positions)
+        if fermer_ancien and ancien_chemin and ancien_chemin != chemin_positions:
+            liberer_positions(anciennes_positions, ancien_chemin)
+
+    def avertissements(self) -> List[str]:
+        return [a for nom in sorted(self.fichiers) for a in self.fichiers[nom][2]]
+
+    def themes(self) -> List[str]:
+        return sorted({theme for f in self.fichiers.values() for (theme, _) in f[3]})
+
+    def seaux(self, themes: Optional[List[str]] = None,
+              niveaux: Optional[List[str]] = None) -> List[Tuple[str, int, int]]:
+        """(fichier, début, nombre) des seaux correspondant au filtre, dans l'ordre des fichiers
+
+        Le résultat est mis en cache par filtre jusqu'au prochain chargement du manifeste.
+        """
+        cle = (tuple(sorted(set(themes))) if themes else None, tuple(sorted(set(niveaux))) if niveaux else None)
+        resultat = self._seaux.get(cle)
+        if resultat is not None:
+            return resultat
+        resultat = []
+        for nom in sorted(self.fichiers):
+            for (theme, niveau), (debut, nombre) in self.fichiers[nom][3].items():
+                if (not themes or theme in themes) and (not niveaux or niveau in niveaux):
+                    resultat.append((nom, debut, nombre))
+        if len(self._seaux) >= 256:
+            self._seaux.clear()
+        self._seaux[cle] = resultat
+        return resultat
+
+    def position(self, indice: int) -> Tuple[int, int]:
+        return POSITION.unpack_from(self._positions, indice * POSITION.size)[:2]
+
+    def identifiant(self, indice: int) -> int:
+        return POSITION.unpack_from(self._positions, indice * POSITION.size)[2]
+
+
+class BanqueQuestionsParesseuse(BanqueQuestions):
+    """Banque qui ne lit le corps des questions qu'au moment d'une partie
+
+    Thèmes et effectifs viennent du manifeste ; chaque question tirée est relue
+    directement à sa position dans son fichier source.
+    """
+
+    def __init__(self, dossier: str = "questions") -> None:
+        self.dossier = dossier
+        self.manifeste = ManifesteBanque(dossier)
+        self._verrou_rechargement = threading.Lock()
+        if os.path.isdir(dossier):
+            self.manifeste.actualiser()
+        for avertissement in self.manifeste.avertissements():
+            ECRAN.ligne(avertissement)
+
+    @instrumenter("recharger")
+    def recharger(self) -> Dict[str, List[str]]:
+        """Reconstruit le manifeste sur une copie, puis la substitue à l'ancien"""
+        with self._verrou_rechargement:
+            ancien = self.manifeste
+            if not os.path.isdir(self.dossier) or ancien.est_a_jour():
+                return {"ajoutes": [], "modifies": [], "supprimes": []}
+            nouveau = ManifesteBanque(self.dossier)
+            nouveau.fichiers, nouveau._positions = ancien.fichiers, ancien._positions
+            nouveau.chemin_positions = ancien.chemin_positions
+            nouveau.reconstruire(fermer_ancien=False)
+            self.manifeste = nouveau
+            # L'ancienne table est libérée quand plus aucune lecture n'utilise l'ancien manifeste
+            weakref.finalize(ancien, liberer_positions, ancien._positions, ancien.chemin_positions)
+        avant, apres = ancien.fichiers, nouveau.fichiers
+        for nom in sorted(apres):
+            if nom not in avant or avant[nom][:2] != apres[nom][:2]:
+                for avertissement in apres[nom][2]:
+                    ECRAN.ligne(avertissement)
+        return {
+            "ajoutes": sorted(set(apres) - set(avant)),
+            "modifies": sorted(n for n in set(apres) & set(avant) if avant[n][:2] != apres[n][:2]),
+            "supprimes": sorted(set(avant) - set(apres))
+        }
+
+    @property
+    def questions(self) -> List[Question]:  # type: ignore[override]
+        """Toutes les questions (charge la banque entière : à éviter sur les grosses banques)"""
+        return self.filtrer()
+
+    def nombre_questions(self) -> int:
+        return sum(nombre for _, _, nombre in self.manifeste.seaux())
+
+    def lister_themes(self) -> List[str]:
+        """Retourne la liste des thèmes disponibles (depuis le manifeste seul)"""
+        return self.manifeste.themes()
+
+    def _lire(self, manifeste: ManifesteBanque,
+              references: List[Tuple[str, int]]) -> Optional[List[Question]]:
+        """Relit les questions (fichier, indice de position) en regroupant les lectures par fichier
+
+        Retourne None si un fichier a changé ou disparu depuis le manifeste (les
+        positions ne valent plus rien : il faut recharger). Un enregistrement devenu illisible
+        malgré tout (fichier modifié pendant la lecture) est ignoré.
+        """
+        resultat: List[Optional[Question]] = [None] * len(references)
+        par_fichier: Dict[str, List[int]] = {}
+        for rang, (nom, _) in enumerate(references):
+            par_fichier.setdefault(nom, []).append(rang)
+        for nom, rangs in par_fichier.items():
+            chemin = os.path.join(self.dossier, nom)
+            if cle_fichier(chemin) != tuple(manifeste.fichiers[nom][:2]):
+                return None
+            try:
+                f = open(chemin, "rb")
+            except OSError:
+                # Fichier supprimé depuis la vérification : même traitement qu'un fichier modifié
+                return None
+            with f:
+                for rang in rangs:
+                    offset, longueur = manifeste.position(references[rang][1])
+                    f.seek(offset)
+                    try:
+                        enregistrement, _ = valider_question(json.loads(f.read(longueur)), chemin)
+                    except ValueError:
+                        continue
+                    if enregistrement is not None:
+                        resultat[rang] = Question(*enregistrement)
+        return [q for q in resultat if q is not None]
+
+    def _lire_a_jour(self, choisir: Callable[[ManifesteBanque], List[Tuple[str, int]]]) -> List[Question]:
+        """Lit les questions choisies dans le manifeste courant ; si un fichier a changé
+        sans rechargement, recharge la banque puis choisit à nouveau"""
+        for _ in range(3):
+            manifeste = self.manifeste
+            questions = self._lire(manifeste, choisir(manifeste))
+            if questions is not None:
+                return questions
+            self.recharger()
+        return []
+
+    def filtrer(self, themes: Optional[List[str]] = None,
+                niveaux: Optional[List[str]] = None) -> List[Question]:
+        """Charge les questions du filtre, dans l'ordre des fichiers"""
+        def choisir(manifeste: ManifesteBanque) -> List[Tuple[str, int]]:
+            references = []
+            for nom, debut, nombre in manifeste.seaux(themes, niveaux):
+                positions = [(manifeste.position(i)[0], i) for i in range(debut, debut + nombre)]
+                references.append([(nom, offset, i) for offset, i in positions])
+            return [(nom, i) for nom, _, i in heapq.merge(*references)]
+
+        return self._lire_a_jour(choisir)
+
+    def echantillonner_questions(self, nombre: int = 10, themes: Optional[List[str]] = None,
+                                 niveaux: Optional[List[str]] = None,
+                                 generateur: Optional[random.Random] = None,
+                                 vues: Optional[VuesJoueur] = None) -> List[Question]:
+        """Tire jusqu'à nombre questions et ne lit que celles-ci (les id viennent du manifeste)"""
+        def choisir(manifeste: ManifesteBanque) -> List[Tuple[str, int]]:
+            seaux = manifeste.seaux(themes, niveaux)
+            bornes = list(itertools.accumulate(n for _, _, n in seaux))
+            total = bornes[-1] if bornes else 0
+            if total == 0:
+                return []
+
+            def reference(tirage: int) -> Tuple[str, int]:
+                j = bisect.bisect_right(bornes, tirage)
+                avant = bornes[j - 1] if j else 0
+                nom, debut, _ = seaux[j]
+                return nom, debut + tirage - avant
+
+            tirages = tirer_sans_repetition(total, int(nombre), lambda t: manifeste.identifiant(reference(t)[1]),
+                                            vues, generateur or random)
+            return [reference(t) for t in tirages]
+
+        return self._lire_a_jour(choisir)
+
+
+# "complete" (toutes les questions en mémoire) ou "paresseuse" (manifeste + lecture à la demande)
+MODE_BANQUE = os.environ.get("QUISQUEYA_BANQUE", "complete")
+# Intervalle (secondes) de la surveillance du dossier questions/ ; 0 : rechargement manuel seulement
+INTERVALLE_RECHARGEMENT = float(os.environ.get("QUISQUEYA_RECHARGEMENT", "0") or 0)
+
+
+def creer_banque(dossier: str = "questions", mode: str = MODE_BANQUE) -> BanqueQuestions:
+    """Instancie la banque de questions correspondant au mode configuré"""
+    if mode == "paresseuse":
+        return BanqueQuestionsParesseuse(dossier)
+    if mode != "complete":
+        print(f"[Avertissement] mode de banque inconnu '{mode}' – chargement complet.")
+    return BanqueQuestions(dossier)
+
+
+def mesurer_memoire_questions(nombre: int = 20000) -> Dict[str, float]:
+    """Octets par question : ancienne représentation (dataclass + __dict__ + liste) contre Question"""
+    import tracemalloc
+
+    @dataclass
+    class QuestionAncienne:
+        id: int
+        theme: str
+        niveau: str
+        texte: str
+        options: List[str]
+        bonne_option: int
+
+    niveaux = ("Facile", "Moyen", "Difficile")
+    source = json.dumps([
+        {"id": i, "theme": f"Thème {i % 12}", "niveau": niveaux[i % 3],
+         "texte": f"Texte de la question numéro {i} ?", "options": [f"Option {j}" for j in range(4)],
+         "bonne_option": i % 4}
+        for i in range(nombre)
+    ])
+
+    def mesurer(fabrique) -> float:
+        donnees = json.loads(source)
+        tracemalloc.start()
+        avant = tracemalloc.get_traced_memory()[0]
+        objets = [fabrique(e["id"], e["theme"], e["niveau"], e["texte"], e["options"], e["bonne_option"])
+                  for e in donnees]
+        del donnees
+        apres = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del objets
+        return (apres - avant) / nombre
+
+    ancienne = mesurer(lambda *c: QuestionAncienne(*c[:4], list(c[4]), c[5]))
+    compacte = mesurer(Question)
+    return {"questions": nombre, "octets_avant": round(ancienne, 1), "octets_apres": round(compacte, 1)}
+
+
+# ============================================================================
+# VALIDATION NOM DU JOUEUR
+# ============================================================================
+
+def obtenir_nom_joueur(stockage: Stockage) -> Optional[str]:
+    """Demande et valide le nom du joueur avec gestion des doublons"""
+    while True:
+        joueur = saisie_securisee("👤 Entrez votre nom ou pseudo : ").strip()
+
+        if not joueur:
+            joueur = "Joueur"
+
+        occurrences = stockage.compter_occurrences_joueur(joueur)
+
+        if occurrences == 0:
+            suggestions = stockage.suggerer_noms(joueur)
+            if suggestions:
+                ECRAN.ligne(f"\n Noms déjà enregistrés : {', '.join(suggestions)}")
+                ECRAN.ligne("   (saisissez l'un d'eux pour retrouver vos statistiques)")
+            ECRAN.ligne(f"\n Bienvenue {joueur} ! C'est votre première partie.\n")
+            RYTHME.pause(1)
+            return joueur
+
+        elif occurrences == 1:
+            stats = stockage.obtenir_stats_joueur(joueur)
+            ECRAN.ligne(f"\n️  Le nom '{joueur}' est déjà enregistré avec 1 partie.")
+            ECRAN.ligne(f"   Meilleur score : {stats['meilleur_score']} points ({stats['meilleur_pourcentage']}%)")
+            ECRAN.ligne("\n Êtes-vous cette même personne ?")
+            ECRAN.ligne("   1) Oui, c'est moi - continuer avec ce nom")
+            ECRAN.ligne("   2) Non, choisir un autre nom")
+            ECRAN.ligne("   0) Annuler et retourner au menu\n")
+
+            choix = entier_securise("➤ Votre choix : ", val_min=0, val_max=2)
+
+            if choix == 1:
+                ECRAN.ligne(f"\n Bon retour {joueur} !\n")
+                RYTHME.pause(1)
+                return joueur
+            elif choix == 2:
+                ECRAN.ligne("\n Veuillez choisir un autre nom.\n")
+                continue
+            else:
                 return None
 
         else:
             stats = stockage.obtenir_stats_joueur(joueur)
-            print(f"\n️  Le nom '{joueur}' est déjà enregistré avec {occurrences} parties.")
-            print(f"   Meilleur score : {stats['meilleur_score']} points ({stats['meilleur_pourcentage']}%)")
-            print(f"   Moyenne : {stats['moyenne_pourcentage']}%")
-            print("\n Êtes-vous cette même personne ?")
-            print("   1) Oui, c'est moi - continuer avec ce nom")
-            print("   2) Non, choisir un autre nom")
-            print("   0) Annuler et retourner au menu\n")
+            ECRAN.ligne(f"\n️  Le nom '{joueur}' est déjà enregistré avec {occurrences} parties.")
+            ECRAN.ligne(f"   Meilleur score : {stats['meilleur_score']} points ({stats['meilleur_pourcentage']}%)")
+            ECRAN.ligne(f"   Moyenne : {stats['moyenne_pourcentage']}%")
+            ECRAN.ligne("\n Êtes-vous cette même personne ?")
+            ECRAN.ligne("   1) Oui, c'est moi - continuer avec ce nom")
+            ECRAN.ligne("   2) Non, choisir un autre nom")
+            ECRAN.ligne("   0) Annuler et retourner au menu\n")
+
+            choix = entier_securise("➤ Votre choix : ", val_min=0, val_max=2)
+
+            if choix == 1:
+                ECRAN.ligne(f"\n Bon retour {joueur} ! Vous avez déjà joué {occurrences} parties.\n")
+                RYTHME.pause(1)
+                return joueur
+            elif choix == 2:
+                ECRAN.ligne("\n Veuillez choisir un autre nom.\n")
+                continue
+            else:
+                return None
+
+
+# ============================================================================
+# MOTEUR DE JEU (sans entrées/sorties)
+# ============================================================================
+
+class RythmeInteractif:
+    """Pauses réelles entre les écrans de la console"""
+
+    def pause(self, secondes: float) -> None:
+        ECRAN.afficher()
+        time.sleep(secondes)
+
+
+class RythmeInstantane:
+    """Aucune pause : simulations, tests et serveurs"""
+
+    def pause(self, secondes: float) -> None:
+        pass
+
+
+RYTHME = RythmeInteractif()
+
+
+@dataclass
+class Retour:
+    correcte: bool
+    bonne_option: int
+    texte_bonne_option: str
+    index: int
+    termine: bool
+
+
+class MoteurQuiz:
+    """Déroulement d'une partie : aucune saisie, aucun affichage, aucune pause
+
+    L'horloge (secondes depuis l'époque) est injectable pour rejouer ou
+    simuler des parties hors du temps réel.
+    """
+
+    def __init__(self, questions: List[Question], nom_joueur: str,
+                 horloge: Callable[[], float] = time.time) -> None:
+        self.questions = questions
+        self.nom_joueur = nom_joueur
+        self.horloge = horloge
+        self.score = 0
+        self.bonnes = 0
+        self.mauvaises = 0
+        self.position = 0
+        self.interrompu = False
+        self.horodatage_debut: Optional[float] = None
+        self.horodatage_fin: Optional[float] = None
+
+    @property
+    def total(self) -> int:
+        return len(self.questions)
+
+    @property
+    def termine(self) -> bool:
+        return self.interrompu or self.position >= self.total
+
+    @property
+    def question_courante(self) -> Optional[Question]:
+        return None if self.termine else self.questions[self.position]
+
+    @property
+    def pourcentage(self) -> float:
+        return round((self.bonnes / self.total) * 100, 1) if self.total > 0 else 0.0
+
+    @property
+    def duree(self) -> int:
+        if self.horodatage_debut is None:
+            return 0
+        fin = self.horodatage_fin if self.horodatage_fin is not None else self.horloge()
+        return int(fin - self.horodatage_debut)
+
+    def demarrer(self) -> None:
+        self.horodatage_debut = self.horloge()
+
+    def soumettre(self, choix: int) -> Retour:
+        """Enregistre la réponse (index d'option à partir de 0) à la question courante"""
+        q = self.question_courante
+        if q is None:
+            raise ValueError("aucune question en cours")
+        if choix < 0 or choix >= len(q.options):
+            raise ValueError(f"choix hors limites : entre 1 et {len(q.options)}")
+        correcte = choix == q.bonne_option
+        if correcte:
+            self.bonnes += 1
+            self.score += 1
+        else:
+            self.mauvaises += 1
+        self.position += 1
+        texte = q.options[q.bonne_option] if 0 <= q.bonne_option < len(q.options) else "Inconnue"
+        return Retour(correcte, q.bonne_option, texte, self.position, self.termine)
+
+    def interrompre(self) -> None:
+        self.interrompu = True
+
+    def terminer(self) -> Optional[Dict[str, Any]]:
+        """Clôt la partie ; retourne l'entrée de score (None si la partie a été interrompue)"""
+        self.horodatage_fin = self.horloge()
+        if self.interrompu:
+            return None
+        return {
+            "id_partie": f"{self.nom_joueur}_{int(self.horodatage_fin)}",
+            "joueur_nom": self.nom_joueur,
+            "date_heure": datetime.fromtimestamp(self.horodatage_fin, timezone.utc).isoformat(),
+            "theme": self.questions[0].theme if len(set(q.theme for q in self.questions)) == 1 else "mix",
+            "niveau": self.questions[0].niveau if len(set(q.niveau for q in self.questions)) == 1 else "mix",
+            "nombre_questions": self.total,
+            "bonnes": self.bonnes,
+            "mauvaises": self.mauvaises,
+            "score_total": self.score,
+            "pourcentage": self.pourcentage,
+            "duree_seconds": self.duree
+        }
 
-            choix = entier_securise("➤ Votre choix : ", val_min=0, val_max=2)
 
-            if choix == 1:
-                print(f"\n Bon retour {joueur} ! Vous avez déjà joué {occurrences} parties.\n")
-                time.sleep(1)
-                return joueur
-            elif choix == 2:
-                print("\n Veuillez choisir un autre nom.\n")
-                continue
+def simuler_sessions(bq: BanqueQuestions, nombre: int, stockage: Optional[Stockage] = None,
+                     generateur: Optional[random.Random] = None, taux_reussite: float = 0.6,
+                     themes: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Joue nombre parties simulées sans pause ; retourne le débit obtenu"""
+    generateur = generateur or random.Random()
+    horloge_simulee = itertools.count(int(time.time()))
+    entrees = 0
+    debut = time.perf_counter()
+    for i in range(nombre):
+        questions = bq.echantillonner_questions(QUESTIONS_PAR_PARTIE, themes, generateur=generateur)
+        if not questions:
+            break
+        moteur = MoteurQuiz(questions, f"Simulation{i % 1000}", horloge=lambda: float(next(horloge_simulee)))
+        moteur.demarrer()
+        while not moteur.termine:
+            q = moteur.question_courante
+            if generateur.random() < taux_reussite:
+                moteur.soumettre(q.bonne_option)
             else:
-                return None
+                moteur.soumettre((q.bonne_option + 1) % len(q.options))
+        entree = moteur.terminer()
+        if stockage is not None and entree is not None:
+            stockage.sauvegarder_score(entree)
+        entrees += 1
+    duree = time.perf_counter() - debut
+    return {"sessions": entrees, "secondes": round(duree, 4),
+            "sessions_par_seconde": round(entrees / duree, 1) if duree > 0 else None}
 
 
 # ============================================================================
 # JEU DE QUIZ
 # ============================================================================
 
+def garder_position(position: Dict[str, Any]) -> Dict[str, Any]:
+    """Champs de position enregistrés avec la partie (rangs et percentiles, sans les effectifs)"""
+    return {cle: valeur for cle, valeur in position.items() if not cle.startswith("parties_")}
+
+
+def lignes_position(position: Dict[str, Any], theme: Optional[str]) -> List[str]:
+    """Lignes « où en suis-je ? » du résumé de fin de partie"""
+    def rang(r: int) -> str:
+        return f"{r}{'er' if r == 1 else 'e'}"
+
+    lignes = [f"Classement : {rang(position['rang_global'])} sur {position['parties_global'] + 1} partie(s) "
+              f"(meilleur que {position['percentile_global']}% des parties)"]
+    if "rang_theme" in position and theme != "mix":
+        lignes.append(f"Thème {theme} : {rang(position['rang_theme'])} sur {position['parties_theme'] + 1} "
+                      f"(meilleur que {position['percentile_theme']}%)")
+    return lignes
+
+
 class JeuQuiz:
-    def __init__(self, questions: List[Question], nom_joueur: str, stockage: Stockage) -> None:
+    """Interface console d'une partie, construite sur MoteurQuiz"""
+
+    def __init__(self, questions: List[Question], nom_joueur: str, stockage: Stockage,
+                 rythme: Optional[Any] = None, horloge: Callable[[], float] = time.time,
+                 vues: Optional[VuesJoueur] = None) -> None:
+        self.moteur = MoteurQuiz(questions, nom_joueur, horloge)
         self.questions = questions
         self.nom_joueur = nom_joueur
         self.stockage = stockage
-        self.score = 0
-        self.bonnes = 0
-        self.mauvaises = 0
-        self.horodatage_debut: Optional[float] = None
-        self.horodatage_fin: Optional[float] = None
+        self.rythme = rythme or RYTHME
+        self.vues = vues
+
+    @property
+    def score(self) -> int:
+        return self.moteur.score
+
+    @property
+    def bonnes(self) -> int:
+        return self.moteur.bonnes
+
+    @property
+    def mauvaises(self) -> int:
+        return self.moteur.mauvaises
 
     def poser_question(self, q: Question, index: int, total: int) -> bool:
         """Pose une question et retourne True si on continue, False si on abandonne"""
-        print("\n" + "=" * 60)
-        print(q.formater_pour_affichage(index, total))
-        print(" Tapez '0' ou 'Q' pour abandonner le quiz\n")
+        ECRAN.ligne("\n" + "=" * 60)
+        ECRAN.ligne(q.formater_pour_affichage(index, total))
+        ECRAN.ligne(" Tapez '0' ou 'Q' pour abandonner le quiz\n")
 
         while True:
             reponse = saisie_securisee("Ta réponse (nombre) : ")
@@ -347,98 +3585,94 @@ class JeuQuiz:
             if reponse.strip().upper() in ['0', 'Q', 'QUIT', 'QUITTER']:
                 confirmer = saisie_securisee("\n️  Voulez-vous vraiment interrompre le quiz ? (O/N) : ").strip().upper()
                 if confirmer in ['O', 'OUI', 'Y', 'YES']:
-                    print("\n Quiz interrompu. Retour au menu...\n")
-                    time.sleep(1)
+                    ECRAN.ligne("\n Quiz interrompu. Retour au menu...\n")
+                    self.rythme.pause(1)
+                    self.moteur.interrompre()
                     return False
-                print("\n Continuons le quiz !\n")
-                time.sleep(0.5)
-                print("\n" + "=" * 60)
-                print(q.formater_pour_affichage(index, total))
-                print(" Tapez '0' ou 'Q' pour abandonner le quiz\n")
+                ECRAN.ligne("\n Continuons le quiz !\n")
+                self.rythme.pause(0.5)
+                ECRAN.ligne("\n" + "=" * 60)
+                ECRAN.ligne(q.formater_pour_affichage(index, total))
+                ECRAN.ligne(" Tapez '0' ou 'Q' pour abandonner le quiz\n")
                 continue
 
             try:
-                choix = int(reponse.strip()) - 1
+                retour = self.moteur.soumettre(int(reponse.strip()) - 1)
             except ValueError:
-                print(f" Choix invalide ! Veuillez entrer un nombre entre 1 et {len(q.options)}.")
-                time.sleep(1)
-                continue
-
-            if choix < 0 or choix >= len(q.options):
-                print(f" Choix invalide ! Veuillez entrer un nombre entre 1 et {len(q.options)}.")
-                time.sleep(1)
+                ECRAN.ligne(f" Choix invalide ! Veuillez entrer un nombre entre 1 et {len(q.options)}.")
+                self.rythme.pause(1)
                 continue
 
-            if choix == q.bonne_option:
-                print(" Bonne réponse !")
-                self.bonnes += 1
-                self.score += 1
+            if retour.correcte:
+                ECRAN.ligne(" Bonne réponse !")
             else:
-                correcte = q.options[q.bonne_option] if 0 <= q.bonne_option < len(q.options) else "Inconnue"
-                print(f" Mauvaise réponse. La bonne était: {correcte}")
-                self.mauvaises += 1
-            time.sleep(1.1)
+                ECRAN.ligne(f" Mauvaise réponse. La bonne était: {retour.texte_bonne_option}")
+            self.rythme.pause(1.1)
             return True
 
     def jouer(self) -> Optional[Dict[str, Any]]:
         """Lance le quiz et retourne les résultats"""
-        self.horodatage_debut = time.time()
-        total = len(self.questions)
-        print(f"\nDébut de la partie – joueur : {self.nom_joueur} – {total} questions")
-        time.sleep(0.8)
-
-        quiz_interrompu = False
-        for i, q in enumerate(self.questions, start=1):
-            doit_continuer = self.poser_question(q, i, total)
-            if not doit_continuer:
-                quiz_interrompu = True
+        with INSTRUMENTATION.phase("jeu.demarrage"):
+            self.moteur.demarrer()
+        total = self.moteur.total
+        ECRAN.ligne(f"\nDébut de la partie – joueur : {self.nom_joueur} – {total} questions")
+        self.rythme.pause(0.8)
+
+        while not self.moteur.termine:
+            q = self.moteur.question_courante
+            with INSTRUMENTATION.phase("jeu.question"):
+                continuer = self.poser_question(q, self.moteur.position + 1, total)
+            if not continuer:
                 break
 
-        self.horodatage_fin = time.time()
-        duree = int(self.horodatage_fin - self.horodatage_debut) if self.horodatage_debut else 0
-
-        if quiz_interrompu:
-            print("\n" + "=" * 60)
-            print(" QUIZ INTERROMPU")
-            print("=" * 60)
-            print(f"\nVous avez répondu à {self.bonnes + self.mauvaises} question(s) sur {total}")
-            print(f"Bonnes réponses : {self.bonnes}")
-            print("Le score n'a pas été enregistré.")
-            print("\n" + "=" * 60)
-            input("\nAppuie sur Entrée pour revenir au menu principal...")
+        with INSTRUMENTATION.phase("jeu.fin"):
+            entree = self.moteur.terminer()
+
+        if entree is None:
+            ECRAN.ligne("\n" + "=" * 60)
+            ECRAN.ligne(" QUIZ INTERROMPU")
+            ECRAN.ligne("=" * 60)
+            ECRAN.ligne(f"\nVous avez répondu à {self.bonnes + self.mauvaises} question(s) sur {total}")
+            ECRAN.ligne(f"Bonnes réponses : {self.bonnes}")
+            ECRAN.ligne("Le score n'a pas été enregistré.")
+            ECRAN.ligne("\n" + "=" * 60)
+            ECRAN.saisir("\nAppuie sur Entrée pour revenir au menu principal...")
             return None
 
-        pourcentage = round((self.bonnes / total) * 100, 1) if total > 0 else 0.0
-        print("\n" + "=" * 60)
-        print("=== RÉSUMÉ DE LA PARTIE ===")
-        print("=" * 60)
-        print(f"\nJoueur : {self.nom_joueur}")
-        print(f"Bonnes réponses : {self.bonnes}/{total} ({pourcentage}%)")
-        print(f"Mauvaises réponses : {self.mauvaises}/{total}")
-        print(f"Score total : {self.score}")
-        print(f"Durée : {duree} s")
-
-        entree: Dict[str, Any] = {
-            "id_partie": f"{self.nom_joueur}_{int(time.time())}",
-            "joueur_nom": self.nom_joueur,
-            "date_heure": datetime.now(timezone.utc).isoformat(),
-            "theme": self.questions[0].theme if len(set(q.theme for q in self.questions)) == 1 else "mix",
-            "niveau": self.questions[0].niveau if len(set(q.niveau for q in self.questions)) == 1 else "mix",
-            "nombre_questions": total,
-            "bonnes": self.bonnes,
-            "mauvaises": self.mauvaises,
-            "score_total": self.score,
-            "pourcentage": pourcentage,
-            "duree_seconds": duree
-        }
+        marquer_questions_vues(self.stockage, self.vues, self.questions)
+        with INSTRUMENTATION.phase("jeu.classement"):
+            position = self.stockage.positionner(entree)
+        entree.update(garder_position(position))
+
+        ECRAN.ligne("\n" + "=" * 60)
+        ECRAN.ligne("=== RÉSUMÉ DE LA PARTIE ===")
+        ECRAN.ligne("=" * 60)
+        ECRAN.ligne(f"\nJoueur : {self.nom_joueur}")
+        ECRAN.ligne(f"Bonnes réponses : {self.bonnes}/{total} ({entree['pourcentage']}%)")
+        ECRAN.ligne(f"Mauvaises réponses : {self.mauvaises}/{total}")
+        ECRAN.ligne(f"Score total : {self.score}")
+        ECRAN.ligne(f"Durée : {entree['duree_seconds']} s")
+        for ligne in lignes_position(position, entree.get("theme")):
+            ECRAN.ligne(ligne)
+
+        ECRAN.afficher()
         try:
-            self.stockage.sauvegarder_score(entree)
-            print("\n Score enregistré avec succès !")
+            with INSTRUMENTATION.phase("jeu.sauvegarde"):
+                accepte = self.stockage.sauvegarder_score(entree)
+            if not accepte:
+                ECRAN.ligne("\n[Erreur] le score n'a pas pu être enregistré.")
+            elif self.stockage.ecriture_differee:
+                ECRAN.ligne("\n Score transmis : il est écrit sur le disque en arrière-plan.")
+            else:
+                ECRAN.ligne("\n Score enregistré avec succès !")
         except IOError as e:
-            print(f"\n[Erreur] impossible de sauvegarder le score: {e}")
+            ECRAN.ligne(f"\n[Erreur] impossible de sauvegarder le score: {e}")
+        echecs = self.stockage.echecs_ecriture()
+        if echecs:
+            ECRAN.ligne(f"[Erreur] {echecs} score(s) de parties précédentes n'ont pas pu être écrits.")
 
-        print("\n" + "=" * 60)
-        input("\nAppuie sur Entrée pour revenir au menu principal...")
+        ECRAN.ligne("\n" + "=" * 60)
+        ECRAN.saisir("\nAppuie sur Entrée pour revenir au menu principal...")
         return entree
 
 
@@ -448,33 +3682,33 @@ class JeuQuiz:
 
 def ecran_bienvenue() -> None:
     """Affiche l'écran de bienvenue"""
-    print("\n╔" + "═" * 60 + "╗")
-    print("║" + " " * 60 + "║")
-    print("║" + "     BIENVENUE DANS QUISQUEYA QUIZ SYSTÈME     ".center(60) + "║")
-    print("║" + " " * 60 + "║")
-    print("╚" + "═" * 60 + "╝")
-    print("\n Appuyez sur [ENTRÉE] pour commencer\n")
-    input()
+    ECRAN.ligne("\n╔" + "═" * 60 + "╗")
+    ECRAN.ligne("║" + " " * 60 + "║")
+    ECRAN.ligne("║" + "     BIENVENUE DANS QUISQUEYA QUIZ SYSTÈME     ".center(60) + "║")
+    ECRAN.ligne("║" + " " * 60 + "║")
+    ECRAN.ligne("╚" + "═" * 60 + "╝")
+    ECRAN.ligne("\n Appuyez sur [ENTRÉE] pour commencer\n")
+    ECRAN.saisir()
 
 
 def jouer_mode_rapide(bq: BanqueQuestions, stockage: Stockage) -> None:
-    """Lance le mode rapide (10 questions aléatoires)"""
-    print("\n" + "═" * 60)
-    print("⚡ MODE RAPIDE - 10 QUESTIONS".center(60))
-    print("═" * 60 + "\n")
+    """Lance le mode rapide (QUESTIONS_PAR_PARTIE questions aléatoires)"""
+    ECRAN.ligne("\n" + "═" * 60)
+    ECRAN.ligne(f"⚡ MODE RAPIDE - {QUESTIONS_PAR_PARTIE} QUESTIONS".center(60))
+    ECRAN.ligne("═" * 60 + "\n")
 
     joueur = obtenir_nom_joueur(stockage)
     if joueur is None:
         return
 
-    liste_questions = bq.echantillonner_questions(nombre=10, themes=None)
+    liste_questions, vues = questions_pour_joueur(bq, stockage, joueur)
     if not liste_questions:
-        print("\n Aucune question disponible.")
-        input("\n Appuyez sur [ENTRÉE] pour revenir...")
+        ECRAN.ligne("\n Aucune question disponible.")
+        ECRAN.saisir("\n Appuyez sur [ENTRÉE] pour revenir...")
         return
-    print(f"\n🎮 Démarrage de la partie avec {len(liste_questions)} questions aléatoires...")
-    time.sleep(1)
-    jeu = JeuQuiz(liste_questions, joueur, stockage)
+    ECRAN.ligne(f"\n🎮 Démarrage de la partie avec {len(liste_questions)} questions aléatoires...")
+    RYTHME.pause(1)
+    jeu = JeuQuiz(liste_questions, joueur, stockage, vues=vues)
     jeu.jouer()
 
 
@@ -482,10 +3716,10 @@ def jouer_mode_theme(bq: BanqueQuestions, stockage: Stockage) -> None:
     """Lance le mode par thème"""
     themes = bq.lister_themes()
     if not themes:
-        print(" Aucun thème disponible.")
-        input("Appuyez sur [ENTRÉE] pour revenir...")
+        ECRAN.ligne(" Aucun thème disponible.")
+        ECRAN.saisir("Appuyez sur [ENTRÉE] pour revenir...")
         return
-    print("\nSélection du thème du quiz")
+    ECRAN.ligne("\nSélection du thème du quiz")
     idx = choisir_dans_liste(themes, invite="➤ Choisissez un thème : ", autoriser_zero_retour=True)
     if idx is None:
         return
@@ -494,20 +3728,20 @@ def jouer_mode_theme(bq: BanqueQuestions, stockage: Stockage) -> None:
     if joueur is None:
         return
 
-    liste_questions = bq.echantillonner_questions(nombre=10, themes=[themes[idx]])
+    liste_questions, vues = questions_pour_joueur(bq, stockage, joueur, [themes[idx]])
     if not liste_questions:
-        print(" Aucune question disponible pour ce thème.")
-        input("Appuyez sur [ENTRÉE] pour revenir...")
+        ECRAN.ligne(" Aucune question disponible pour ce thème.")
+        ECRAN.saisir("Appuyez sur [ENTRÉE] pour revenir...")
         return
-    jeu = JeuQuiz(liste_questions, joueur, stockage)
+    jeu = JeuQuiz(liste_questions, joueur, stockage, vues=vues)
     jeu.jouer()
 
 
 def afficher_classement(bq: BanqueQuestions, stockage: Stockage) -> None:
     """Affiche le classement des meilleurs scores"""
-    print("\n" + "═" * 60)
-    print(" CLASSEMENT DES MEILLEURS SCORES".center(60))
-    print("═" * 60 + "\n")
+    ECRAN.ligne("\n" + "═" * 60)
+    ECRAN.ligne(" CLASSEMENT DES MEILLEURS SCORES".center(60))
+    ECRAN.ligne("═" * 60 + "\n")
 
     n = entier_securise(
         " Combien de scores voulez-vous voir ? (1-50, défaut: 10) : ",
@@ -518,16 +3752,16 @@ def afficher_classement(bq: BanqueQuestions, stockage: Stockage) -> None:
     themes_scores = stockage.obtenir_themes_depuis_scores()
     tous_themes = sorted(set(themes_questions + themes_scores))
 
-    print("\n" + "─" * 60)
-    print(" FILTRER PAR THÈME")
-    print("─" * 60 + "\n")
+    ECRAN.ligne("\n" + "─" * 60)
+    ECRAN.ligne(" FILTRER PAR THÈME")
+    ECRAN.ligne("─" * 60 + "\n")
 
     if not tous_themes:
-        print(" Aucun thème disponible.")
+        ECRAN.ligne(" Aucun thème disponible.")
         theme = None
     else:
         options_theme = ["Tous les thèmes"] + tous_themes
-        print("Thèmes disponibles :\n")
+        ECRAN.ligne("Thèmes disponibles :\n")
         idx = choisir_dans_liste(
             options_theme,
             invite="➤ Choisissez un thème (ou 0 pour annuler) : ",
@@ -541,92 +3775,212 @@ def afficher_classement(bq: BanqueQuestions, stockage: Stockage) -> None:
 
     top = stockage.top_n(n, theme)
 
-    print("\n" + "─" * 60)
+    ECRAN.ligne("\n" + "─" * 60)
     if not top:
-        print("\n Aucun score enregistré pour le moment.")
-        print("   Jouez une partie pour apparaître dans le classement !")
+        ECRAN.ligne("\n Aucun score enregistré pour le moment.")
+        ECRAN.ligne("   Jouez une partie pour apparaître dans le classement !")
     else:
-        print(f" Thème : {theme}" if theme else " Tous les thèmes")
-        print("─" * 60 + "\n")
+        ECRAN.ligne(f" Thème : {theme}" if theme else " Tous les thèmes")
+        ECRAN.ligne("─" * 60 + "\n")
         for i, s in enumerate(top, start=1):
             pourc_str = f"{s.get('pourcentage', 'N/A')}%"
             medaille = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-            print(f"{medaille} {s.get('joueur_nom')}")
-            print(f"   Score : {s.get('score_total')} points")
-            print(f"   Réussite : {s.get('bonnes')}/{s.get('nombre_questions')} ({pourc_str})")
-            print(f"   Date : {s.get('date_heure', '')[:10]}")
-            print(f"   Thème : {s.get('theme')}\n")
-    print("─" * 60)
-    input("\n Appuyez sur [ENTRÉE] pour revenir au menu principal...")
+            ECRAN.ligne(f"{medaille} {s.get('joueur_nom')}")
+            ECRAN.ligne(f"   Score : {s.get('score_total')} points")
+            ECRAN.ligne(f"   Réussite : {s.get('bonnes')}/{s.get('nombre_questions')} ({pourc_str})")
+            ECRAN.ligne(f"   Date : {s.get('date_heure', '')[:10]}")
+            ECRAN.ligne(f"   Thème : {s.get('theme')}\n")
+    ECRAN.ligne("─" * 60)
+    ECRAN.saisir("\n Appuyez sur [ENTRÉE] pour revenir au menu principal...")
+
+
+def afficher_statistiques(stockage: Stockage) -> None:
+    """Affiche les statistiques de tout l'historique et propose l'export JSON"""
+    ECRAN.ligne("\n" + "═" * 60)
+    ECRAN.ligne(" STATISTIQUES".center(60))
+    ECRAN.ligne("═" * 60 + "\n")
+
+    rapport = rapport_statistiques(stockage)
+    if not rapport["parties"]:
+        ECRAN.ligne(" Aucun score enregistré pour le moment.")
+        ECRAN.saisir("\n Appuyez sur [ENTRÉE] pour revenir au menu principal...")
+        return
+
+    ECRAN.ligne(f" Parties : {rapport['parties']}   Moyenne : {rapport['moyenne_pourcentage']}% "
+                f"({rapport['moyenne_score']} points)")
+    ECRAN.ligne(" Percentiles : " + "  ".join(f"{p}={v}%" for p, v in rapport["percentiles_pourcentage"].items()))
+    for titre, cle in ((" PAR THÈME", "par_theme"), (" PAR NIVEAU", "par_niveau")):
+        ECRAN.ligne("\n" + "─" * 60)
+        ECRAN.ligne(titre)
+        ECRAN.ligne("─" * 60)
+        for libelle, m in rapport[cle].items():
+            ECRAN.ligne(f"   {libelle:<28} {m['parties']:>7} parties  {m['moyenne_pourcentage']:>5}%")
+
+    ECRAN.ligne("\n" + "─" * 60)
+    ECRAN.ligne(" DISTRIBUTION DES SCORES")
+    ECRAN.ligne("─" * 60)
+    plus_grand = max(rapport["distribution_scores"].values())
+    for score, effectif in rapport["distribution_scores"].items():
+        ECRAN.ligne(f"   {score:>3} pts {'█' * max(1, 40 * effectif // plus_grand):<40} {effectif}")
+
+    ECRAN.ligne("\n" + "─" * 60)
+    ECRAN.ligne(" ACTIVITÉ (7 derniers jours)")
+    ECRAN.ligne("─" * 60)
+    for jour, parties in list(rapport["activite_quotidienne"].items())[-7:]:
+        ECRAN.ligne(f"   {jour}  {parties} parties")
+
+    reguliers = [(nom, t) for nom, t in rapport["joueurs"].items() if t["parties"] >= 3]
+    if reguliers:
+        ECRAN.ligne("\n" + "─" * 60)
+        ECRAN.ligne(" MEILLEURES PROGRESSIONS (3 parties ou plus)")
+        ECRAN.ligne("─" * 60)
+        for nom, t in sorted(reguliers, key=lambda p: p[1]["pente"], reverse=True)[:5]:
+            ECRAN.ligne(f"   {nom:<28} {t['pente']:+.2f} pts/partie  ({t['parties']} parties, "
+                        f"moyenne {t['moyenne_pourcentage']}%)")
+
+    ECRAN.ligne(f"\n Calculé en {rapport['duree_ms']} ms ({rapport['moteur']})")
+    ECRAN.ligne("─" * 60)
+    reponse = saisie_securisee(f"\n Exporter en JSON dans {FICHIER_STATISTIQUES} ? (O/N) : ").strip().lower()
+    if reponse.startswith("o") and exporter_statistiques(rapport):
+        ECRAN.ligne(f"\n Statistiques exportées dans {FICHIER_STATISTIQUES}")
+    ECRAN.saisir("\n Appuyez sur [ENTRÉE] pour revenir au menu principal...")
 
 
 def instructions() -> None:
     """Affiche les instructions du jeu"""
-    print("\n" + "═" * 60)
-    print(" INSTRUCTIONS & AIDE".center(60))
-    print("═" * 60 + "\n")
-    print(" COMMENT JOUER ?\n")
-    print("   • Une partie contient jusqu'à 10 questions")
-    print("   • Chaque bonne réponse vaut 1 point")
-    print("   • Choisissez votre réponse en tapant le numéro correspondant\n")
-    print(" SCORES\n")
-    print("   • Vos scores sont sauvegardés automatiquement")
-    print("   • Consultez le classement dans le menu principal\n")
-    print(" MODES DE JEU\n")
-    print("   • Mode Rapide : 10 questions, tous thèmes")
-    print("   • Mode Thème : choisissez un thème spécifique\n")
-    print(" NAVIGATION\n")
-    print("   • Tapez le numéro de l'option souhaitée")
-    print("   • '0' permet de revenir en arrière\n")
-    print(" ASTUCES\n")
-    print("   • Lisez bien chaque question avant de répondre")
-    print("   • Vos statistiques sont suivies dans le classement\n")
-    print("═" * 60)
-    input("\n Appuyez sur [ENTRÉE] pour revenir au menu...")
+    ECRAN.ligne("\n" + "═" * 60)
+    ECRAN.ligne(" INSTRUCTIONS & AIDE".center(60))
+    ECRAN.ligne("═" * 60 + "\n")
+    ECRAN.ligne(" COMMENT JOUER ?\n")
+    ECRAN.ligne(f"   • Une partie contient jusqu'à {QUESTIONS_PAR_PARTIE} questions")
+    ECRAN.ligne("   • Les questions déjà vues ne reviennent qu'après avoir fait le tour du thème")
+    ECRAN.ligne("   • Chaque bonne réponse vaut 1 point")
+    ECRAN.ligne("   • Choisissez votre réponse en tapant le numéro correspondant\n")
+    ECRAN.ligne(" SCORES\n")
+    ECRAN.ligne("   • Vos scores sont sauvegardés automatiquement")
+    ECRAN.ligne("   • Consultez le classement dans le menu principal\n")
+    ECRAN.ligne(" MODES DE JEU\n")
+    ECRAN.ligne(f"   • Mode Rapide : {QUESTIONS_PAR_PARTIE} questions, tous thèmes")
+    ECRAN.ligne("   • Mode Thème : choisissez un thème spécifique\n")
+    ECRAN.ligne(" NAVIGATION\n")
+    ECRAN.ligne("   • Tapez le numéro de l'option souhaitée")
+    ECRAN.ligne("   • '0' permet de revenir en arrière\n")
+    ECRAN.ligne(" ASTUCES\n")
+    ECRAN.ligne("   • Lisez bien chaque question avant de répondre")
+    ECRAN.ligne("   • Vos statistiques sont suivies dans le classement\n")
+    ECRAN.ligne("═" * 60)
+    ECRAN.saisir("\n Appuyez sur [ENTRÉE] pour revenir au menu...")
+
+
+def menu_admin(bq: Optional[BanqueQuestions] = None) -> None:
+    """Menu d'administration caché (tapez 'admin' au menu principal)"""
+    while True:
+        etat = "activée" if INSTRUMENTATION.active else "désactivée"
+        ECRAN.ligne("\n" + "╔" + "═" * 58 + "╗")
+        ECRAN.ligne("║" + " ADMINISTRATION ".center(58) + "║")
+        ECRAN.ligne("╚" + "═" * 58 + "╝\n")
+        ECRAN.ligne(f"   1) Instrumentation : {etat} (basculer)")
+        ECRAN.ligne("   2) Afficher les mesures")
+        ECRAN.ligne(f"   3) Exporter les mesures ({FICHIER_INSTRUMENTATION})")
+        ECRAN.ligne("   4) Remettre les mesures à zéro")
+        ECRAN.ligne("   5) Recharger les questions")
+        ECRAN.ligne("   0) ← Retour au menu principal\n")
+        ECRAN.ligne("─" * 60)
+
+        choix = entier_securise("➤ Votre choix : ", val_min=0, val_max=5, par_defaut=0)
+        if choix == 0:
+            return
+        if choix == 1:
+            INSTRUMENTATION.active = not INSTRUMENTATION.active
+        elif choix == 2:
+            mesures = INSTRUMENTATION.rapport()["mesures"]
+            if not mesures:
+                ECRAN.ligne("\n Aucune mesure enregistrée.")
+            for nom, m in mesures.items():
+                ECRAN.ligne(f"\n {nom:<20} appels={m['appels']:<6} moyenne={m['moyenne_ms']:.3f} ms "
+                            f"max={m['max_ms']:.3f} ms lus={m['octets_lus']} écrits={m['octets_ecrits']}")
+                if m["histogramme"]:
+                    ECRAN.ligne("   " + "  ".join(f"{b}:{n}" for b, n in m["histogramme"].items()))
+            ECRAN.saisir("\n Appuyez sur [ENTRÉE] pour continuer...")
+        elif choix == 3:
+            if INSTRUMENTATION.exporter():
+                ECRAN.ligne(f"\n Mesures exportées dans {FICHIER_INSTRUMENTATION}")
+        elif choix == 4:
+            INSTRUMENTATION.reinitialiser()
+        elif choix == 5 and bq is not None:
+            changements = bq.recharger()
+            for cle, libelle in (("ajoutes", "ajouté"), ("modifies", "modifié"), ("supprimes", "supprimé")):
+                for nom in changements[cle]:
+                    ECRAN.ligne(f"   {libelle:<9} {nom}")
+            if not any(changements.values()):
+                ECRAN.ligne("\n Aucun fichier de questions n'a changé.")
+            ECRAN.ligne(f"\n {bq.nombre_questions()} questions disponibles.")
 
 
 def principal() -> None:
     """Point d'entrée principal du programme"""
-    bq = BanqueQuestions(dossier="questions")
-    stockage = Stockage()
+    ECRAN.actif = True
+    bq = creer_banque(dossier="questions")
+    stockage = creer_stockage()
 
-    if not bq.questions:
-        print("\n️ Aucune question trouvée dans le dossier 'questions/'")
-        print("Veuillez ajouter des fichiers JSON de questions.")
-        input("\nAppuyez sur [ENTRÉE] pour quitter...")
+    if bq.nombre_questions() == 0:
+        ECRAN.ligne("\n️ Aucune question trouvée dans le dossier 'questions/'")
+        ECRAN.ligne("Veuillez ajouter des fichiers JSON de questions.")
+        ECRAN.saisir("\nAppuyez sur [ENTRÉE] pour quitter...")
         return
 
+    # Les scores sont écrits par un thread dédié ; la file est vidée avant de rendre la main
+    if ECRITURE_DIFFEREE:
+        stockage.demarrer_ecriture_differee()
+    bq.demarrer_surveillance(INTERVALLE_RECHARGEMENT)
+    try:
+        menu_principal(bq, stockage)
+    finally:
+        ECRAN.afficher()
+        bq.arreter_surveillance()
+        stockage.arreter_ecriture_differee()
+        echecs = stockage.echecs_ecriture()
+        if echecs:
+            print(f"[Erreur] {echecs} score(s) n'ont pas pu être écrits sur le disque.")
+
+
+def menu_principal(bq: BanqueQuestions, stockage: Stockage) -> None:
+    """Boucle du menu principal"""
     ecran_bienvenue()
 
     while True:
         try:
-            print("\n" + "╔" + "═" * 58 + "╗")
-            print("║" + " QUISQUEYA QUIZ SYSTÈME  - MENU PRINCIPAL ".center(58) + "║")
-            print("╚" + "═" * 58 + "╝\n")
+            ECRAN.ligne("\n" + "╔" + "═" * 58 + "╗")
+            ECRAN.ligne("║" + " QUISQUEYA QUIZ SYSTÈME  - MENU PRINCIPAL ".center(58) + "║")
+            ECRAN.ligne("╚" + "═" * 58 + "╝\n")
 
             options = [
                 " Jouer",
                 " Classement / Scores",
+                " Statistiques",
                 " Instructions / Aide",
                 " Quitter"
             ]
 
             for i, opt in enumerate(options, start=1):
-                print(f"   {i}) {opt}")
-            print("\n" + "─" * 60)
+                ECRAN.ligne(f"   {i}) {opt}")
+            ECRAN.ligne("\n" + "─" * 60)
 
-            choix = entier_securise("➤ Votre choix (1-4) : ", val_min=1, val_max=4)
+            choix = entier_securise("➤ Votre choix (1-5) : ", val_min=1, val_max=5,
+                                    raccourcis={"admin": 0})
 
-            if choix == 1:
+            if choix == 0:
+                menu_admin(bq)
+            elif choix == 1:
                 while True:
                     try:
-                        print("\n" + "╔" + "═" * 58 + "╗")
-                        print("║" + " MENU JOUER".center(58) + "║")
-                        print("╚" + "═" * 58 + "╝\n")
-                        print("   1) ⚡ Mode rapide (10 questions)")
-                        print("   2)  Mode par thème")
-                        print("   0) ← Retour au menu principal\n")
-                        print("─" * 60)
+                        ECRAN.ligne("\n" + "╔" + "═" * 58 + "╗")
+                        ECRAN.ligne("║" + " MENU JOUER".center(58) + "║")
+                        ECRAN.ligne("╚" + "═" * 58 + "╝\n")
+                        ECRAN.ligne(f"   1) ⚡ Mode rapide ({QUESTIONS_PAR_PARTIE} questions)")
+                        ECRAN.ligne("   2)  Mode par thème")
+                        ECRAN.ligne("   0) ← Retour au menu principal\n")
+                        ECRAN.ligne("─" * 60)
 
                         sous = entier_securise("➤ Votre choix : ", val_min=0, val_max=2, par_defaut=0)
                         if sous == 0:
@@ -636,35 +3990,1038 @@ def principal() -> None:
                         elif sous == 2:
                             jouer_mode_theme(bq, stockage)
                     except KeyboardInterrupt:
-                        print("\n\n Opération annulée.")
-                        input("\n Appuyez sur [ENTRÉE] pour continuer...")
+                        ECRAN.ligne("\n\n Opération annulée.")
+                        ECRAN.saisir("\n Appuyez sur [ENTRÉE] pour continuer...")
                         break
                     except (IOError, ValueError) as e:
-                        print(f"\n Erreur inattendue : {e}")
-                        input("\n Appuyez sur [ENTRÉE] pour continuer...")
+                        ECRAN.ligne(f"\n Erreur inattendue : {e}")
+                        ECRAN.saisir("\n Appuyez sur [ENTRÉE] pour continuer...")
 
             elif choix == 2:
                 afficher_classement(bq, stockage)
             elif choix == 3:
-                instructions()
+                afficher_statistiques(stockage)
             elif choix == 4:
+                instructions()
+            elif choix == 5:
                 sur = saisie_securisee("❓ Êtes-vous sûr de vouloir quitter ? (O/N) : ").strip().lower().startswith("o")
                 if sur:
-                    print("\n" + "═" * 60)
-                    print(" Merci d'avoir joué à Quisqueya Quiz Système  !".center(60))
-                    print("À bientôt ! ".center(60))
-                    print("═" * 60 + "\n")
+                    ECRAN.ligne("\n" + "═" * 60)
+                    ECRAN.ligne(" Merci d'avoir joué à Quisqueya Quiz Système  !".center(60))
+                    ECRAN.ligne("À bientôt ! ".center(60))
+                    ECRAN.ligne("═" * 60 + "\n")
                     break
 
         except KeyboardInterrupt:
-            print("\n\n Opération annulée.")
-            input("\n Appuyez sur [ENTRÉE] pour continuer...")
+            ECRAN.ligne("\n\n Opération annulée.")
+            ECRAN.saisir("\n Appuyez sur [ENTRÉE] pour continuer...")
         except (IOError, ValueError) as e:
-            print("\n" + "─" * 60)
-            print(f" [Erreur inattendue] {e}")
-            print("─" * 60)
-            input("\n Appuyez sur [ENTRÉE] pour revenir au menu principal...")
+            ECRAN.ligne("\n" + "─" * 60)
+            ECRAN.ligne(f" [Erreur inattendue] {e}")
+            ECRAN.ligne("─" * 60)
+            ECRAN.saisir("\n Appuyez sur [ENTRÉE] pour revenir au menu principal...")
+
+
+# ============================================================================
+# SERVEUR MULTI-SESSIONS
+# ============================================================================
+
+class SessionTerminee(Exception):
+    """Le client s'est déconnecté, a quitté ou est resté inactif trop longtemps"""
+
+
+class ServeurQuiz:
+    """Serveur asyncio : des parties simultanées sur un protocole texte ligne à ligne (style telnet)
+
+    Toutes les sessions partagent la même banque en mémoire ; les scores passent
+    par une file bornée vidée par une seule tâche d'écriture, qui sauvegarde
+    par lots dans un thread pour ne jamais bloquer la boucle d'événements.
+    """
+
+    def __init__(self, bq: BanqueQuestions, stockage: Stockage, hote: str = "127.0.0.1",
+                 port: int = 7777, delai_inactivite: float = 300.0, max_sessions: int = 500,
+                 taille_file_scores: int = 1000, taille_lot_scores: int = 100) -> None:
+        self.bq = bq
+        self.stockage = stockage
+        self.hote = hote
+        self.port = port
+        self.delai_inactivite = delai_inactivite
+        self.max_sessions = max_sessions
+        self.taille_file_scores = taille_file_scores
+        self.taille_lot_scores = taille_lot_scores
+        self.sessions_actives = 0
+        self.parties_terminees = 0
+        self._file_scores: Optional["asyncio.Queue[Dict[str, Any]]"] = None
+
+    async def _envoyer(self, writer: asyncio.StreamWriter, texte: str) -> None:
+        writer.write(texte.replace("\n", "\r\n").encode("utf-8"))
+        await writer.drain()  # contre-pression : un client lent ne fait pas gonfler les tampons
+
+    async def _lire(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, invite: str) -> str:
+        await self._envoyer(writer, invite)
+        try:
+            ligne = await asyncio.wait_for(reader.readline(), self.delai_inactivite)
+        except asyncio.TimeoutError:
+            await self._envoyer(writer, "\n Délai d'inactivité dépassé. Au revoir !\n")
+            raise SessionTerminee()
+        except (ValueError, asyncio.LimitOverrunError):
+            # readline() refuse une ligne plus longue que la limite du flux (64 Kio)
+            await self._envoyer(writer, "\n Ligne trop longue. Au revoir !\n")
+            raise SessionTerminee()
+        if not ligne:
+            raise SessionTerminee()
+        texte = ligne.decode("utf-8", errors="replace").strip()
+        if texte.upper() in ("QUIT", "QUITTER", "EXIT"):
+            raise SessionTerminee()
+        return texte
+
+    async def _choisir_questions(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                                 nom: str) -> Tuple[List[Question], Optional[VuesJoueur]]:
+        themes = self.bq.lister_themes()
+        menu = f"\n 0) ⚡ Mode rapide ({QUESTIONS_PAR_PARTIE} questions, tous thèmes)\n"
+        menu += "".join(f" {i}) {t}\n" for i, t in enumerate(themes, start=1))
+        await self._envoyer(writer, menu)
+        while True:
+            choix = await self._lire(reader, writer, "➤ Votre choix : ")
+            try:
+                n = int(choix)
+            except ValueError:
+                continue
+            if 0 <= n <= len(themes):
+                # Lecture des questions vues du joueur : hors de la boucle
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, questions_pour_joueur, self.bq, self.stockage, nom, [themes[n - 1]] if n else None)
+
+    async def _jouer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                     nom: str, questions: List[Question], vues: Optional[VuesJoueur] = None) -> None:
+        moteur = MoteurQuiz(questions, nom)
+        moteur.demarrer()
+        while not moteur.termine:
+            q = moteur.question_courante
+            await self._envoyer(writer, "\n" + "=" * 60 + "\n" +
+                                q.formater_pour_affichage(moteur.position + 1, moteur.total))
+            reponse = await self._lire(reader, writer, "Ta réponse (nombre, Q pour abandonner) : ")
+            if reponse.upper() in ("0", "Q"):
+                moteur.interrompre()
+                break
+            try:
+                retour = moteur.soumettre(int(reponse) - 1)
+            except ValueError:
+                await self._envoyer(writer, f" Choix invalide ! Entrez un nombre entre 1 et {len(q.options)}.\n")
+                continue
+            await self._envoyer(writer, " Bonne réponse !\n" if retour.correcte else
+                                f" Mauvaise réponse. La bonne était: {retour.texte_bonne_option}\n")
+
+        entree = moteur.terminer()
+        if entree is None:
+            await self._envoyer(writer, "\n Quiz interrompu : le score n'a pas été enregistré.\n")
+            return
+        boucle = asyncio.get_running_loop()
+        await boucle.run_in_executor(None, marquer_questions_vues, self.stockage, vues, questions)
+        position = await boucle.run_in_executor(None, self.stockage.positionner, entree)
+        entree.update(garder_position(position))
+        await self._envoyer(writer, f"\n=== RÉSUMÉ ===\nBonnes réponses : {moteur.bonnes}/{moteur.total} "
+                                    f"({entree['pourcentage']}%)\nScore total : {moteur.score}\n"
+                                    f"Durée : {entree['duree_seconds']} s\n" +
+                                    "".join(ligne + "\n" for ligne in lignes_position(position, entree.get("theme"))))
+        await self._file_scores.put(entree)  # attend si l'écrivain est saturé
+        self.parties_terminees += 1
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self.sessions_actives >= self.max_sessions:
+            writer.write(" Serveur complet, réessayez plus tard.\r\n".encode("utf-8"))
+            writer.close()
+            return
+        self.sessions_actives += 1
+        try:
+            await self._envoyer(writer, "BIENVENUE DANS QUISQUEYA QUIZ SYSTÈME (tapez QUIT pour partir)\n")
+            nom = await self._lire(reader, writer, "👤 Entrez votre nom ou pseudo : ") or "Joueur"
+            while True:
+                questions, vues = await self._choisir_questions(reader, writer, nom)
+                if not questions:
+                    await self._envoyer(writer, " Aucune question disponible.\n")
+                else:
+                    await self._jouer(reader, writer, nom, questions, vues)
+                encore = await self._lire(reader, writer, "\nRejouer ? (O/N) : ")
+                if not encore.upper().startswith("O"):
+                    await self._envoyer(writer, " Merci d'avoir joué ! À bientôt.\n")
+                    break
+        except (SessionTerminee, ConnectionError):
+            pass
+        finally:
+            self.sessions_actives -= 1
+            writer.close()
+
+    async def _ecrivain_scores(self) -> None:
+        """Unique écrivain : regroupe les scores en attente et les sauvegarde hors de la boucle
+
+        Un lot qui échoue est réessayé (attente croissante, plafonnée) jusqu'à
+        ce qu'il soit écrit : il n'est marqué traité qu'une fois sur le disque.
+        """
+        boucle = asyncio.get_running_loop()
+        while True:
+            lot = [await self._file_scores.get()]
+            while len(lot) < self.taille_lot_scores and not self._file_scores.empty():
+                lot.append(self._file_scores.get_nowait())
+            attente = 0.5
+            while True:
+                try:
+                    if await boucle.run_in_executor(None, self.stockage.sauvegarder_scores, lot):
+                        break
+                    erreur = "échec de l'écriture"
+                except Exception as e:  # la tâche doit survivre pour vider la file
+                    erreur = str(e)
+                except asyncio.CancelledError:
+                    print(f"[Erreur] arrêt du serveur : {len(lot)} score(s) non sauvegardé(s)")
+                    raise
+                print(f"[Erreur] impossible de sauvegarder {len(lot)} score(s): {erreur} "
+                      f"– nouvel essai dans {attente:g} s")
+                await asyncio.sleep(attente)
+                attente = min(attente * 2, 30.0)
+            for _ in lot:
+                self._file_scores.task_done()
+
+    async def servir(self, pret: Optional[Callable[[], None]] = None) -> None:
+        """Démarre le serveur et tourne jusqu'à annulation (les scores en file sont alors vidés)"""
+        self._file_scores = asyncio.Queue(self.taille_file_scores)
+        self.stockage.top_n(1)  # construit l'index avant d'accepter des joueurs
+        ecrivain = asyncio.ensure_future(self._ecrivain_scores())
+        serveur = await asyncio.start_server(self._session, self.hote, self.port,
+                                             backlog=max(100, self.max_sessions))
+        if pret is not None:
+            pret()
+        try:
+            async with serveur:
+                await serveur.serve_forever()
+        finally:
+            await self._file_scores.join()
+            ecrivain.cancel()
+
+
+# ============================================================================
+# CLASSEMENT HTTP
+# ============================================================================
+
+FRAICHEUR_HTTP = float(os.environ.get("QUISQUEYA_HTTP_FRAICHEUR", "1") or 0)
+TAILLE_PAGE_MAX = 100
+PAGES_MAX = 100
+REPONSES_MAX = 1000
+
+
+class CacheClassement:
+    """Réponses JSON du classement gardées en mémoire jusqu'à la prochaine sauvegarde
+
+    Les sauvegardes de ce processus vident le cache immédiatement (abonnement au
+    stockage) ; celles d'autres processus sont vues par stockage.version(),
+    consulté au plus une fois toutes les fraicheur secondes. Entre deux
+    sauvegardes, les requêtes ne touchent ni au disque ni au stockage.
+    """
+
+    def __init__(self, stockage: Stockage, fraicheur: float = FRAICHEUR_HTTP) -> None:
+        self.stockage = stockage
+        self.fraicheur = fraicheur
+        self._verrou = threading.Lock()
+        self._calcul = threading.Lock()
+        self._reponses: Dict[str, Tuple[bytes, str]] = {}
+        self._generation = 0
+        self._version: Any = None
+        self._verifie = float("-inf")
+        stockage.abonner(self.invalider)
+
+    def invalider(self) -> None:
+        with self._verrou:
+            self._reponses = {}
+            self._generation += 1
+            self._verifie = float("-inf")
+
+    def _verifier_version(self) -> None:
+        """Vide le cache si un autre processus a écrit depuis la dernière vérification"""
+        if time.monotonic() - self._verifie < self.fraicheur:
+            return
+        version = self.stockage.version()
+        with self._verrou:
+            if version != self._version:
+                self._reponses = {}
+                self._generation += 1
+                self._version = version
+            self._verifie = time.monotonic()
+
+    def obtenir(self, cle: str, calculer: Callable[[], Any]) -> Tuple[bytes, str]:
+        """(corps JSON, ETag) de la réponse cle ; calculer() n'est appelé qu'en cas d'absence
+
+        Les calculs sont faits un à un : cent clients qui arrivent juste après une
+        sauvegarde déclenchent un seul calcul.
+        """
+        self._verifier_version()
+        reponse = self._reponses.get(cle)
+        if reponse is not None:
+            return reponse
+        with self._calcul:
+            reponse = self._reponses.get(cle)
+            if reponse is not None:
+                return reponse
+            generation = self._generation
+            corps = json.dumps(calculer(), ensure_ascii=False).encode("utf-8")
+            reponse = (corps, f'"{hashlib.sha1(corps).hexdigest()[:20]}"')
+            with self._verrou:
+                # Une sauvegarde pendant le calcul rend la réponse déjà périmée
+                if generation == self._generation:
+                    if len(self._reponses) >= REPONSES_MAX:
+                        self._reponses = {}
+                    self._reponses[cle] = reponse
+        return reponse
+
+
+class RequeteInvalide(Exception):
+    pass
+
+
+def _entier_parametre(parametres: Dict[str, List[str]], nom: str, defaut: int, maximum: int) -> int:
+    try:
+        valeur = int(parametres.get(nom, [defaut])[0])
+    except ValueError:
+        raise RequeteInvalide(f"paramètre {nom} invalide")
+    if not 1 <= valeur <= maximum:
+        raise RequeteInvalide(f"paramètre {nom} hors limites (1 à {maximum})")
+    return valeur
+
+
+def page_classement(stockage: Stockage, theme: Optional[str], page: int, taille: int) -> Dict[str, Any]:
+    """Page page (à partir de 1) du classement, taille parties par page"""
+    debut = (page - 1) * taille
+    parties = stockage.top_n(debut + taille + 1, theme)
+    return {
+        "theme": theme,
+        "page": page,
+        "taille": taille,
+        "suivante": len(parties) > debut + taille,
+        "parties": [dict(e, rang=debut + i) for i, e in enumerate(parties[debut:debut + taille], start=1)]
+    }
+
+
+class GestionnaireClassement(BaseHTTPRequestHandler):
+    """API JSON en lecture seule :
+
+    GET /classement?theme=…&page=1&taille=10   parties classées, page par page
+    GET /themes                                 thèmes présents dans les scores
+    GET /joueurs/<nom>                          statistiques d'un joueur
+
+    Chaque réponse porte un ETag ; If-None-Match identique renvoie 304 sans corps.
+    """
+
+    server_version = "QuisqueyaClassement/1.0"
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        parametres = urllib.parse.parse_qs(url.query)
+        stockage = self.server.cache.stockage
+        try:
+            if url.path == "/classement":
+                theme = parametres.get("theme", [""])[0] or None
+                page = _entier_parametre(parametres, "page", 1, PAGES_MAX)
+                taille = _entier_parametre(parametres, "taille", 10, TAILLE_PAGE_MAX)
+                cle = f"classement|{theme or ''}|{page}|{taille}"
+                calculer = functools.partial(page_classement, stockage, theme, page, taille)
+            elif url.path == "/themes":
+                cle = "themes"
+                calculer = lambda: {"themes": stockage.obtenir_themes_depuis_scores()}
+            elif url.path.startswith("/joueurs/") and len(url.path) > len("/joueurs/"):
+                nom = urllib.parse.unquote(url.path[len("/joueurs/"):])
+                cle = f"joueur|{nom.casefold()}"
+                # La clé ignore la casse : le corps porte le nom enregistré, pas celui de l'URL
+                calculer = lambda: dict({"joueur": None}, **stockage.obtenir_stats_joueur(nom))
+            else:
+                self._repondre(404, json.dumps({"erreur": "ressource inconnue"}).encode("utf-8"))
+                return
+        except RequeteInvalide as e:
+            self._repondre(400, json.dumps({"erreur": str(e)}, ensure_ascii=False).encode("utf-8"))
+            return
+        corps, etag = self.server.cache.obtenir(cle, calculer)
+        if etag in (v.strip() for v in self.headers.get("If-None-Match", "").split(",")):
+            self._repondre(304, b"", etag)
+        else:
+            self._repondre(200, corps, etag)
+
+    def _repondre(self, code: int, corps: bytes, etag: Optional[str] = None) -> None:
+        self.send_response(code)
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if code != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        if corps:
+            self.wfile.write(corps)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # les écrans interrogent toutes les quelques secondes : pas de journal par requête
+
+
+def creer_serveur_classement(stockage: Stockage, hote: str = "127.0.0.1", port: int = 8080,
+                             fraicheur: float = FRAICHEUR_HTTP) -> ThreadingHTTPServer:
+    serveur = ThreadingHTTPServer((hote, port), GestionnaireClassement)
+    serveur.daemon_threads = True
+    serveur.cache = CacheClassement(stockage, fraicheur)
+    return serveur
+
+
+# ============================================================================
+# BANCS D'ESSAI
+# ============================================================================
+
+def generer_banque_synthetique(dossier: str, nombre: int, par_fichier: int = 500, graine: int = 0) -> None:
+    """Écrit nombre questions synthétiques dans dossier, réparties en fichiers de par_fichier"""
+    generateur = random.Random(graine)
+    niveaux = ("Facile", "Moyen", "Difficile")
+    os.makedirs(dossier, exist_ok=True)
+    for debut in range(0, nombre, par_fichier):
+        lot = []
+        for i in range(debut, min(debut + par_fichier, nombre)):
+            lot.append({"id": i + 1, "theme": f"Thème {generateur.randrange(12)}",
+                        "niveau": niveaux[generateur.randrange(3)],
+                        "texte": f"Question synthétique numéro {i + 1} ?",
+                        "options": [f"Réponse {j}" for j in range(4)],
+                        "bonne_option": generateur.randrange(4)})
+        with open(os.path.join(dossier, f"synthetique_{debut // par_fichier:06d}.json"), "w", encoding="utf-8") as f:
+            json.dump(lot, f, ensure_ascii=False)
+
+
+def generer_scores_synthetiques(nombre: int, graine: int = 0):
+    """Itère sur nombre entrées de score synthétiques (environ 1 000 joueurs, 12 thèmes)"""
+    generateur = random.Random(graine)
+    for i in range(nombre):
+        bonnes = generateur.randint(0, 10)
+        yield {
+            "id_partie": f"J{i % 1000}_{1700000000 + i}",
+            "joueur_nom": f"J{i % 1000}",
+            "date_heure": datetime.fromtimestamp(1700000000 + i * 60, timezone.utc).isoformat(),
+            "theme": f"Thème {generateur.randrange(12)}" if generateur.random() < 0.7 else "mix",
+            "niveau": "mix",
+            "nombre_questions": 10,
+            "bonnes": bonnes,
+            "mauvaises": 10 - bonnes,
+            "score_total": bonnes,
+            "pourcentage": float(bonnes * 10),
+            "duree_seconds": generateur.randint(20, 300)
+        }
+
+
+def _ecrire_historique(backend: str, chemin: str, nombre: int) -> Stockage:
+    """Prépare un historique de nombre parties et retourne le stockage correspondant"""
+    if backend == "sqlite":
+        stockage = StockageSQLite(chemin, ancien_chemin=None)
+        with stockage._connexion:
+            stockage._connexion.executemany(StockageSQLite.SQL_INSERER,
+                                            (StockageSQLite._ligne(e) for e in generer_scores_synthetiques(nombre)))
+        return stockage
+    with open(chemin, "w", encoding="utf-8") as f:
+        if backend == "jsonl":
+            for entree in generer_scores_synthetiques(nombre):
+                f.write(json.dumps(entree, ensure_ascii=False) + "\n")
+        else:
+            f.write("[\n")
+            for i, entree in enumerate(generer_scores_synthetiques(nombre)):
+                f.write(("" if i == 0 else ",\n") + json.dumps(entree, ensure_ascii=False, indent=2))
+            f.write("\n]")
+    if backend == "jsonl":
+        return StockageJournal(chemin, ancien_chemin=None, seuil_rotation=0)
+    return StockageFlux(chemin) if backend == "flux" else Stockage(chemin)
+
+
+def _chronometrer(fonction: Callable[[], Any], repetitions: int = 1) -> Dict[str, Any]:
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+    return {"repetitions": repetitions, "min_ms": round(min(durees), 4),
+            "moyenne_ms": round(sum(durees) / len(durees), 4), "max_ms": round(max(durees), 4)}
+
+
+def verifier_classements(nombre: int = 5000, seuil_rotation: int = 1000,
+                         taille_classement: int = 50) -> List[str]:
+    """Compare classements et rangs après rotation à ceux d'un stockage jamais archivé ; retourne les écarts
+
+    Le journal est comparé au tableau json, et des shards archivés à des shards
+    sans rotation (leur départage des ex aequo diffère de celui du json).
+    """
+    import tempfile
+
+    ecarts: List[str] = []
+    themes = (None, "Thème 3")
+    longueurs = (10, taille_classement, 3 * taille_classement + 5, nombre)
+    # Pages HTTP à cheval sur la tête retenue, et la plus profonde que l'API accepte
+    pages = ((taille_classement // 7 + 1, 7), (max(min(nombre // TAILLE_PAGE_MAX, PAGES_MAX), 1), TAILLE_PAGE_MAX),
+             (PAGES_MAX, TAILLE_PAGE_MAX))
+    echantillon = [e["id_partie"] for e in itertools.islice(generer_scores_synthetiques(nombre), 0, None,
+                                                            max(nombre // 100, 1))]
+
+    def remplir(stockage: Stockage) -> Stockage:
+        entrees = generer_scores_synthetiques(nombre)
+        for lot in iter(lambda: list(itertools.islice(entrees, 250)), []):
+            stockage.sauvegarder_scores(lot)
+        return stockage
+
+    def comparer(nom: str, reference: Stockage, stockage: Stockage) -> None:
+        for theme in themes:
+            for n in longueurs:
+                attendu = [e.get("id_partie") for e in reference.top_n(n, theme)]
+                obtenu = [e.get("id_partie") for e in stockage.top_n(n, theme)]
+                if attendu != obtenu:
+                    place = next((i for i, (a, b) in enumerate(zip(attendu, obtenu)) if a != b),
+                                 min(len(attendu), len(obtenu)))
+                    ecarts.append(f"{nom} top_n({n}, {theme}) : diffère à partir de la place {place + 1}")
+            for page, taille in pages:
+                attendu_page = json.dumps(page_classement(reference, theme, page, taille), sort_keys=True)
+                if json.dumps(page_classement(stockage, theme, page, taille), sort_keys=True) != attendu_page:
+                    ecarts.append(f"{nom} /classement page {page} taille {taille} ({theme}) : page différente")
+            for id_partie in echantillon:
+                attendu_rang, obtenu_rang = reference.rang_partie(id_partie, theme), stockage.rang_partie(id_partie, theme)
+                if attendu_rang != obtenu_rang:
+                    ecarts.append(f"{nom} rang_partie({id_partie}, {theme}) : {obtenu_rang} au lieu de {attendu_rang}")
+
+    with tempfile.TemporaryDirectory(prefix="quisqueya_verif_") as racine:
+        reference = _ecrire_historique("json", os.path.join(racine, "scores.json"), nombre)
+        journal = remplir(StockageJournal(os.path.join(racine, "scores.jsonl"), None,
+                                          seuil_rotation, taille_classement))
+        comparer("jsonl", reference, journal)
+
+        def shards(nom: str, seuil: int) -> StockageShards:
+            stockage = StockageShards([os.path.join(racine, nom, str(i)) for i in range(3)])
+            for shard in stockage.shards:
+                shard.seuil_rotation, shard.taille_classement = seuil, taille_classement
+            return remplir(stockage)
+
+        comparer("shards", shards("sans_rotation", 0), shards("avec_rotation", seuil_rotation // 3))
+    return ecarts
+
+
+def executer_bancs(tailles: List[int], backends: Optional[List[str]] = None,
+                   sessions: int = 1000) -> Dict[str, Any]:
+    """Mesure les chemins critiques sur des données synthétiques ; retourne un rapport JSON"""
+    import platform
+    import tempfile
+
+    backends = backends or ["json", "jsonl", "flux"] + (["sqlite"] if sqlite3 is not None else [])
+    resultats: List[Dict[str, Any]] = []
+
+    def noter(nom: str, taille: int, mesure: Dict[str, Any], **contexte: Any) -> None:
+        resultats.append(dict(nom=nom, taille=taille, **contexte, **mesure))
+
+    with tempfile.TemporaryDirectory(prefix="quisqueya_bench_") as racine:
+        for taille in tailles:
+            dossier = os.path.join(racine, f"questions_{taille}")
+            generer_banque_synthetique(dossier, taille)
+            noter("banque_demarrage_sans_cache", taille,
+                  _chronometrer(lambda: BanqueQuestions(dossier, utiliser_cache=False)))
+            BanqueQuestions(dossier)
+            noter("banque_demarrage_avec_cache", taille, _chronometrer(lambda: BanqueQuestions(dossier), 3))
+            bq = BanqueQuestions(dossier)
+            themes = bq.lister_themes()[:2]
+            noter("banque_filtrer", taille, _chronometrer(lambda: bq.filtrer(themes, ["Moyen"]), 20))
+            noter("banque_echantillonner", taille, _chronometrer(lambda: bq.echantillonner_questions(10, themes), 1000))
+
+            for backend in backends:
+                extension = {"json": "json", "jsonl": "jsonl", "flux": "json", "sqlite": "db"}[backend]
+                chemin = os.path.join(racine, f"scores_{taille}_{backend}.{extension}")
+                stockage = _ecrire_historique(backend, chemin, taille)
+                requetes = 3 if backend == "flux" and taille > 10000 else 100
+                noter("stockage_premiere_requete", taille, _chronometrer(lambda: stockage.top_n(10)),
+                      backend=backend)
+                noter("stockage_top_n", taille, _chronometrer(lambda: stockage.top_n(10, "Thème 3"), requetes),
+                      backend=backend)
+                noter("stockage_stats_joueur", taille,
+                      _chronometrer(lambda: stockage.obtenir_stats_joueur("J42"), requetes), backend=backend)
+                if backend == "jsonl":
+                    historique = HistoriqueColonnes.depuis_scores(stockage.iterer())
+                    noter("statistiques_chargement", taille,
+                          _chronometrer(lambda: HistoriqueColonnes.depuis_scores(stockage.iterer())), backend=backend)
+                    noter("statistiques_rapport", taille, _chronometrer(lambda: analyser_historique(historique), 3),
+                          backend=backend)
+                nouvelles = generer_scores_synthetiques(100, graine=1)
+                repetitions = 3 if backend == "json" and taille > 10000 else 20
+                noter("stockage_sauvegarder_score", taille,
+                      _chronometrer(lambda: stockage.sauvegarder_score(next(nouvelles)), repetitions),
+                      backend=backend)
+                if backend == "jsonl":
+                    simulation = simuler_sessions(bq, sessions, stockage, random.Random(0))
+                    noter("parties_simulees", taille, {
+                        "repetitions": simulation["sessions"],
+                        "moyenne_ms": round(simulation["secondes"] * 1000 / max(simulation["sessions"], 1), 4),
+                        "sessions_par_seconde": simulation["sessions_par_seconde"]}, backend=backend)
+                    noter("journal_compacter", taille, _chronometrer(stockage.compacter), backend=backend)
+                    noter("journal_demarrage_apres_compaction", taille,
+                          _chronometrer(lambda: StockageJournal(chemin, None, 0).top_n(10), 3), backend=backend)
+                if backend == "sqlite":
+                    stockage._connexion.close()
+
+    return {
+        "meta": {"date": datetime.now(timezone.utc).isoformat(), "python": platform.python_version(),
+                 "plateforme": platform.platform(), "tailles": tailles},
+        "resultats": resultats
+    }
+
+
+def comparer_bancs(ancien: Dict[str, Any], nouveau: Dict[str, Any]) -> List[str]:
+    """Lignes de comparaison (rapport nouveau / ancien sur la durée moyenne)"""
+    def cle(r: Dict[str, Any]) -> tuple:
+        return (r["nom"], r["taille"], r.get("backend"))
+
+    anciens = {cle(r): r for r in ancien.get("resultats", [])}
+    lignes = []
+    for r in nouveau.get("resultats", []):
+        a = anciens.get(cle(r))
+        if a and a.get("moyenne_ms"):
+            rapport = r["moyenne_ms"] / a["moyenne_ms"]
+            alerte = "  <-- régression" if rapport > 1.2 else ""
+            lignes.append(f"{r['nom']:<30} {r['taille']:>9} {r.get('backend') or '':<7} "
+                          f"{a['moyenne_ms']:>12.4f} ms -> {r['moyenne_ms']:>12.4f} ms  x{rapport:.2f}{alerte}")
+    return lignes
+
+
+# ============================================================================
+# IMPORT / EXPORT
+# ============================================================================
+
+EXEMPLES_REJETS = 1000
+
+
+class RapportRejets:
+    """Bilan d'un import : compteurs par motif de rejet et premiers exemples (nombre borné)"""
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.lus = 0
+        self.acceptes = 0
+        self.motifs: Dict[str, int] = {}
+        self.exemples: List[Dict[str, Any]] = []
+        self._debut = time.perf_counter()
+
+    @property
+    def rejetes(self) -> int:
+        return self.lus - self.acceptes
+
+    def rejeter(self, numero: int, motif: str, detail: str) -> None:
+        self.motifs[motif] = self.motifs.get(motif, 0) + 1
+        if len(self.exemples) < EXEMPLES_REJETS:
+            self.exemples.append({"enregistrement": numero, "motif": motif, "detail": detail})
+
+    def rapport(self) -> Dict[str, Any]:
+        duree = time.perf_counter() - self._debut
+        return {"source": self.source, "lus": self.lus, "acceptes": self.acceptes, "rejetes": self.rejetes,
+                "secondes": round(duree, 3),
+                "par_seconde": round(self.lus / duree) if duree > 0 else None,
+                "motifs": self.motifs, "exemples": self.exemples}
+
+    def resume(self) -> str:
+        r = self.rapport()
+        motifs = ", ".join(f"{m} : {n}" for m, n in sorted(self.motifs.items()))
+        return (f"{r['lus']} enregistrement(s) lu(s), {r['acceptes']} accepté(s), {r['rejetes']} rejeté(s)"
+                f"{f' ({motifs})' if motifs else ''} en {r['secondes']} s")
+
+    def ecrire(self, chemin: str) -> bool:
+        """Écrit le rapport JSON dans chemin"""
+        try:
+            with open(chemin, "w", encoding="utf-8") as f:
+                json.dump(self.rapport(), f, ensure_ascii=False, indent=2)
+            return True
+        except IOError as e:
+            print(f"[Erreur] impossible d'écrire {chemin}: {e}")
+            return False
+
+
+def format_selon_extension(chemin: str) -> str:
+    extension = os.path.splitext(chemin)[1].lower().lstrip(".")
+    return extension if extension in ("csv", "jsonl", "json") else "jsonl"
+
+
+def lire_enregistrements(chemin: str, format: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Lit un fichier csv, jsonl ou json (tableau) en flux ; produit (numéro, élément, erreur)"""
+    if format == "json":
+        os.stat(chemin)  # source absente : l'erreur remonte à l'appelant
+        erreurs: List[str] = []
+        numero = 0
+        for numero, element in enumerate(iterer_scores(chemin, signaler=erreurs.append), start=1):
+            yield numero, element, None
+        for erreur in erreurs:
+            yield numero + 1, None, erreur
+        return
+    with open(chemin, "r", encoding="utf-8", newline="") as f:
+        if format == "csv":
+            for numero, ligne in enumerate(csv.DictReader(f), start=1):
+                yield numero, ligne, None
+            return
+        for numero, ligne in enumerate(f, start=1):
+            if not ligne.strip():
+                continue
+            try:
+                element = json.loads(ligne)
+            except ValueError as e:
+                yield numero, None, f"ligne illisible : {e}"
+                continue
+            if not isinstance(element, dict):
+                yield numero, None, "la ligne n'est pas un objet JSON"
+                continue
+            yield numero, element, None
+
+
+def question_depuis_csv(ligne: Dict[str, str]) -> Dict[str, Any]:
+    """Colonnes id, theme, niveau, texte, bonne_option, et options (tableau JSON ou « a|b|c »)
+    ou option1, option2…"""
+    element: Dict[str, Any] = {k: v for k, v in ligne.items() if k and v not in (None, "")}
+    if "options" in element:
+        options = element["options"].strip()
+        element["options"] = json.loads(options) if options.startswith("[") else options.split("|")
+    else:
+        colonnes = sorted((k for k in element if k.startswith("option") and k[6:].isdigit()), key=lambda k: int(k[6:]))
+        if colonnes:
+            element["options"] = [element.pop(k) for k in colonnes]
+    return element
+
+
+def ids_questions(dossier: str) -> set:
+    """Identifiants des questions déjà présentes (un fichier en mémoire à la fois)"""
+    ids = set()
+    for chemin in sorted(glob.glob(os.path.join(dossier, "*.json"))):
+        ids.update(e[0] for e in analyser_fichier_questions(chemin)[0])
+    return ids
+
+
+def importer_questions(source: str, dossier: str = "questions", format: Optional[str] = None,
+                       par_fichier: int = 5000, prefixe: Optional[str] = None) -> RapportRejets:
+    """Importe des questions csv/jsonl/json dans dossier, en fichiers JSON d'au plus par_fichier questions
+
+    Chaque question passe par valider_question, comme au chargement de la banque ;
+    un id déjà présent dans la banque ou plus haut dans la source est rejeté.
+    Seuls les identifiants vus restent en mémoire. Si l'import échoue, le fichier
+    en cours est supprimé : seuls les fichiers complets sont publiés.
+    """
+    format = format or format_selon_extension(source)
+    prefixe = prefixe or f"import_{os.path.splitext(os.path.basename(source))[0]}"
+    rapport = RapportRejets(source)
+    os.makedirs(dossier, exist_ok=True)
+    ids = ids_questions(dossier)
+    numeros = itertools.count(1)
+    sortie, chemin, dans_fichier = None, "", 0
+
+    def fermer() -> None:
+        sortie.write("\n]\n")
+        sortie.close()
+        os.replace(chemin + ".tmp", chemin)
+
+    try:
+        for numero, element, erreur in lire_enregistrements(source, format):
+            rapport.lus += 1
+            if element is None:
+                rapport.rejeter(numero, "illisible", erreur)
+                continue
+            if format == "csv":
+                try:
+                    element = question_depuis_csv(element)
+                except ValueError as e:
+                    rapport.rejeter(numero, "illisible", f"options illisibles : {e}")
+                    continue
+            enregistrement, avertissement = valider_question(element, source)
+            if enregistrement is None:
+                rapport.rejeter(numero, "invalide", avertissement)
+                continue
+            if enregistrement[0] in ids:
+                rapport.rejeter(numero, "id_en_double", f"id {enregistrement[0]} déjà utilisé")
+                continue
+            ids.add(enregistrement[0])
+            if sortie is None or dans_fichier >= par_fichier:
+                if sortie is not None:
+                    fermer()
+                chemin = next(c for c in (os.path.join(dossier, f"{prefixe}_{n:04d}.json") for n in numeros)
+                              if not os.path.exists(c))
+                sortie, dans_fichier = open(chemin + ".tmp", "w", encoding="utf-8"), 0
+            sortie.write(("[\n" if dans_fichier == 0 else ",\n") +
+                         json.dumps(dict(zip(CHAMPS_QUESTION, enregistrement)), ensure_ascii=False))
+            dans_fichier += 1
+            rapport.acceptes += 1
+    except BaseException:
+        if sortie is not None:
+            sortie.close()
+            try:
+                os.remove(chemin + ".tmp")
+            except OSError:
+                pass
+        raise
+    if sortie is not None:
+        fermer()
+    return rapport
+
+
+def valider_score(element: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Valide une partie importée ; les champs numériques venus d'un CSV sont convertis"""
+    entree = {k: v for k, v in element.items() if k and v not in (None, "")}
+    if not entree.get("joueur_nom"):
+        return None, "joueur_nom manquant"
+    try:
+        for champ in ("nombre_questions", "bonnes", "mauvaises", "score_total", "duree_seconds",
+                      "rang_global", "rang_theme"):
+            if champ in entree:
+                entree[champ] = int(entree[champ])
+        for champ in ("pourcentage", "percentile_global", "percentile_theme"):
+            if champ in entree:
+                entree[champ] = float(entree[champ])
+    except (TypeError, ValueError) as e:
+        return None, f"valeur numérique invalide : {e}"
+    if "score_total" not in entree or "pourcentage" not in entree:
+        return None, "score_total ou pourcentage manquant"
+    entree["joueur_nom"] = str(entree["joueur_nom"])
+    return entree, None
+
+
+def importer_scores(stockage: Stockage, source: str, format: Optional[str] = None,
+                    taille_lot: int = 10000) -> RapportRejets:
+    """Importe des parties csv/jsonl/json dans le stockage, par lots de taille_lot"""
+    rapport = RapportRejets(source)
+
+    def valides():
+        for numero, element, erreur in lire_enregistrements(source, format or format_selon_extension(source)):
+            rapport.lus += 1
+            entree, erreur = (None, erreur) if element is None else valider_score(element)
+            if entree is None:
+                rapport.rejeter(numero, "invalide" if element is not None else "illisible", erreur)
+                continue
+            rapport.acceptes += 1
+            yield entree
+
+    stockage.importer(valides(), taille_lot)
+    return rapport
+
+
+# ============================================================================
+# LIGNE DE COMMANDE
+# ============================================================================
+
+def executer_commande(arguments: List[str]) -> int:
+    """Commandes d'administration (sans argument : application interactive)"""
+    analyseur = argparse.ArgumentParser(prog="quisqueya_quiz_single.py",
+                                        description="Outils d'administration de Quisqueya Quiz")
+    commandes = analyseur.add_subparsers(dest="commande")
+
+    compiler = commandes.add_parser("compiler", help="compile le cache de la banque de questions")
+    compiler.add_argument("--dossier", default="questions")
+    compiler.add_argument("--verifier", action="store_true",
+                          help="vérifie le cache existant au lieu de le reconstruire")
+    compiler.add_argument("--manifeste", action="store_true",
+                          help="construit aussi le manifeste du chargement paresseux")
+
+    archiver = commandes.add_parser("archiver", help="archive le journal des scores derrière un instantané")
+    archiver.add_argument("--fichier", default=FICHIER_JOURNAL)
+
+    profiler = commandes.add_parser("profiler", help="mesure le chargement de chaque fichier de questions")
+    profiler.add_argument("--dossier", default="questions")
+    profiler.add_argument("--processus", type=int, default=PROCESSUS_CHARGEMENT)
+    profiler.add_argument("--top", type=int, default=10, help="nombre de fichiers les plus lents affichés")
+
+    memoire = commandes.add_parser("memoire", help="mesure l'empreinte mémoire d'une question")
+    memoire.add_argument("--nombre", type=int, default=20000)
+
+    simuler = commandes.add_parser("simuler", help="joue des parties simulées sans pause")
+    simuler.add_argument("--sessions", type=int, default=1000)
+    simuler.add_argument("--dossier", default="questions")
+    simuler.add_argument("--graine", type=int, default=None)
+    simuler.add_argument("--enregistrer", action="store_true",
+                         help="sauvegarde les parties dans le stockage configuré")
+
+    serveur = commandes.add_parser("serveur", help="sert des parties simultanées en TCP (protocole texte)")
+    serveur.add_argument("--hote", default="127.0.0.1")
+    serveur.add_argument("--port", type=int, default=7777)
+    serveur.add_argument("--dossier", default="questions")
+    serveur.add_argument("--delai", type=float, default=300.0, help="inactivité maximale (secondes)")
+    serveur.add_argument("--max-sessions", type=int, default=500)
+    serveur.add_argument("--rechargement", type=float, default=INTERVALLE_RECHARGEMENT,
+                         help="intervalle de rechargement des questions (secondes, 0 : jamais)")
+    serveur.add_argument("--http", type=int, default=0, metavar="PORT",
+                         help="sert aussi le classement en JSON sur ce port (0 : non)")
+
+    classement_http = commandes.add_parser("classement-http", help="sert le classement en JSON (lecture seule)")
+    classement_http.add_argument("--hote", default="127.0.0.1")
+    classement_http.add_argument("--port", type=int, default=8080)
+    classement_http.add_argument("--fraicheur", type=float, default=FRAICHEUR_HTTP,
+                                 help="délai max (secondes) avant de voir une écriture d'un autre processus")
+
+    import_questions = commandes.add_parser("importer-questions",
+                                            help="importe des questions csv/jsonl/json dans la banque")
+    import_questions.add_argument("source")
+    import_questions.add_argument("--dossier", default="questions")
+    import_questions.add_argument("--format", choices=("csv", "jsonl", "json"), default=None,
+                                  help="défaut : selon l'extension")
+    import_questions.add_argument("--par-fichier", type=int, default=5000, help="questions par fichier écrit")
+    import_questions.add_argument("--prefixe", default=None, help="préfixe des fichiers écrits")
+    import_questions.add_argument("--rapport", default=None, help="fichier JSON du rapport de rejets")
+
+    import_scores = commandes.add_parser("importer-scores", help="importe des parties dans le stockage configuré")
+    import_scores.add_argument("source")
+    import_scores.add_argument("--format", choices=("csv", "jsonl", "json"), default=None)
+    import_scores.add_argument("--lot", type=int, default=10000, help="parties par lot sauvegardé")
+    import_scores.add_argument("--rapport", default=None, help="fichier JSON du rapport de rejets")
+
+    export_scores = commandes.add_parser("exporter-scores", help="exporte toutes les parties (jsonl ou csv)")
+    export_scores.add_argument("destination", help="fichier de sortie ('-' : sortie standard)")
+    export_scores.add_argument("--format", choices=("csv", "jsonl"), default=None)
+    export_scores.add_argument("--lot", type=int, default=10000)
+
+    statistiques = commandes.add_parser("statistiques", help="analyse tout l'historique des scores (rapport JSON)")
+    statistiques.add_argument("--sortie", default=None, help="fichier JSON du rapport (défaut : sortie standard)")
+
+    verifier = commandes.add_parser("verifier-classements",
+                                    help="vérifie les classements après rotation contre un stockage non archivé")
+    verifier.add_argument("--nombre", type=int, default=5000)
+    verifier.add_argument("--rotation", type=int, default=1000, help="parties par journal avant archivage")
+    verifier.add_argument("--tete", type=int, default=50, help="places gardées par classement dans l'instantané")
+
+    bancs = commandes.add_parser("bancs", help="bancs d'essai sur des données synthétiques (rapport JSON)")
+    bancs.add_argument("--tailles", default="1000,100000",
+                       help="tailles séparées par des virgules (ex. 1000,100000,1000000)")
+    bancs.add_argument("--backends", default=None, help="json,jsonl,flux,sqlite (défaut : tous)")
+    bancs.add_argument("--sessions", type=int, default=1000)
+    bancs.add_argument("--sortie", default=None, help="fichier JSON du rapport")
+    bancs.add_argument("--comparer", default=None, help="rapport précédent à comparer")
+
+    args = analyseur.parse_args(arguments)
+
+    if args.commande == "archiver":
+        stockage = StockageJournal(args.fichier)
+        archivees = stockage.compacter()
+        print(f"{archivees} partie(s) archivée(s) – {len(stockage.archives())} archive(s) "
+              f"dans {stockage.dossier_archives}")
+        return 0
+
+    if args.commande == "compiler":
+        cache = CacheBanque(args.dossier)
+        if args.verifier:
+            problemes = cache.verifier()
+            for probleme in problemes:
+                print(f"[Cache] {probleme}")
+            print("Cache valide." if not problemes else f"{len(problemes)} problème(s) détecté(s).")
+            return 1 if problemes else 0
+        debut = time.perf_counter()
+        nombre = cache.compiler()
+        print(f"Cache compilé : {nombre} fichier(s) en {time.perf_counter() - debut:.3f} s -> {cache.chemin}")
+        if args.manifeste:
+            debut = time.perf_counter()
+            manifeste = ManifesteBanque(args.dossier)
+            manifeste.lire()
+            manifeste.reconstruire()
+            print(f"Manifeste construit en {time.perf_counter() - debut:.3f} s -> {manifeste.chemin}")
+        return 0
+
+    if args.commande == "profiler":
+        debut = time.perf_counter()
+        bq = BanqueQuestions(args.dossier, utiliser_cache=False, processus=args.processus)
+        total = time.perf_counter() - debut
+        durees = sorted(bq.durees_chargement, key=lambda d: d[1], reverse=True)
+        print(f"{len(bq.questions)} questions, {len(durees)} fichier(s) en {total:.3f} s "
+              f"(processus : {args.processus or 1})\n")
+        for chemin, duree, taille in durees[:args.top]:
+            print(f"  {duree * 1000:9.2f} ms  {taille / 1024:10.1f} Kio  {chemin}")
+        return 0
+
+    if args.commande == "memoire":
+        mesure = mesurer_memoire_questions(args.nombre)
+        print(f"{mesure['questions']} questions : {mesure['octets_avant']} octets/question avant, "
+              f"{mesure['octets_apres']} octets/question après")
+        return 0
+
+    if args.commande == "simuler":
+        bq = creer_banque(args.dossier)
+        stockage = creer_stockage() if args.enregistrer else None
+        resultat = simuler_sessions(bq, args.sessions, stockage, random.Random(args.graine))
+        print(json.dumps(resultat, ensure_ascii=False))
+        return 0
+
+    if args.commande == "serveur":
+        bq = creer_banque(args.dossier)
+        bq.demarrer_surveillance(args.rechargement)
+        stockage = creer_stockage()
+        serveur_quiz = ServeurQuiz(bq, stockage, args.hote, args.port, args.delai, args.max_sessions)
+        if args.http:
+            serveur_http = creer_serveur_classement(stockage, args.hote, args.http)
+            threading.Thread(target=serveur_http.serve_forever, name="quisqueya-http", daemon=True).start()
+            print(f"Classement JSON sur http://{args.hote}:{args.http}/classement")
+        print(f"Serveur Quisqueya Quiz sur {args.hote}:{args.port} (Ctrl+C pour arrêter)")
+        try:
+            asyncio.run(serveur_quiz.servir())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.commande == "classement-http":
+        serveur_http = creer_serveur_classement(creer_stockage(), args.hote, args.port, args.fraicheur)
+        print(f"Classement JSON sur http://{args.hote}:{args.port}/classement (Ctrl+C pour arrêter)")
+        try:
+            serveur_http.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            serveur_http.server_close()
+        return 0
+
+    if args.commande in ("importer-questions", "importer-scores"):
+        try:
+            if args.commande == "importer-questions":
+                rapport = importer_questions(args.source, args.dossier, args.format, args.par_fichier, args.prefixe)
+            else:
+                rapport = importer_scores(creer_stockage(), args.source, args.format, args.lot)
+        except (IOError, UnicodeDecodeError, csv.Error) as e:
+            print(f"[Erreur] import impossible depuis {args.source}: {e}")
+            return 1
+        print(rapport.resume())
+        if args.rapport:
+            rapport.ecrire(args.rapport)
+        return 0
+
+    if args.commande == "exporter-scores":
+        format = args.format or ("csv" if args.destination.lower().endswith(".csv") else "jsonl")
+        debut = time.perf_counter()
+        if args.destination == "-":
+            nombre = creer_stockage().exporter(sys.stdout, format, args.lot)
+        else:
+            with open(args.destination, "w", encoding="utf-8", newline="") as f:
+                nombre = creer_stockage().exporter(f, format, args.lot)
+        print(f"{nombre} partie(s) exportée(s) en {time.perf_counter() - debut:.3f} s", file=sys.stderr)
+        return 0
+
+    if args.commande == "statistiques":
+        rapport = rapport_statistiques(creer_stockage())
+        if args.sortie:
+            return 0 if exporter_statistiques(rapport, args.sortie) else 1
+        print(json.dumps(rapport, ensure_ascii=False, indent=2))
+        return 0
+
+    if args.commande == "verifier-classements":
+        ecarts = verifier_classements(args.nombre, args.rotation, args.tete)
+        for ecart in ecarts:
+            print(f"[Écart] {ecart}")
+        print("Classements identiques." if not ecarts else f"{len(ecarts)} écart(s) détecté(s).")
+        return 1 if ecarts else 0
+
+    if args.commande == "bancs":
+        tailles = [int(t) for t in args.tailles.split(",") if t.strip()]
+        backends = args.backends.split(",") if args.backends else None
+        rapport = executer_bancs(tailles, backends, args.sessions)
+        texte = json.dumps(rapport, ensure_ascii=False, indent=2)
+        if args.sortie:
+            with open(args.sortie, "w", encoding="utf-8") as f:
+                f.write(texte)
+        else:
+            print(texte)
+        if args.comparer:
+            with open(args.comparer, "r", encoding="utf-8") as f:
+                for ligne in comparer_bancs(json.load(f), rapport):
+                    print(ligne)
+        return 0
+
+    analyseur.print_help()
+    return 2
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(executer_commande(sys.argv[1:]))
     principal()
\ No newline at end of file